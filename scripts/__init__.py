@@ -1,7 +1,29 @@
 """Utility scripts for build, test, deploy, and operational tooling."""
 
+from __future__ import annotations
+
+from importlib import import_module
+from typing import Any
+
 __all__ = ["deploy_main", "build_main", "test_main"]
 
-from .deploy import main as deploy_main  # noqa: E402
-from .build import main as build_main  # noqa: E402
-from .test import main as test_main  # noqa: E402
+# Entry points resolve on first access so ``python -m scripts.build`` does not
+# import the scraper and Supabase stack that ``scripts.deploy`` needs.
+_ENTRY_POINTS = {
+    "deploy_main": ".deploy",
+    "build_main": ".build",
+    "test_main": ".test",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _ENTRY_POINTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = import_module(module, __name__).main
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
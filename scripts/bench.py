@@ -0,0 +1,377 @@
+"""Performance benchmarks and regression guards for the Python tooling.
+
+Usage::
+
+    python -m scripts.bench imports          # check import-time budgets
+    python -m scripts.bench imports --repeat 5 --module scripts.deploy
+    python -m scripts.bench record           # record provider pages to HAR (needs network)
+    python -m scripts.bench replay           # scrape the recorded pages offline vs baselines
+    python -m scripts.bench replay --update-baseline
+
+Rate-parser microbenchmarks live in ``scripts/tests/test_parser_benchmarks.py``
+and run under pytest-benchmark.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Page
+
+    from .utils.providers import Corridor, Provider
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+FIXTURES_DIR = REPO_ROOT / "scripts" / "fixtures"
+HAR_DIR = FIXTURES_DIR / "har"
+BASELINES_PATH = FIXTURES_DIR / "scrape_baselines.json"
+
+# Allowed slowdown against the stored baseline before replay reports a regression.
+DEFAULT_TOLERANCE = 0.25
+# How often the JS heap of a page under test is sampled over CDP.
+HEAP_SAMPLE_SECONDS = 0.1
+
+# Modules only the scraper and the Supabase write/read paths should load.
+HEAVY_MODULES: Tuple[str, ...] = ("playwright", "supabase", "postgrest", "httpx", "numpy")
+
+# Cumulative import time budget (ms) and heavy modules each entry point may load.
+IMPORT_BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    "scripts.build": (50.0, ()),
+    "scripts.test": (50.0, ()),
+    "scripts.utils": (50.0, ()),
+    "scripts.utils.vercel_utils": (50.0, ()),
+    "scripts.utils.providers": (150.0, ()),
+    "scripts.deploy": (200.0, ()),
+}
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$")
+
+
+@dataclass
+class ImportProfile:
+    module: str
+    cumulative_ms: float
+    imported: List[str] = field(default_factory=list)
+    self_ms: Dict[str, float] = field(default_factory=dict, repr=False)
+
+    def slowest(self, count: int = 5) -> List[Tuple[str, float]]:
+        return sorted(self.self_ms.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def parse_importtime(stderr: str, module: str) -> ImportProfile:
+    """Parse ``python -X importtime`` output for ``import module``."""
+    cumulative_ms = 0.0
+    imported: List[str] = []
+    self_times: Dict[str, float] = {}
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, name = match.groups()
+        imported.append(name)
+        self_times[name] = int(self_us) / 1000
+        if name == module:
+            cumulative_ms = int(cumulative_us) / 1000
+    return ImportProfile(module, cumulative_ms, imported, self_times)
+
+
+def profile_import(module: str, repeat: int = 3) -> ImportProfile:
+    """Import ``module`` in fresh interpreters and keep the fastest run."""
+    runs = []
+    for _ in range(max(1, repeat)):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{completed.stderr.strip()[-2000:]}")
+        runs.append(parse_importtime(completed.stderr, module))
+    return min(runs, key=lambda profile: profile.cumulative_ms)
+
+
+def check_imports(modules: Sequence[str], repeat: int = 3, scale: float = 1.0) -> int:
+    """Print import times for ``modules``; return 1 if any exceeds its budget."""
+    failures = 0
+    for module in modules:
+        budget_ms, allowed = IMPORT_BUDGETS.get(module, (float("inf"), HEAVY_MODULES))
+        budget_ms *= scale
+        profile = profile_import(module, repeat)
+        heavy = sorted(
+            {
+                name.split(".")[0]
+                for name in profile.imported
+                if name.split(".")[0] in HEAVY_MODULES and name.split(".")[0] not in allowed
+            }
+        )
+        problems = []
+        if profile.cumulative_ms > budget_ms:
+            problems.append(f"over budget of {budget_ms:.0f} ms")
+        if heavy:
+            problems.append(f"loads {', '.join(heavy)}")
+        status = "FAIL: " + "; ".join(problems) if problems else "ok"
+        print(f"{module:32} {profile.cumulative_ms:8.1f} ms  {status}")
+        if problems:
+            failures += 1
+            for name, self_ms in profile.slowest():
+                print(f"    {self_ms:8.1f} ms  {name}")
+    return 1 if failures else 0
+
+
+def _har_path(provider: Provider, corridor: Corridor) -> Path:
+    return HAR_DIR / f"{provider.platform.lower()}-{str(corridor).lower()}.har"
+
+
+def _jobs(
+    providers: Optional[Sequence[str]], corridors: Optional[str]
+) -> List[Tuple[Provider, Corridor]]:
+    from .utils.providers import get_corridors
+    from .utils.rates_scraper import build_jobs
+
+    return build_jobs(providers, get_corridors(corridors))
+
+
+def _load_baselines(path: Path = BASELINES_PATH) -> Dict[str, Dict[str, Any]]:
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+
+def _save_baselines(baselines: Dict[str, Dict[str, Any]], path: Path = BASELINES_PATH) -> None:
+    from .utils.file_utils import write_json
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_json(path, baselines)
+
+
+def _watch_heap(context: BrowserContext, peaks: List[float]) -> None:
+    """Track the peak JS heap (MB) of every page ``context`` opens, via CDP."""
+
+    async def sample(page: Page) -> None:
+        try:
+            session = await context.new_cdp_session(page)
+            await session.send("Performance.enable")
+            while not page.is_closed():
+                metrics = await session.send("Performance.getMetrics")
+                for metric in metrics["metrics"]:
+                    if metric["name"] == "JSHeapUsedSize":
+                        peaks.append(metric["value"] / 1_048_576)
+                await asyncio.sleep(HEAP_SAMPLE_SECONDS)
+        except Exception:
+            # The session detaches when the scraper closes the page.
+            return
+
+    context.on("page", lambda page: asyncio.ensure_future(sample(page)))
+
+
+async def _scrape_har(
+    browser: Browser, provider: Provider, corridor: Corridor, update: bool
+) -> Dict[str, Any]:
+    """Scrape one job with its network served from (or recorded into) a HAR file."""
+    from .utils.models import now_sgt
+    from .utils.rates_scraper import open_provider_context, scrape_provider
+    from .utils.telemetry import run_report
+
+    har = _har_path(provider, corridor)
+    peaks: List[float] = []
+    # The HAR file must see the real responses, not ones served by the asset cache.
+    provider_context = await open_provider_context(
+        browser, provider.platform, use_asset_cache=False
+    )
+    context = provider_context.context
+    try:
+        await context.route_from_har(
+            har,
+            not_found="fallback" if update else "abort",
+            update=update,
+            update_content="embed",
+        )
+        _watch_heap(context, peaks)
+        with run_report() as report:
+            rate = await scrape_provider(provider, corridor, provider_context, now_sgt())
+    finally:
+        # Recording only reaches disk once the context closes.
+        await context.close()
+
+    stages: Dict[str, float] = {}
+    for span in report.spans:
+        stages[span.name] = stages.get(span.name, 0.0) + span.duration_ms
+    result = report.providers[0] if report.providers else None
+    return {
+        "rate": format(rate.rate, "f") if rate else None,
+        "total_ms": result.duration_ms if result else report.duration_ms,
+        "stages": stages,
+        "selector_index": result.selector_index if result else None,
+        "js_heap_mb": round(max(peaks), 2) if peaks else None,
+    }
+
+
+async def _record(jobs: Sequence[Tuple[Provider, Corridor]]) -> int:
+    from .utils.rates_scraper import launch_browser
+
+    baselines = _load_baselines()
+    HAR_DIR.mkdir(parents=True, exist_ok=True)
+    playwright, browser = await launch_browser()
+    failures = 0
+    try:
+        for provider, corridor in jobs:
+            key = f"{provider.platform} {corridor}"
+            sample = await _scrape_har(browser, provider, corridor, update=True)
+            if not sample["rate"]:
+                failures += 1
+                print(f"{key:24} no rate; {_har_path(provider, corridor).name} not usable")
+                continue
+            # The rate read from the live page is the expected parse result on replay.
+            baselines.setdefault(key, {})["rate"] = sample["rate"]
+            print(f"{key:24} recorded rate {sample['rate']} -> {_har_path(provider, corridor)}")
+    finally:
+        await browser.close()
+        await playwright.stop()
+    _save_baselines(baselines)
+    return 1 if failures else 0
+
+
+async def _replay(
+    jobs: Sequence[Tuple[Provider, Corridor]],
+    repeat: int,
+    tolerance: float,
+    update_baseline: bool,
+) -> int:
+    from .utils.rates_scraper import launch_browser
+
+    baselines = _load_baselines()
+    recorded = [(p, c) for p, c in jobs if _har_path(p, c).exists()]
+    for provider, corridor in jobs:
+        if (provider, corridor) not in recorded:
+            print(f"{provider.platform} {corridor}: no HAR recorded; run 'record' first.")
+    if not recorded:
+        return 1
+
+    failures = 0
+    playwright, browser = await launch_browser()
+    try:
+        for provider, corridor in recorded:
+            key = f"{provider.platform} {corridor}"
+            samples = [
+                await _scrape_har(browser, provider, corridor, update=False)
+                for _ in range(max(1, repeat))
+            ]
+            total_ms = statistics.median(sample["total_ms"] for sample in samples)
+            stages = {
+                name: round(statistics.median(s["stages"].get(name, 0.0) for s in samples), 3)
+                for name in samples[0]["stages"]
+            }
+            heaps = [sample["js_heap_mb"] for sample in samples if sample["js_heap_mb"]]
+            rates = {sample["rate"] for sample in samples}
+            baseline = baselines.setdefault(key, {})
+
+            problems = []
+            expected = baseline.get("rate")
+            if expected and rates != {expected}:
+                problems.append(f"parsed {sorted(map(str, rates))}, expected {expected}")
+            if None in rates:
+                problems.append("no rate parsed")
+            baseline_ms = baseline.get("total_ms")
+            if not baseline_ms:
+                if not update_baseline:
+                    problems.append("no timing baseline; run replay --update-baseline")
+            elif total_ms > baseline_ms * (1 + tolerance):
+                problems.append(
+                    f"{total_ms / baseline_ms - 1:+.0%} vs baseline {baseline_ms:.0f} ms"
+                )
+
+            heap = f"{max(heaps):6.1f} MB" if heaps else "     n/a"
+            status = "FAIL: " + "; ".join(problems) if problems else "ok"
+            print(f"{key:24} {total_ms:8.1f} ms  heap {heap}  {status}")
+            for name, duration in sorted(stages.items()):
+                print(f"    {name:28} {duration:8.1f} ms")
+            failures += bool(problems)
+
+            if update_baseline and None not in rates and len(rates) == 1:
+                baseline.update(
+                    rate=expected or rates.pop(),
+                    total_ms=round(total_ms, 3),
+                    stages=stages,
+                    js_heap_mb=max(heaps) if heaps else None,
+                )
+    finally:
+        await browser.close()
+        await playwright.stop()
+
+    if update_baseline:
+        _save_baselines(baselines)
+        print(f"Updated baselines in {BASELINES_PATH}.")
+    return 1 if failures else 0
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run performance benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    imports = commands.add_parser(
+        "imports", help="Measure import time of the script entry points against budgets."
+    )
+    imports.add_argument(
+        "--module",
+        action="append",
+        help="Module to measure (repeatable; default: every budgeted module).",
+    )
+    imports.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Fresh interpreters per module; the fastest run counts (default: 3).",
+    )
+    imports.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiply every budget, e.g. 2 on slow CI runners (default: 1).",
+    )
+
+    for name, help_text in (
+        ("record", "Record provider pages into HAR files under scripts/fixtures/har."),
+        ("replay", "Scrape recorded pages offline and compare with stored baselines."),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--providers", help="Comma-separated providers (default: all).")
+        command.add_argument(
+            "--corridors", help="Comma-separated currency pairs (default: CORRIDORS)."
+        )
+    replay = commands.choices["replay"]
+    replay.add_argument(
+        "--repeat", type=int, default=3, help="Scrapes per page; medians count (default: 3)."
+    )
+    replay.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed slowdown over the baseline before failing (default: 0.25).",
+    )
+    replay.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store this run's timings and memory as the new baseline.",
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "imports":
+        return check_imports(args.module or list(IMPORT_BUDGETS), args.repeat, args.scale)
+    providers = args.providers.split(",") if args.providers else None
+    jobs = _jobs(providers, args.corridors)
+    if args.command == "record":
+        return asyncio.run(_record(jobs))
+    return asyncio.run(_replay(jobs, args.repeat, args.tolerance, args.update_baseline))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
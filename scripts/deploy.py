@@ -3,42 +3,241 @@
 from __future__ import annotations
 
 import argparse
-from typing import List
+import asyncio
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
 
 from .utils import (
+    Corridor,
+    Rate,
     SupabaseConfigurationError,
-    collect_rates,
-    insert_rates,
+    get_corridors,
+    get_providers,
     supabase_configured,
+    upsert_rates,
 )
+from .utils.change_detection import ChangeResult, LastKnownRates, seed_from_supabase
+from .utils.scheduler import Job, Scheduler
+from .utils.spool import RateSpool
+from .utils.supabase_client import ChunkResult
+from .utils.telemetry import RunReport, current_report, run_report, span
 
+# Rows per Supabase request when flushing the spool.
+SPOOL_BATCH_SIZE = 500
 
-def _scrape_and_insert(dry_run: bool = False) -> int:
-    rates = collect_rates()
-    if not rates:
-        print("No rates collected; nothing to insert.")
-        return 0
 
-    if dry_run:
-        print("Dry run enabled; scraped rates will not be inserted.")
-        for rate in rates:
-            print(rate)
-        return 0
+def _parse_providers(value: str | None) -> List[str] | None:
+    if not value:
+        return None
+    return [name.strip().upper() for name in value.split(",") if name.strip()]
+
+
+def _upsert_batch(rows: List[Dict[str, Any]]) -> List[ChunkResult]:
+    results = upsert_rates(rows, chunk_size=SPOOL_BATCH_SIZE)
+    for result in results:
+        status = "ok" if result.ok else f"failed: {result.error}"
+        print(
+            f"Chunk {result.index}: {result.rows} rows, {result.attempts} attempt(s), "
+            f"{result.seconds:.2f}s, {status}"
+        )
+    return results
+
+
+def _write_report(
+    report: RunReport, report_path: str | None, metrics_path: str | None
+) -> None:
+    if report_path:
+        report.write_json(report_path)
+        print(f"Wrote run report to {report_path}.")
+    if metrics_path:
+        report.write_prometheus(metrics_path)
+
 
+def _heartbeat(seconds: float) -> Optional[timedelta]:
+    return timedelta(seconds=seconds) if seconds > 0 else None
+
+
+def _changed_rates(
+    rates: List[Rate], store: LastKnownRates, heartbeat: Optional[timedelta]
+) -> ChangeResult:
+    """Classify ``rates`` against the last written rates; the caller commits."""
+    seed_from_supabase(store, rates)
+    with span("change_detection") as check:
+        result = store.classify(rates, heartbeat)
+        check.attributes.update(
+            changed=len(result.changed),
+            heartbeats=len(result.heartbeats),
+            suppressed=len(result.suppressed),
+        )
+    print(f"Change detection: {result.summary()}.")
+    return result
+
+
+def _plan_jobs(
+    scheduler: Scheduler,
+    providers: List[str] | None,
+    corridors: List[Corridor] | None,
+    concurrency: int | None,
+    budget: float | None,
+) -> List[Job]:
+    from .utils.rates_scraper import build_jobs
+
+    plan = scheduler.plan(build_jobs(providers, corridors), budget=budget, concurrency=concurrency)
+    print(f"Adaptive schedule: {plan.summary()}.")
+    for planned in plan.over_budget:
+        print(f"[{planned.platform} {planned.corridor}] Deferred to a later run by the budget.")
+    return plan.due
+
+
+def _drain_spool(spool: RateSpool) -> int:
+    """Flush spooled rows to Supabase; return an exit code."""
     if not supabase_configured():
-        print("Supabase credentials not configured; cannot insert rates.")
+        print(
+            f"Supabase credentials not configured; {spool.pending_count()} rows "
+            f"remain spooled in {spool.path}."
+        )
         return 1
-
     try:
-        response = insert_rates(rates)
-        print("Inserted into Supabase:", response)
-        return 0
+        result = spool.drain(_upsert_batch, batch_size=SPOOL_BATCH_SIZE)
     except SupabaseConfigurationError as exc:
         print(f"Supabase configuration error: {exc}")
         return 1
-    except Exception as exc:  # pragma: no cover - defensive logging path
-        print(f"Failed to insert into Supabase: {exc}")
+
+    print(f"Upserted {result.written} spooled rows into Supabase in {result.batches} batch(es).")
+    if result.error:
+        print(
+            f"Failed to insert into Supabase: {result.error}; "
+            f"{result.remaining} rows remain spooled for the next run."
+        )
         return 1
+    return 0
+
+
+def _scrape_and_insert(
+    dry_run: bool = False,
+    concurrent: bool = True,
+    providers: List[str] | None = None,
+    corridors: List[Corridor] | None = None,
+    concurrency: int | None = None,
+    only_changed: bool = False,
+    heartbeat: Optional[timedelta] = None,
+    adaptive: bool = False,
+    budget: float | None = None,
+) -> int:
+    from .utils.rates_scraper import collect_rates
+
+    scheduler = Scheduler.load() if adaptive else None
+    jobs = (
+        _plan_jobs(scheduler, providers, corridors, concurrency if concurrent else 1, budget)
+        if scheduler
+        else None
+    )
+    rates: List[Rate] = []
+    if jobs is None or jobs:
+        rates = collect_rates(
+            providers=providers,
+            corridors=corridors,
+            concurrent=concurrent,
+            concurrency=concurrency,
+            jobs=jobs,
+        )
+    if scheduler and jobs and not dry_run:
+        report = current_report()
+        scheduler.observe(jobs, rates, report.providers if report else ())
+        scheduler.save()
+    store = LastKnownRates() if only_changed and rates else None
+    change = _changed_rates(rates, store, heartbeat) if store else None
+    if dry_run:
+        if not rates:
+            print("No rates collected; nothing to insert.")
+            return 0
+        print("Dry run enabled; scraped rates will not be inserted.")
+        for rate in change.to_write if change else rates:
+            print(rate.to_payload())
+        return 0
+
+    spool = RateSpool()
+    if rates:
+        spool.append(change.to_write if change else rates)
+        if change:
+            store.commit(change)
+    elif spool.pending_count() == 0:
+        print("No rates collected; nothing to insert.")
+        return 0
+    else:
+        print("No rates collected; flushing rows spooled by earlier runs.")
+    return _drain_spool(spool)
+
+
+def _serve(
+    interval: float,
+    port: int,
+    max_context_uses: int,
+    dry_run: bool = False,
+    concurrent: bool = True,
+    providers: List[str] | None = None,
+    corridors: List[Corridor] | None = None,
+    concurrency: int | None = None,
+    report_path: str | None = None,
+    metrics_path: str | None = None,
+    only_changed: bool = False,
+    heartbeat: Optional[timedelta] = None,
+    adaptive: bool = False,
+    budget: float | None = None,
+) -> int:
+    from .utils.scraper_service import ScraperService
+
+    if not dry_run and not supabase_configured():
+        print("Supabase credentials not configured; cannot insert rates.")
+        return 1
+
+    spool = RateSpool()
+    store = LastKnownRates() if only_changed else None
+    drain_task: asyncio.Task | None = None
+
+    async def handle_rates(rates: List[Rate]) -> None:
+        nonlocal drain_task
+        if not rates:
+            print("No rates collected; nothing to insert.")
+            return
+        change = (
+            await asyncio.to_thread(_changed_rates, rates, store, heartbeat) if store else None
+        )
+        if dry_run:
+            for rate in change.to_write if change else rates:
+                print(rate.to_payload())
+            return
+        # Spool first, then flush in the background so the scrape loop never
+        # waits on Supabase; readings that arrive mid-drain join the next batch.
+        spool.append(change.to_write if change else rates)
+        if change:
+            store.commit(change)
+        if drain_task is None or drain_task.done():
+            drain_task = asyncio.create_task(asyncio.to_thread(_drain_spool, spool))
+
+    service = ScraperService(
+        interval=interval,
+        on_rates=handle_rates,
+        max_context_uses=max_context_uses,
+        port=port,
+        concurrent=concurrent,
+        providers=providers,
+        corridors=corridors,
+        concurrency=concurrency,
+        scheduler=Scheduler.load() if adaptive else None,
+        budget=budget,
+        persist_schedule=not dry_run,
+        on_report=(
+            (lambda report: _write_report(report, report_path, metrics_path))
+            if report_path or metrics_path
+            else None
+        ),
+    )
+    try:
+        asyncio.run(service.serve())
+    except KeyboardInterrupt:
+        print("Scraper service stopped.")
+    return 0
 
 
 def main(argv: List[str] | None = None) -> int:
@@ -53,12 +252,135 @@ def main(argv: List[str] | None = None) -> int:
         action="store_true",
         help="Collect rates but skip inserts.",
     )
+    parser.add_argument(
+        "--drain",
+        action="store_true",
+        help="Flush rows left in the local spool by earlier runs to Supabase.",
+    )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="Scrape providers one after another instead of concurrently.",
+    )
+    parser.add_argument(
+        "--providers",
+        help="Comma-separated providers to scrape (default: all), e.g. CIMB,WISE.",
+    )
+    parser.add_argument(
+        "--corridors",
+        help="Comma-separated currency pairs to scrape, e.g. SGD-MYR,SGD-IDR "
+        "(default: CORRIDORS or BASE_CURRENCY-TARGET_CURRENCY).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Maximum provider pages loaded at once (default: SCRAPE_CONCURRENCY).",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Keep a warm browser running and scrape every --interval seconds.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=60.0,
+        help="Seconds between scrapes in --serve mode (default: 60).",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="Local port for the --serve health and trigger endpoints (default: 8765).",
+    )
+    parser.add_argument(
+        "--report",
+        metavar="PATH",
+        help="Write a JSON run report (stage timings, per-provider outcomes, "
+        "selector positions and bytes) to PATH; rewritten after every run in --serve mode.",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="Write the run's metrics in Prometheus textfile-collector format to PATH.",
+    )
+    parser.add_argument(
+        "--only-changed",
+        action="store_true",
+        help="Only write readings whose rate moved since the last write "
+        "(last written rates are kept in LAST_RATES_PATH).",
+    )
+    parser.add_argument(
+        "--heartbeat",
+        type=float,
+        default=3600.0,
+        metavar="SECONDS",
+        help="With --only-changed, still write an unchanged reading once the last "
+        "write is this old; 0 disables heartbeats (default: 3600).",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Only scrape providers that are due, polling fast-moving, cheap ones more "
+        "often than slow or expensive ones (state kept in SCHEDULER_STATE_PATH).",
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        metavar="SECONDS",
+        help="With --adaptive, estimated scrape seconds a run may spend; most overdue "
+        "jobs go first (default: SCHEDULE_BUDGET_SECONDS, 0 for no limit).",
+    )
+    parser.add_argument(
+        "--max-context-uses",
+        type=int,
+        default=20,
+        help="Recycle a provider's browser context after this many scrapes (default: 20).",
+    )
 
     args = parser.parse_args(argv)
+    providers = _parse_providers(args.providers)
+    try:
+        get_providers(providers)
+        corridors = get_corridors(args.corridors) if args.corridors else None
+    except ValueError as exc:
+        parser.error(str(exc))
 
     exit_code = 0
-    if args.scrape:
-        exit_code = _scrape_and_insert(dry_run=args.dry_run)
+    drain_only = args.drain and not args.scrape
+    if args.serve and not drain_only:
+        return _serve(
+            interval=args.interval,
+            port=args.port,
+            max_context_uses=args.max_context_uses,
+            dry_run=args.dry_run,
+            concurrent=not args.sequential,
+            providers=providers,
+            corridors=corridors,
+            concurrency=args.concurrency,
+            report_path=args.report,
+            metrics_path=args.metrics,
+            only_changed=args.only_changed,
+            heartbeat=_heartbeat(args.heartbeat),
+            adaptive=args.adaptive,
+            budget=args.budget,
+        )
+    with run_report() as report:
+        if drain_only:
+            exit_code = _drain_spool(RateSpool())
+        elif args.scrape:
+            exit_code = _scrape_and_insert(
+                dry_run=args.dry_run,
+                concurrent=not args.sequential,
+                providers=providers,
+                corridors=corridors,
+                concurrency=args.concurrency,
+                only_changed=args.only_changed,
+                heartbeat=_heartbeat(args.heartbeat),
+                adaptive=args.adaptive,
+                budget=args.budget,
+            )
+    _write_report(report, args.report, args.metrics)
 
     return exit_code
 
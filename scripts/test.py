@@ -14,6 +14,26 @@ def run_command(command: list[str], cwd: Path) -> int:
     return process.returncode
 
 
+def run_python_checks(repo_root: Path, bench_scale: float = 1.0, replay: bool = True) -> int:
+    """Run each Python check in turn; return the first non-zero exit code.
+
+    ``bench_scale`` multiplies the import-time budgets, for slow runners.
+    ``replay`` scrapes the HAR fixtures offline, which needs Chromium installed.
+    """
+    checks = [
+        # Benchmarks run once as tests here; time them with --benchmark-only.
+        [sys.executable, "-m", "pytest", "-q", "--benchmark-disable", "scripts/tests"],
+        [sys.executable, "-m", "scripts.bench", "imports", "--scale", str(bench_scale)],
+    ]
+    if replay:
+        checks.append([sys.executable, "-m", "scripts.bench", "replay", "--repeat", "1"])
+    for command in checks:
+        code = run_command(command, cwd=repo_root)
+        if code != 0:
+            return code
+    return 0
+
+
 def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser(description="Run automated tests.")
     parser.add_argument(
@@ -21,10 +41,32 @@ def main(argv: list[str] | None = None) -> int:
         default="test",
         help="npm script to execute (default: test)",
     )
+    parser.add_argument(
+        "--python",
+        action="store_true",
+        help=(
+            "Run the Python test suite under scripts/tests, the import-time "
+            "budgets and the offline scrape replay instead of an npm script."
+        ),
+    )
+    parser.add_argument(
+        "--bench-scale",
+        type=float,
+        default=1.0,
+        help="Multiply the import-time budgets, e.g. 2 on slow CI runners (default: 1).",
+    )
+    parser.add_argument(
+        "--skip-replay",
+        action="store_true",
+        help="Skip the offline scrape replay, e.g. where Chromium is not installed.",
+    )
     args = parser.parse_args(argv)
 
     repo_root = Path(__file__).resolve().parents[1]
-    code = run_command(["npm", "run", args.script], cwd=repo_root)
+    if args.python:
+        code = run_python_checks(repo_root, args.bench_scale, replay=not args.skip_replay)
+    else:
+        code = run_command(["npm", "run", args.script], cwd=repo_root)
     if code != 0:
         print(f"Test command exited with code {code}", file=sys.stderr)
     return code
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from scripts.utils.analytics import (
+    best_hour_to_convert,
+    best_provider,
+    hourly_profile,
+    pivot,
+    rolling_stats,
+    spread_bps,
+)
+from scripts.utils.history_store import HistoryArrays, parse_timestamp
+
+
+def history(*readings: tuple) -> HistoryArrays:
+    """Build history from ``(retrieved_at, platform, rate)`` readings."""
+    return HistoryArrays(
+        timestamps=np.array([parse_timestamp(when) for when, _, _ in readings], dtype=np.int64),
+        platforms=np.array([platform for _, platform, _ in readings]),
+        rates=np.array([rate for _, _, rate in readings], dtype=np.float64),
+    )
+
+
+SAMPLE = history(
+    ("2026-10-17T09:00:00", "WISE", 3.25),
+    ("2026-10-17T09:00:00", "CIMB", 3.20),
+    ("2026-10-17T10:00:00", "WISE", 3.24),
+    ("2026-10-17T10:00:00", "CIMB", 3.26),
+    ("2026-10-17T11:00:00", "CIMB", 3.21),
+)
+
+
+def test_pivot_fills_missing_readings_with_nan() -> None:
+    matrix = pivot(SAMPLE)
+
+    assert matrix.platforms.tolist() == ["CIMB", "WISE"]
+    assert len(matrix.timestamps) == 3
+    np.testing.assert_array_equal(matrix.column("WISE"), [3.25, 3.24, np.nan])
+    with pytest.raises(KeyError):
+        matrix.column("WESTERNUNION")
+
+
+def test_best_provider_skips_missing_readings() -> None:
+    timestamps, platforms, rates = best_provider(pivot(SAMPLE))
+
+    assert platforms.tolist() == ["WISE", "CIMB", "CIMB"]
+    assert rates.tolist() == [3.25, 3.26, 3.21]
+    assert len(timestamps) == 3
+
+
+def test_spread_against_a_reference_and_across_providers() -> None:
+    matrix = pivot(SAMPLE)
+
+    np.testing.assert_allclose(
+        spread_bps(matrix, "WISE", "CIMB"), [156.25, -61.349693, np.nan], rtol=1e-6
+    )
+    np.testing.assert_allclose(spread_bps(matrix), [156.25, 61.728395, 0.0], rtol=1e-6)
+
+
+def test_rolling_stats_match_a_direct_window() -> None:
+    rates = [3.20, 3.22, 3.21, 3.25, 3.24, 3.23]
+    readings = [
+        (f"2026-10-17T{9 + hour:02d}:00:00", "WISE", rate) for hour, rate in enumerate(rates)
+    ]
+    stats = rolling_stats(pivot(history(*readings)), "WISE", window=3)
+
+    assert np.isnan(stats.mean[:2]).all() and np.isnan(stats.volatility_bps[:3]).all()
+    np.testing.assert_allclose(
+        stats.mean[2:], [np.mean(rates[i - 2 : i + 1]) for i in range(2, 6)]
+    )
+    np.testing.assert_allclose(
+        stats.std[2:], [np.std(rates[i - 2 : i + 1], ddof=1) for i in range(2, 6)]
+    )
+    returns = np.diff(np.log(rates)) * 10_000
+    np.testing.assert_allclose(
+        stats.volatility_bps[3:], [np.std(returns[i - 3 : i], ddof=1) for i in range(3, 6)]
+    )
+    with pytest.raises(ValueError):
+        rolling_stats(pivot(SAMPLE), "WISE", window=1)
+
+
+def test_hours_of_day_are_singapore_hours() -> None:
+    # 09:00 in Singapore is 01:00 UTC.
+    readings = history(
+        ("2026-10-17T09:15:00", "WISE", 3.30),
+        ("2026-10-18T09:45:00+08:00", "WISE", 3.28),
+        ("2026-10-17T15:00:00", "WISE", 3.20),
+    )
+
+    profile = hourly_profile(readings)
+
+    assert profile[9] == pytest.approx(3.29) and profile[15] == pytest.approx(3.20)
+    assert np.isnan(profile[1])
+    assert best_hour_to_convert(readings) == 9
+    assert best_hour_to_convert(readings, tz_offset_hours=0) == 1
+    assert best_hour_to_convert(readings, platform="CIMB") is None
@@ -0,0 +1,129 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from scripts.utils import asset_cache
+from scripts.utils.asset_cache import AssetCache, CachedAsset, _storable
+
+URL = "https://wise.com/static/app.js"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(asset_cache, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path: Path, clock: FakeClock):
+    cache = AssetCache(tmp_path / "assets.sqlite3", max_bytes=10)
+    yield cache
+    cache.close()
+
+
+def urls(cache: AssetCache) -> list:
+    return [row[0] for row in cache._connection.execute("SELECT url FROM assets ORDER BY url")]
+
+
+def test_least_recently_used_entries_are_evicted_first(
+    cache: AssetCache, clock: FakeClock
+) -> None:
+    for name in ("a", "b", "c"):
+        cache.put(name, 200, {}, b"123")
+        clock.now += 1
+    cache.get("a")  # "b" is now the least recently used
+    clock.now += 1
+
+    cache.put("d", 200, {}, b"1234")
+
+    assert urls(cache) == ["a", "c", "d"]
+    assert cache.size() == 10
+
+
+def test_body_larger_than_the_cache_is_not_stored(cache: AssetCache) -> None:
+    cache.put("small", 200, {}, b"123")
+
+    cache.put("huge", 200, {}, b"x" * 11)
+
+    assert urls(cache) == ["small"]
+
+
+def test_stored_headers_drop_the_wire_encoding(cache: AssetCache) -> None:
+    cache.put(URL, 200, {"content-encoding": "br", "content-length": "3", "etag": '"v1"'}, b"abc")
+
+    entry = cache.get(URL)
+
+    assert entry is not None and entry.headers == {"etag": '"v1"'} and entry.body == b"abc"
+
+
+@pytest.mark.parametrize(
+    ("control", "age", "fresh"),
+    [
+        ("public, max-age=600", 599, True),
+        ("public, max-age=600", 600, False),
+        ("max-age=600, no-cache", 0, False),
+        ("", 0, False),
+    ],
+)
+def test_freshness_follows_max_age_and_no_cache(control: str, age: int, fresh: bool) -> None:
+    entry = CachedAsset(200, {"cache-control": control}, b"", stored_at=1000.0)
+
+    assert entry.fresh(1000.0 + age) is fresh
+
+
+def test_revalidation_refreshes_validators_and_restarts_max_age(
+    cache: AssetCache, clock: FakeClock
+) -> None:
+    headers = {"cache-control": "max-age=60", "etag": '"v1"', "last-modified": "Fri, 16 Oct"}
+    cache.put(URL, 200, headers, b"abc")
+    clock.now += 120
+    stale = cache.get(URL)
+    assert stale is not None and not stale.fresh(clock.now)
+    assert stale.validators() == {"if-none-match": '"v1"', "if-modified-since": "Fri, 16 Oct"}
+
+    cache.refresh(URL, {"etag": '"v2"', "content-length": "0"})
+
+    entry = cache.get(URL)
+    assert entry is not None and entry.fresh(clock.now) and entry.body == b"abc"
+    assert entry.validators()["if-none-match"] == '"v2"'
+    assert "content-length" not in entry.headers
+
+
+def test_entries_survive_reopening_the_database(tmp_path: Path, clock: FakeClock) -> None:
+    path = tmp_path / "assets.sqlite3"
+    first = AssetCache(path)
+    first.put(URL, 200, {"etag": '"v1"'}, b"abc")
+    first.close()
+
+    reopened = AssetCache(path)
+    try:
+        entry = reopened.get(URL)
+    finally:
+        reopened.close()
+
+    assert entry is not None and entry.body == b"abc"
+
+
+@pytest.mark.parametrize(
+    ("status", "headers", "storable"),
+    [
+        (200, {"cache-control": "max-age=60"}, True),
+        (200, {"etag": '"v1"'}, True),
+        (200, {"cache-control": "no-store", "etag": '"v1"'}, False),
+        (200, {"cache-control": "private, max-age=60"}, False),
+        (200, {}, False),
+        (206, {"cache-control": "max-age=60"}, False),
+    ],
+)
+def test_only_cacheable_responses_are_stored(status: int, headers: dict, storable: bool) -> None:
+    assert _storable(status, headers) is storable
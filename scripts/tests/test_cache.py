@@ -0,0 +1,90 @@
+import asyncio
+from typing import List
+
+from scripts.utils.cache import CacheStats, TTLCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def counting_loader(calls: List[str], value: str):
+    def load() -> str:
+        calls.append(value)
+        return value
+
+    return load
+
+
+def test_hits_are_served_until_the_ttl_expires() -> None:
+    clock = FakeClock()
+    cache: TTLCache[str] = TTLCache(ttl=60.0, clock=clock)
+    calls: List[str] = []
+
+    assert cache.get_or_load("rates", counting_loader(calls, "first")) == "first"
+    clock.now += 59.9
+    assert cache.get_or_load("rates", counting_loader(calls, "second")) == "first"
+    clock.now += 0.1
+    assert cache.get_or_load("rates", counting_loader(calls, "third")) == "third"
+
+    assert calls == ["first", "third"]
+    assert cache.stats() == CacheStats(hits=1, misses=2, size=1)
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache: TTLCache[str] = TTLCache(maxsize=2, clock=FakeClock())
+    calls: List[str] = []
+    cache.get_or_load("a", counting_loader(calls, "a"))
+    cache.get_or_load("b", counting_loader(calls, "b"))
+    cache.get_or_load("a", counting_loader(calls, "a"))  # "b" is now the oldest
+
+    cache.get_or_load("c", counting_loader(calls, "c"))
+    cache.get_or_load("a", counting_loader(calls, "a"))
+    cache.get_or_load("b", counting_loader(calls, "b"))
+
+    assert calls == ["a", "b", "c", "b"]
+
+
+def test_zero_ttl_disables_caching() -> None:
+    cache: TTLCache[str] = TTLCache(ttl=0, clock=FakeClock())
+    calls: List[str] = []
+
+    cache.get_or_load("rates", counting_loader(calls, "first"))
+    cache.get_or_load("rates", counting_loader(calls, "second"))
+
+    assert calls == ["first", "second"]
+    assert cache.stats().size == 0
+
+
+def test_invalidate_drops_entries_and_keeps_counters() -> None:
+    cache: TTLCache[str] = TTLCache(clock=FakeClock())
+    calls: List[str] = []
+    cache.get_or_load("rates", counting_loader(calls, "first"))
+
+    cache.invalidate()
+
+    assert cache.get_or_load("rates", counting_loader(calls, "second")) == "second"
+    assert cache.stats() == CacheStats(hits=0, misses=2, size=1)
+
+
+def test_load_that_raced_an_invalidate_is_not_cached() -> None:
+    cache: TTLCache[str] = TTLCache(clock=FakeClock())
+
+    async def stale_load() -> str:
+        cache.invalidate()  # a write lands while the read is in flight
+        return "stale"
+
+    async def fresh_load() -> str:
+        return "fresh"
+
+    async def run() -> List[str]:
+        return [
+            await cache.aget_or_load("rates", stale_load),
+            await cache.aget_or_load("rates", fresh_load),
+        ]
+
+    assert asyncio.run(run()) == ["stale", "fresh"]
@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from scripts.utils.change_detection import LastKnownRates, LastRate
+from scripts.utils.models import SGT, Rate
+from scripts.utils.providers import Corridor
+
+START = datetime(2026, 10, 17, 9, 0, tzinfo=SGT)
+HEARTBEAT = timedelta(hours=6)
+
+
+def reading(rate: str, hours: float = 0, platform: str = "WISE", target: str = "MYR") -> Rate:
+    return Rate.parse(platform, rate, START + timedelta(hours=hours), Corridor("SGD", target))
+
+
+def test_first_and_moved_readings_are_changed(tmp_path: Path) -> None:
+    store = LastKnownRates(tmp_path / "last_rates.json")
+    first = store.classify([reading("3.2405")], HEARTBEAT)
+    assert len(first.changed) == 1
+    store.commit(first)
+
+    result = store.classify(
+        [reading("3.2410", hours=1), reading("3.2405", hours=1, target="IDR")], HEARTBEAT
+    )
+
+    assert [rate.target_currency for rate in result.changed] == ["MYR", "IDR"]
+    assert not result.suppressed and not result.heartbeats
+
+
+def test_unchanged_readings_are_suppressed_and_only_bump_seen_at(tmp_path: Path) -> None:
+    store = LastKnownRates(tmp_path / "last_rates.json")
+    store.commit(store.classify([reading("3.2405")]))
+
+    result = store.classify([reading("3.24050", hours=1)], HEARTBEAT)
+    store.commit(result)
+
+    assert len(result.suppressed) == 1 and not result.to_write
+    entry = store.entries["WISE SGD-MYR"]
+    assert entry.written_at == "2026-10-17T09:00:00"
+    assert entry.seen_at == "2026-10-17T10:00:00"
+    assert entry.suppressed == 1
+
+
+def test_unchanged_reading_is_written_once_the_heartbeat_is_due(tmp_path: Path) -> None:
+    store = LastKnownRates(tmp_path / "last_rates.json")
+    store.commit(store.classify([reading("3.2405")]))
+
+    early = store.classify([reading("3.2405", hours=5.9)], HEARTBEAT)
+    due = store.classify([reading("3.2405", hours=6)], HEARTBEAT)
+    store.commit(due)
+
+    assert len(early.suppressed) == 1
+    assert len(due.heartbeats) == 1 and due.to_write == due.heartbeats
+    assert store.entries["WISE SGD-MYR"] == LastRate(
+        "3.2405", "2026-10-17T15:00:00", "2026-10-17T15:00:00"
+    )
+    # Without a heartbeat, unchanged readings are never written.
+    assert store.classify([reading("3.2405", hours=48)]).suppressed
+
+
+def test_state_survives_a_reload(tmp_path: Path) -> None:
+    path = tmp_path / "last_rates.json"
+    store = LastKnownRates(path)
+    store.commit(store.classify([reading("3.2405")]))
+    store.commit(store.classify([reading("3.2405", hours=1)], HEARTBEAT))
+
+    reloaded = LastKnownRates(path)
+
+    assert reloaded.entries == store.entries
+    assert reloaded.classify([reading("3.2405", hours=2)], HEARTBEAT).suppressed
+
+
+def test_unreadable_state_is_ignored(tmp_path: Path) -> None:
+    path = tmp_path / "last_rates.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    store = LastKnownRates(path)
+
+    assert store.entries == {}
+    assert store.classify([reading("3.2405")]).changed
+
+
+def test_seed_only_fills_missing_keys(tmp_path: Path) -> None:
+    store = LastKnownRates(tmp_path / "last_rates.json")
+    store.commit(store.classify([reading("3.2405")]))
+    rows = [
+        {"platform": "WISE", "exchange_rate": "9.9", "retrieved_at": "2026-10-17T08:00:00"},
+        {"platform": "CIMB", "exchange_rate": "3.2", "retrieved_at": "2026-10-17T08:00:00"},
+        {"platform": "CIMB", "exchange_rate": "", "retrieved_at": "2026-10-17T08:00:00"},
+    ]
+
+    assert store.missing([reading("3.2", platform="CIMB")])
+    assert store.seed(rows) == 1
+    assert store.entries["WISE SGD-MYR"].rate == "3.2405"
+    assert store.classify([reading("3.2", platform="CIMB")]).suppressed
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from scripts.utils.health import CLOSED, HALF_OPEN, OPEN, CircuitBreakers
+from scripts.utils.models import SGT
+
+START = datetime(2026, 10, 17, 9, 0, tzinfo=SGT)
+HOUR = timedelta(hours=1)
+
+
+def breakers(path=None) -> CircuitBreakers:
+    return CircuitBreakers(path, threshold=3, cooldown=3600, max_cooldown=3 * 3600)
+
+
+def fail(health: CircuitBreakers, runs: int, now: datetime = START) -> None:
+    for _ in range(runs):
+        health.record("CIMB", ok=False, error="timeout", now=now)
+
+
+def test_breaker_opens_after_threshold_failed_runs() -> None:
+    health = breakers()
+
+    fail(health, 2)
+    assert health.state("CIMB", START) == CLOSED and health.allow("CIMB", START)
+
+    fail(health, 1)
+    assert health.state("CIMB", START) == OPEN
+    assert health.retry_at("CIMB") == START + HOUR
+    assert not health.allow("CIMB", START + HOUR / 2)
+
+
+def test_half_open_breaker_lets_one_probe_through_per_run() -> None:
+    health = breakers()
+    fail(health, 3)
+
+    assert health.state("CIMB", START + HOUR) == HALF_OPEN
+    assert health.allow("CIMB", START + HOUR)
+    assert not health.allow("CIMB", START + HOUR)
+    # The next run loads its breakers afresh and gets its own probe.
+    next_run = breakers()
+    next_run.providers = health.providers
+    assert next_run.allow("CIMB", START + HOUR)
+
+
+def test_failed_probe_reopens_with_a_doubled_capped_cooldown() -> None:
+    health = breakers()
+    fail(health, 3)
+
+    probe_at = START + HOUR
+    assert health.allow("CIMB", probe_at)
+    fail(health, 1, probe_at)
+
+    assert health.state("CIMB", probe_at) == OPEN
+    assert health.retry_at("CIMB") == probe_at + 2 * HOUR
+
+    probe_at += 2 * HOUR
+    assert health.allow("CIMB", probe_at)
+    fail(health, 1, probe_at)
+    assert health.retry_at("CIMB") == probe_at + 3 * HOUR
+
+
+def test_successful_probe_closes_the_breaker() -> None:
+    health = breakers()
+    fail(health, 3)
+    assert health.allow("CIMB", START + HOUR)
+
+    health.record("CIMB", ok=True, now=START + HOUR)
+
+    assert health.state("CIMB", START + HOUR) == CLOSED
+    entry = health.providers["CIMB"]
+    assert (entry.failures, entry.trips, entry.last_error) == (0, 0, None)
+    fail(health, 2)
+    assert health.state("CIMB", START + HOUR) == CLOSED
+
+
+def test_state_survives_a_reload(tmp_path: Path) -> None:
+    path = tmp_path / "provider_health.json"
+    health = breakers(path)
+    fail(health, 3)
+    health.save()
+
+    reloaded = CircuitBreakers.load(path)
+
+    assert reloaded.providers == health.providers
+    assert reloaded.state("CIMB", START) == OPEN
+
+
+def test_unreadable_state_leaves_breakers_closed(tmp_path: Path) -> None:
+    path = tmp_path / "provider_health.json"
+    path.write_text("[", encoding="utf-8")
+
+    assert CircuitBreakers.load(path).state("CIMB", START) == CLOSED
@@ -0,0 +1,93 @@
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import List, Optional
+
+import pytest
+
+from scripts.utils import supabase_client
+from scripts.utils.history_store import HistoryStore, parse_timestamp
+
+
+def reading(retrieved_at: str, rate: str, platform: str = "WISE") -> dict:
+    return {
+        "platform": platform,
+        "base_currency": "SGD",
+        "target_currency": "MYR",
+        "retrieved_at": retrieved_at,
+        "exchange_rate": rate,
+    }
+
+
+def test_naive_timestamps_are_singapore_time() -> None:
+    assert parse_timestamp("2026-10-17T08:00:00") == parse_timestamp("2026-10-17T00:00:00Z")
+    assert parse_timestamp("2026-10-17T08:00:00") == parse_timestamp(
+        "2026-10-17T08:00:00+08:00"
+    )
+
+
+def test_daily_stats_bucket_by_singapore_day(tmp_path: Path) -> None:
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    store.add_rows(
+        [
+            reading("2026-10-17T00:30:00", "3.20"),
+            reading("2026-10-17T23:30:00", "3.30"),
+            reading("2026-10-18T07:59:00", "3.40"),
+        ]
+    )
+
+    stats = store.daily_stats()
+
+    assert [(stat.day, stat.readings) for stat in stats] == [
+        ("2026-10-17", 2),
+        ("2026-10-18", 1),
+    ]
+
+
+def test_range_bounds_are_real_epochs(tmp_path: Path) -> None:
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    store.add_rows([reading("2026-10-17T09:00:00", "3.20")])
+
+    start = parse_timestamp("2026-10-17T01:00:00Z")
+    assert len(store.query_range(start=start, end=start + 1)) == 1
+
+
+def test_stores_from_before_real_epochs_are_reparsed(tmp_path: Path) -> None:
+    path = tmp_path / "history.sqlite3"
+    HistoryStore(path).add_rows([reading("2026-10-17T09:00:00", "3.20")])
+    with closing(sqlite3.connect(path)) as connection, connection:
+        # Rewind to a version 0 store, which read naive values as UTC.
+        connection.execute("UPDATE rates SET ts = ts + 8 * 3600")
+        connection.execute("PRAGMA user_version = 0")
+
+    store = HistoryStore(path)
+
+    assert store.query_range().timestamps.tolist() == [parse_timestamp("2026-10-17T09:00:00")]
+
+
+def test_sync_picks_up_rows_spooled_behind_the_cursor(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    remote = [
+        reading("2026-10-17T09:00:00", "3.20"),
+        reading("2026-10-17T10:00:00", "3.21"),
+    ]
+    cursors: List[Optional[str]] = []
+
+    def iter_row_batches(columns, batch_size, after, descending):
+        cursors.append(after)
+        yield sorted(
+            (row for row in remote if after is None or row["retrieved_at"] > after),
+            key=lambda row: row["retrieved_at"],
+        )
+
+    monkeypatch.setattr(supabase_client, "iter_row_batches", iter_row_batches)
+    store = HistoryStore(tmp_path / "history.sqlite3")
+    assert store.sync(overlap=3600) == 2
+
+    # A row scraped at 09:30 reaches Supabase from the spool after the 10:00 one.
+    remote.append(reading("2026-10-17T09:30:00", "3.25", platform="CIMB"))
+
+    assert store.sync(overlap=3600) == 1
+    assert cursors == [None, "2026-10-17T09:00:00"]
+    assert len(store.query_range(platform="CIMB")) == 1
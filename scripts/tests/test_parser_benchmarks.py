@@ -0,0 +1,100 @@
+"""Rate-parser microbenchmarks (pytest-benchmark).
+
+The regular test run passes ``--benchmark-disable``, which runs each body
+once as a correctness check; time them with::
+
+    python -m pytest scripts/tests/test_parser_benchmarks.py --benchmark-only
+
+Page snapshots come from the committed HAR fixtures, which are hand-written
+synthetic pages, plus one generated page of about 4 MB with the rate buried
+in the middle.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import List, Optional, Tuple
+
+import pytest
+
+from scripts.bench import HAR_DIR
+from scripts.utils.providers import PROVIDERS, Corridor
+from scripts.utils.rate_parser import extract_rate, marker_windows, search_patterns
+
+pytest.importorskip("pytest_benchmark")
+
+# Selector texts seen on provider pages, with the rate each should parse to.
+PARSE_SAMPLES: List[Tuple[str, str, Optional[str]]] = [
+    ("1 SGD = 3.2405 MYR", "MYR", "3.2405"),
+    ("SGD 1.00 = MYR 3.2405", "MYR", "3.2405"),
+    ("3.2405", "MYR", "3.2405"),
+    ("1 SGD = 12,345.60 IDR", "IDR", "12345.60"),
+    ("1 SGD = 3,2405 MYR", "MYR", "3.2405"),
+    # Templates rendered before their XHR fills in the rate.
+    ("SGD 1.00 = MYR ", "MYR", None),
+    ("1 SGD =", "MYR", None),
+]
+
+CORRIDOR = Corridor("SGD", "MYR")
+TEMPLATE = PROVIDERS["WISE"].fallback_patterns[0]
+PATTERN = CORRIDOR.fill(TEMPLATE)
+
+
+def legacy_extract(text: str, target: str) -> Optional[str]:
+    """The per-call regexes the parser replaced, kept as the comparison point."""
+    match = re.search(rf"{re.escape(target)}\s*(\d+(?:[.,]\d+)*)", text, flags=re.IGNORECASE)
+    if match:
+        return match.group(1).replace(",", "")
+    matches = re.findall(r"\d+(?:[.,]\d+)*", text)
+    return matches[-1].replace(",", "") if matches else None
+
+
+def html_snapshots() -> List[Tuple[str, str]]:
+    """Return ``(name, html)`` for each HAR fixture's page and one generated large page."""
+    snapshots = []
+    for har in sorted(HAR_DIR.glob("*.har")):
+        entries = json.loads(har.read_text(encoding="utf-8"))["log"]["entries"]
+        for entry in entries:
+            content = entry["response"].get("content", {})
+            if "html" in content.get("mimeType", "") and content.get("text"):
+                if content.get("encoding") != "base64":
+                    snapshots.append((har.stem, content["text"]))
+                break
+    filler = '<div class="row"><span>Lorem ipsum 12.34 dolor</span></div>\n' * 35_000
+    html = f"<html><body>{filler}<p>1 SGD = 3.2405 MYR</p>{filler}</body></html>"
+    snapshots.append((f"synthetic-{len(html) / 1_048_576:.0f}mb", html))
+    return snapshots
+
+
+SNAPSHOTS = html_snapshots()
+SNAPSHOT_IDS = [name for name, _ in SNAPSHOTS]
+
+
+@pytest.mark.benchmark(group="selector text")
+@pytest.mark.parametrize(("text", "target", "expected"), PARSE_SAMPLES)
+def test_extract_rate(benchmark, text: str, target: str, expected: Optional[str]) -> None:
+    assert benchmark(extract_rate, text, target) == expected
+
+
+@pytest.mark.benchmark(group="selector text")
+@pytest.mark.parametrize(("text", "target", "expected"), PARSE_SAMPLES[:3])
+def test_legacy_extract(benchmark, text: str, target: str, expected: Optional[str]) -> None:
+    assert benchmark(legacy_extract, text, target) == expected
+
+
+@pytest.mark.benchmark(group="fallback page")
+@pytest.mark.parametrize("html", [html for _, html in SNAPSHOTS], ids=SNAPSHOT_IDS)
+def test_full_page_scan(benchmark, html: str) -> None:
+    benchmark(re.search, PATTERN, html, flags=re.IGNORECASE)
+
+
+@pytest.mark.benchmark(group="fallback page")
+@pytest.mark.parametrize("html", [html for _, html in SNAPSHOTS], ids=SNAPSHOT_IDS)
+def test_slice_scan_agrees_with_full_scan(benchmark, html: str) -> None:
+    # Slicing runs in the browser (MARKER_SLICES_JS), so only the slice search is timed.
+    slices = marker_windows(html, CORRIDOR.base)
+
+    found = benchmark(search_patterns, slices, [(TEMPLATE, PATTERN)])
+
+    assert bool(found) == bool(re.search(PATTERN, html, flags=re.IGNORECASE))
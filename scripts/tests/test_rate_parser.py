@@ -0,0 +1,84 @@
+"""Tests for scripts.utils.rate_parser."""
+
+from __future__ import annotations
+
+import pytest
+
+from scripts.utils.rate_parser import extract_rate, normalize_number
+
+
+@pytest.mark.parametrize(
+    ("text", "target", "expected"),
+    [
+        ("1 SGD = 3.2405 MYR", "MYR", "3.2405"),
+        ("SGD 1.00 = MYR 3.2405", "MYR", "3.2405"),
+        ("3.2405", "MYR", "3.2405"),
+        ("1 SGD = 12,345.60 IDR", "IDR", "12345.60"),
+        ("1 SGD = 3,2405 MYR", "MYR", "3.2405"),
+    ],
+)
+def test_extract_rate_reads_rendered_rates(text: str, target: str, expected: str) -> None:
+    assert extract_rate(text, target, "SGD") == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        # Rendered before the rate XHR fills the template in.
+        "SGD 1.00 = MYR ",
+        "SGD 1.00 = MYR",
+        "1 SGD =",
+        "1 SGD",
+        "",
+        None,
+    ],
+)
+def test_extract_rate_ignores_half_rendered_templates(text: str | None) -> None:
+    assert extract_rate(text, "MYR", "SGD") is None
+
+
+@pytest.mark.parametrize(
+    ("token", "expected"),
+    [
+        # Both separators: the last one is the decimal point.
+        ("12,345.6", "12345.6"),
+        ("12.345,6", "12345.6"),
+        ("1,234,567.89", "1234567.89"),
+        ("1.234.567,89", "1234567.89"),
+        ("1.234,5,6", None),
+        # A repeated lone separator groups thousands.
+        ("1,234,567", "1234567"),
+        ("1.234.567", "1234567"),
+        # A lone dot is a decimal point, even before three digits.
+        ("3.240", "3.240"),
+        ("12.345", "12.345"),
+        # A lone comma before exactly three digits groups thousands...
+        ("12,345", "12345"),
+        # ...unless the whole part is too long to be a grouped number.
+        ("1234,567", "1234.567"),
+        # Any other lone comma is a decimal comma.
+        ("3,2405", "3.2405"),
+        ("0,5", "0.5"),
+        # No separators.
+        ("3", "3"),
+        (" 42 ", "42"),
+        ("", None),
+    ],
+)
+def test_normalize_number_resolves_separators(token: str, expected: str | None) -> None:
+    assert normalize_number(token) == expected
+
+
+@pytest.mark.parametrize(
+    ("token", "decimal_comma", "expected"),
+    [
+        ("12,345", True, "12.345"),
+        ("3,2405", False, "32405"),
+        ("12.345", False, "12.345"),
+        ("12.345", True, "12345"),
+    ],
+)
+def test_normalize_number_uses_a_known_locale(
+    token: str, decimal_comma: bool, expected: str
+) -> None:
+    assert normalize_number(token, decimal_comma=decimal_comma) == expected
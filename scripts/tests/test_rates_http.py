@@ -0,0 +1,87 @@
+"""Offline tests for the HTTP fast path against recorded provider payloads."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from dataclasses import replace
+from decimal import Decimal
+from pathlib import Path
+
+import httpx
+
+from scripts.utils.models import now_sgt
+from scripts.utils.providers import PROVIDERS, Corridor
+from scripts.utils.rates_http import (
+    fetch_rates_http,
+    find_rate_value,
+    new_http_client,
+    parse_wise_payload,
+)
+
+FIXTURES = Path(__file__).resolve().parents[1] / "fixtures" / "http"
+SGD_MYR = Corridor("SGD", "MYR")
+ENDPOINT = "https://rates.test"
+
+
+def load(name: str) -> object:
+    return json.loads((FIXTURES / name).read_text(encoding="utf-8"))
+
+
+def test_find_rate_value_skips_amounts_stored_under_value() -> None:
+    assert find_rate_value({"sendAmount": {"value": 1000}, "fx": {"rate": 3.1}}) == "3.1"
+    assert find_rate_value(load("quote_with_amounts.json")) == "3.2405"
+
+
+def test_find_rate_value_prefers_the_shallowest_rate_key() -> None:
+    payload = {"fees": [{"breakdown": {"rate": 0.5}}], "rate": "3.2405"}
+    assert find_rate_value(payload) == "3.2405"
+
+
+def test_find_rate_value_normalizes_decimal_commas() -> None:
+    assert find_rate_value(load("rates_list.json")) == "3.2405"
+
+
+def test_find_rate_value_without_a_rate() -> None:
+    assert find_rate_value(load("no_rate.json")) is None
+
+
+def test_parse_wise_payload_checks_the_corridor() -> None:
+    payload = load("wise_live_sgd_myr.json")
+    assert parse_wise_payload(payload, SGD_MYR) == "3.2405"
+    assert parse_wise_payload(payload, Corridor("SGD", "IDR")) is None
+
+
+def test_fetch_rates_http_replays_recorded_responses() -> None:
+    responses = {
+        "/wise/SGD-MYR": "wise_live_sgd_myr.json",
+        "/cimb/SGD-MYR": "quote_with_amounts.json",
+        "/wu/SGD-MYR": "no_rate.json",
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        name = responses.get(request.url.path)
+        if name is None:
+            return httpx.Response(404)
+        return httpx.Response(200, content=(FIXTURES / name).read_bytes())
+
+    jobs = [
+        (
+            replace(PROVIDERS[platform], rate_endpoint=f"{ENDPOINT}/{path}/{{BASE}}-{{TARGET}}"),
+            SGD_MYR,
+        )
+        for platform, path in (("WISE", "wise"), ("CIMB", "cimb"), ("WESTERNUNION", "wu"))
+    ]
+
+    async def run() -> dict:
+        client = new_http_client(transport=httpx.MockTransport(handler))
+        try:
+            return await fetch_rates_http(jobs, now_sgt(), client=client)
+        finally:
+            await client.aclose()
+
+    rates = asyncio.run(run())
+    assert {key: rate.rate for key, rate in rates.items()} == {
+        ("WISE", SGD_MYR): Decimal("3.2405"),
+        ("CIMB", SGD_MYR): Decimal("3.2405"),
+    }
@@ -0,0 +1,125 @@
+import asyncio
+from typing import Any, List, Optional
+
+import pytest
+
+from scripts.utils import rates_scraper
+from scripts.utils.health import CircuitBreakers
+from scripts.utils.models import Rate, now_sgt
+from scripts.utils.providers import PROVIDERS, Corridor
+from scripts.utils.rates_scraper import _record_health, _scrape_corridors, _wait_for_rate
+from scripts.utils.selector_stats import SelectorStats
+
+MARKUP = '<div class="quote"><span>1 SGD</span><b data-rate>3.2405</b><span>MYR</span></div>'
+PATTERNS = [("pattern", r"1\s*SGD</span><b data-rate>([\d.,]+)")]
+
+
+class FakePage:
+    """Page whose selectors never render; its markup already holds the rate."""
+
+    def __init__(self) -> None:
+        self.polls = 0
+
+    async def evaluate(self, script: str, args: List[Any]) -> Any:
+        if script == rates_scraper.MARKER_SLICES_JS:
+            return [MARKUP]
+        self.polls += 1
+        return [None for _ in args]
+
+
+def wait(page: FakePage, seconds: float, patterns=()) -> Optional[rates_scraper.RateMatch]:
+    async def run() -> Optional[rates_scraper.RateMatch]:
+        deadline = asyncio.get_running_loop().time() + seconds
+        return await _wait_for_rate(page, ["#rate"], deadline, "MYR", "SGD", patterns)
+
+    return asyncio.run(run())
+
+
+def test_selectors_alone_wait_for_the_deadline() -> None:
+    page = FakePage()
+
+    assert wait(page, 0.3) is None
+    assert page.polls > 1
+
+
+def test_learned_fallback_is_searched_on_the_first_poll() -> None:
+    page = FakePage()
+
+    match = wait(page, 30, PATTERNS)
+
+    assert match == rates_scraper.RateMatch("pattern", "3.2405", "3.2405", fallback=True)
+    assert page.polls == 1
+
+
+def test_fallback_first_follows_the_latest_match() -> None:
+    stats = SelectorStats()
+    assert not stats.fallback_first("CIMB")
+
+    stats.record("CIMB", "pattern", fallback=True)
+    assert stats.fallback_first("CIMB")
+
+    stats.record("CIMB", None, fallback=True)
+    assert stats.fallback_first("CIMB")
+
+    stats.record("CIMB", "#rate")
+    assert not stats.fallback_first("CIMB")
+
+
+class FakePool:
+    def __init__(self) -> None:
+        self.acquired: List[str] = []
+        self.released: List[bool] = []
+
+    async def acquire(self, platform: str) -> str:
+        self.acquired.append(platform)
+        return f"{platform} context"
+
+    async def release(self, provider_context: str, healthy: bool) -> None:
+        self.released.append(healthy)
+
+
+@pytest.mark.parametrize(("limit", "expected_peak"), [(3, 3), (1, 1)])
+def test_corridors_load_as_parallel_pages_of_one_context(
+    monkeypatch: pytest.MonkeyPatch, limit: int, expected_peak: int
+) -> None:
+    corridors = [Corridor("SGD", target) for target in ("MYR", "IDR", "INR")]
+    active: List[int] = [0, 0]  # pages loading now, peak
+
+    async def fake_scrape(provider, corridor, provider_context, timestamp, stats=None):
+        assert provider_context == "WISE context"
+        active[0] += 1
+        active[1] = max(active[1], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        if corridor.target == "INR":
+            return None
+        return Rate.parse("WISE", "3.2405", timestamp, corridor)
+
+    monkeypatch.setattr(rates_scraper, "scrape_provider", fake_scrape)
+    pool = FakePool()
+
+    async def run() -> List[Optional[Rate]]:
+        return await _scrape_corridors(
+            pool, PROVIDERS["WISE"], corridors, now_sgt(), asyncio.Semaphore(limit)
+        )
+
+    rates = asyncio.run(run())
+
+    assert [rate is not None for rate in rates] == [True, True, False]
+    assert active[1] == expected_peak
+    assert pool.acquired == ["WISE"] and pool.released == [False]
+
+
+def test_breakers_record_one_outcome_per_provider_per_run() -> None:
+    breakers = CircuitBreakers(threshold=2)
+    corridors = [Corridor("SGD", target) for target in ("MYR", "IDR", "INR")]
+    jobs = [
+        (PROVIDERS[platform], corridor) for platform in ("CIMB", "WISE") for corridor in corridors
+    ]
+    wise_myr = Rate.parse("WISE", "3.2405", now_sgt(), corridors[0])
+
+    _record_health(breakers, jobs, [None, None, None, None, wise_myr, None])
+
+    cimb = breakers.providers["CIMB"]
+    assert (cimb.failures, cimb.opened_at, cimb.last_error) == (1, None, "no rate")
+    assert breakers.providers["WISE"].failures == 0
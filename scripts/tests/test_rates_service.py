@@ -0,0 +1,129 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+
+from scripts.utils import rates_service, supabase_client
+from scripts.utils.cache import TTLCache
+from scripts.utils.supabase_client import ChunkResult
+
+ROW = {"platform": "WISE", "base_currency": "SGD", "target_currency": "MYR", "rate": "3.24"}
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeSupabase:
+    """Counts reads and writes made through ``supabase_client``."""
+
+    def __init__(self) -> None:
+        self.reads: List[str] = []
+        self.writes: List[List[Dict[str, Any]]] = []
+
+    def fetch_rows(self, limit=None, columns="*") -> List[Dict[str, Any]]:
+        self.reads.append(f"rows:{limit}")
+        return [ROW]
+
+    def fetch_latest_rows(self) -> List[Dict[str, Any]]:
+        self.reads.append("latest")
+        return [ROW]
+
+    async def afetch_rows(self, limit=None, columns="*") -> List[Dict[str, Any]]:
+        return self.fetch_rows(limit, columns)
+
+    def insert_rows(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        self.writes.append(rows)
+        return rows
+
+    def upsert_rows(self, rows: List[Dict[str, Any]], chunk_size: int = 500):
+        self.writes.append(rows)
+        return [ChunkResult(0, len(rows), True, 1, 0.0)]
+
+    async def aupsert_rows(self, rows, chunk_size=500, concurrency=4):
+        return self.upsert_rows(rows, chunk_size)
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(rates_service, "_READ_CACHE", TTLCache(ttl=30.0, clock=clock))
+    return clock
+
+
+@pytest.fixture
+def fake(monkeypatch: pytest.MonkeyPatch) -> FakeSupabase:
+    fake = FakeSupabase()
+    for name in (
+        "fetch_rows",
+        "fetch_latest_rows",
+        "afetch_rows",
+        "insert_rows",
+        "upsert_rows",
+        "aupsert_rows",
+    ):
+        monkeypatch.setattr(supabase_client, name, getattr(fake, name))
+    return fake
+
+
+def test_reads_are_cached_per_query_until_the_ttl(clock: FakeClock, fake: FakeSupabase) -> None:
+    rates_service.get_rates(limit=10)
+    rates_service.get_rates(limit=10)
+    rates_service.get_rates(limit=5)
+    rates_service.get_latest_rates()
+    clock.now += 30.0
+    rates_service.get_rates(limit=10)
+
+    assert fake.reads == ["rows:10", "rows:5", "latest", "rows:10"]
+    assert rates_service.cache_stats().hits == 1
+
+
+def test_callers_cannot_mutate_the_cached_list(clock: FakeClock, fake: FakeSupabase) -> None:
+    rates_service.get_rates().clear()
+
+    assert rates_service.get_rates() == [ROW]
+
+
+def test_sync_and_async_reads_share_the_cache(clock: FakeClock, fake: FakeSupabase) -> None:
+    rates_service.get_rates(limit=10)
+
+    assert asyncio.run(rates_service.aget_rates(limit=10)) == [ROW]
+    assert fake.reads == ["rows:10"]
+
+
+@pytest.mark.parametrize(
+    "write",
+    [
+        rates_service.insert_rates,
+        rates_service.upsert_rates,
+        lambda rates: asyncio.run(rates_service.aupsert_rates(rates)),
+    ],
+)
+def test_writes_invalidate_cached_reads(clock: FakeClock, fake: FakeSupabase, write) -> None:
+    rates_service.get_latest_rates()
+
+    write([dict(ROW)])
+    rates_service.get_latest_rates()
+
+    assert fake.reads == ["latest", "latest"]
+    assert len(fake.writes) == 1
+
+
+def test_failed_write_still_invalidates(
+    clock: FakeClock, fake: FakeSupabase, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    rates_service.get_latest_rates()
+
+    def broken(rows, chunk_size=500):
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(supabase_client, "upsert_rows", broken)
+    with pytest.raises(RuntimeError):
+        rates_service.upsert_rates([dict(ROW)])
+    rates_service.get_latest_rates()
+
+    assert fake.reads == ["latest", "latest"]
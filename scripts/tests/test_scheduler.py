@@ -0,0 +1,65 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from scripts.utils.models import Rate, now_sgt
+from scripts.utils.providers import PROVIDERS, Corridor
+from scripts.utils.scheduler import JobState, Scheduler, job_key
+from scripts.utils.telemetry import ProviderResult
+
+CORRIDOR = Corridor("SGD", "MYR")
+JOB = (PROVIDERS["CIMB"], CORRIDOR)
+KEY = job_key("CIMB", CORRIDOR)
+
+
+def result(outcome: str, duration_ms: float = 0.0) -> ProviderResult:
+    return ProviderResult(
+        platform="CIMB",
+        corridor=str(CORRIDOR),
+        source="breaker" if outcome == "skipped" else "browser",
+        outcome=outcome,
+        duration_ms=duration_ms,
+    )
+
+
+def test_retry_delay_doubles_with_consecutive_failures() -> None:
+    scheduler = Scheduler(min_interval=300, max_interval=3600)
+
+    delays = [scheduler.retry_delay(JobState(failures=n)) for n in range(6)]
+
+    assert delays == [300, 300, 600, 1200, 2400, 3600]
+
+
+def test_repeatedly_failing_jobs_are_not_due_until_their_backoff_passes() -> None:
+    scheduler = Scheduler(min_interval=300, max_interval=3600)
+    now = now_sgt()
+    scheduler.jobs[KEY] = JobState(
+        last_attempt_at=(now - timedelta(seconds=900)).isoformat(), failures=3
+    )
+
+    assert scheduler.plan([JOB], now=now).due == []
+    assert scheduler.plan([JOB], now=now + timedelta(seconds=300)).due == [JOB]
+
+
+def test_observe_counts_failures_and_resets_them_on_success() -> None:
+    scheduler = Scheduler()
+    now = now_sgt()
+
+    scheduler.observe([JOB], [], [result("no_rate", 2000)], now=now)
+    scheduler.observe([JOB], [], [result("error", 2000)], now=now)
+    assert scheduler.jobs[KEY].failures == 2
+
+    rate = Rate("CIMB", Decimal("3.2405"), now, "SGD", "MYR")
+    scheduler.observe([JOB], [rate], [result("ok", 2000)], now=now)
+    assert scheduler.jobs[KEY].failures == 0
+
+
+def test_breaker_skipped_jobs_are_not_observed() -> None:
+    scheduler = Scheduler()
+    earlier = now_sgt() - timedelta(hours=1)
+    scheduler.jobs[KEY] = JobState(last_attempt_at=earlier.isoformat(), failures=1, cost=4.0)
+
+    scheduler.observe([JOB], [], [result("skipped")])
+
+    assert scheduler.jobs[KEY] == JobState(
+        last_attempt_at=earlier.isoformat(), failures=1, cost=4.0
+    )
@@ -0,0 +1,82 @@
+from pathlib import Path
+from typing import Any, Dict, List
+
+from scripts.utils.spool import RateSpool
+from scripts.utils.supabase_client import ChunkResult
+
+
+def make_rows(count: int) -> List[Dict[str, Any]]:
+    return [{"platform": "WISE", "exchange_rate": f"3.24{index:02d}"} for index in range(count)]
+
+
+class Writer:
+    """Acknowledge chunks of ``chunk_size`` rows, failing the listed chunk numbers."""
+
+    def __init__(self, chunk_size: int, fail: set) -> None:
+        self.chunk_size = chunk_size
+        self.fail = fail
+        self.calls = 0
+        self.written: List[Dict[str, Any]] = []
+
+    def __call__(self, rows: List[Dict[str, Any]]) -> List[ChunkResult]:
+        results = []
+        for index, start in enumerate(range(0, len(rows), self.chunk_size)):
+            chunk = rows[start : start + self.chunk_size]
+            number = self.calls
+            self.calls += 1
+            ok = number not in self.fail
+            if ok:
+                self.written.extend(chunk)
+            results.append(
+                ChunkResult(index, len(chunk), ok, 1, 0.0, None if ok else "503 unavailable")
+            )
+        return results
+
+
+def test_drain_writes_every_batch_oldest_first(tmp_path: Path) -> None:
+    spool = RateSpool(tmp_path / "spool.sqlite3")
+    spool.append(make_rows(5))
+    writer = Writer(chunk_size=2, fail=set())
+
+    result = spool.drain(writer, batch_size=2)
+
+    assert (result.written, result.remaining, result.batches, result.error) == (5, 0, 3, None)
+    assert writer.written == make_rows(5)
+
+
+def test_failed_batch_stays_spooled_and_is_retried(tmp_path: Path) -> None:
+    spool = RateSpool(tmp_path / "spool.sqlite3")
+    spool.append(make_rows(5))
+
+    first = spool.drain(Writer(chunk_size=2, fail={1}), batch_size=2)
+
+    assert (first.written, first.remaining, first.error) == (2, 3, "503 unavailable")
+    retry = Writer(chunk_size=2, fail=set())
+    second = spool.drain(retry, batch_size=2)
+    assert (second.written, second.remaining) == (3, 0)
+    assert retry.written == make_rows(5)[2:]
+
+
+def test_only_acknowledged_chunks_of_a_batch_are_removed(tmp_path: Path) -> None:
+    spool = RateSpool(tmp_path / "spool.sqlite3")
+    spool.append(make_rows(6))
+
+    result = spool.drain(Writer(chunk_size=2, fail={1}), batch_size=6)
+
+    # Chunks 0 and 2 were acknowledged; chunk 1 failed and must be retried.
+    assert (result.written, result.remaining) == (4, 2)
+    retry = Writer(chunk_size=6, fail=set())
+    spool.drain(retry, batch_size=6)
+    assert retry.written == make_rows(6)[2:4]
+
+
+def test_writer_exceptions_keep_the_whole_batch(tmp_path: Path) -> None:
+    spool = RateSpool(tmp_path / "spool.sqlite3")
+    spool.append(make_rows(3))
+
+    def broken(rows: List[Dict[str, Any]]) -> List[ChunkResult]:
+        raise RuntimeError("connection reset")
+
+    result = spool.drain(broken)
+
+    assert (result.written, result.remaining, result.error) == (0, 3, "connection reset")
@@ -0,0 +1,233 @@
+import asyncio
+import json
+import operator
+from typing import Any, Dict, List, Tuple, Union
+
+import httpx
+import pytest
+from postgrest import AsyncPostgrestClient, SyncPostgrestClient
+from postgrest.utils import AsyncClient, SyncClient
+
+from scripts.utils import supabase_client
+from scripts.utils.config import SUPABASE_TABLE
+
+BASE_URL = "https://stub.supabase.co/rest/v1"
+KEY_COLUMNS = supabase_client.NATURAL_KEY.split(",")
+FILTERS = {"eq": operator.eq, "gt": operator.gt, "lt": operator.lt}
+
+
+class PostgrestStub:
+    """In-memory ``exchange_rates`` table behind PostgREST's select and upsert endpoints.
+
+    ``failures`` is a queue of ``(status, body)`` replies served before any
+    request succeeds; a text body stands in for a gateway error page, a dict
+    for a PostgREST error; ``unique_index=False`` mimics a table the natural-key
+    migration has not been applied to.
+    """
+
+    def __init__(self, unique_index: bool = True) -> None:
+        self.unique_index = unique_index
+        self.failures: List[Tuple[int, Union[str, Dict[str, Any]]]] = []
+        self.rows: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        self.requests: List[httpx.Request] = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        assert request.url.path == f"/rest/v1/{SUPABASE_TABLE}"
+        if request.method == "GET":
+            return self.select(request)
+        if self.failures:
+            status, body = self.failures.pop(0)
+            if isinstance(body, str):
+                return httpx.Response(status, text=body)
+            return httpx.Response(status, json=body)
+        if not self.unique_index:
+            return httpx.Response(
+                400,
+                json={
+                    "code": "42P10",
+                    "message": "there is no unique or exclusion constraint matching "
+                    "the ON CONFLICT specification",
+                },
+            )
+        assert request.url.params["on_conflict"] == supabase_client.NATURAL_KEY
+        assert "resolution=merge-duplicates" in request.headers["prefer"]
+        chunk = json.loads(request.content)
+        for row in chunk:
+            self.rows[tuple(row[column] for column in KEY_COLUMNS)] = row
+        return httpx.Response(201, json=chunk)
+
+    def select(self, request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        rows = list(self.rows.values())
+        for column, value in params.multi_items():
+            if column in ("select", "order", "limit"):
+                continue
+            name, _, operand = value.partition(".")
+            rows = [row for row in rows if FILTERS[name](row[column], operand)]
+        if "order" in params:
+            column, *modifiers = params["order"].split(".")
+            rows.sort(key=lambda row: row[column], reverse="desc" in modifiers)
+        if "limit" in params:
+            rows = rows[: int(params["limit"])]
+        return httpx.Response(200, json=rows)
+
+
+@pytest.fixture
+def stub(monkeypatch: pytest.MonkeyPatch) -> PostgrestStub:
+    stub = PostgrestStub()
+    client = SyncPostgrestClient(BASE_URL)
+    client.session = SyncClient(base_url=BASE_URL, transport=httpx.MockTransport(stub.handle))
+    monkeypatch.setattr(supabase_client, "get_client", lambda: client)
+    async_client = AsyncPostgrestClient(BASE_URL)
+    async_client.session = AsyncClient(
+        base_url=BASE_URL, transport=httpx.MockTransport(stub.handle)
+    )
+    monkeypatch.setattr(supabase_client, "get_async_client", lambda: async_client)
+    return stub
+
+
+@pytest.fixture
+def delays() -> List[float]:
+    return []
+
+
+def make_rows(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "platform": f"provider-{index % 3}",
+            "base_currency": "SGD",
+            "target_currency": "MYR",
+            "rate": "3.2405",
+            "retrieved_at": f"2026-10-17T09:{index // 3:02d}:00+08:00",
+        }
+        for index in range(count)
+    ]
+
+
+def upsert(rows: List[Dict[str, Any]], delays: List[float], **kwargs: Any):
+    return supabase_client.upsert_rows(rows, sleep=delays.append, **kwargs)
+
+
+def test_upsert_reports_one_result_per_chunk(stub: PostgrestStub, delays: List[float]) -> None:
+    results = upsert(make_rows(5), delays, chunk_size=2)
+
+    assert [(result.index, result.rows, result.ok) for result in results] == [
+        (0, 2, True),
+        (1, 2, True),
+        (2, 1, True),
+    ]
+    assert [len(result.data) for result in results] == [2, 2, 1]
+    assert len(stub.requests) == 3 and not delays
+
+
+def test_rerunning_a_batch_does_not_duplicate_rows(
+    stub: PostgrestStub, delays: List[float]
+) -> None:
+    rows = make_rows(4)
+    upsert(rows, delays)
+    upsert(rows, delays)
+
+    assert len(stub.rows) == 4
+
+
+def test_transient_errors_are_retried_with_growing_backoff(
+    stub: PostgrestStub, delays: List[float], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Take the top of each jitter range so the exponential cap is visible.
+    monkeypatch.setattr(supabase_client.random, "uniform", lambda low, high: high)
+    stub.failures = [(503, "<html>Service Unavailable</html>"), (500, {"code": "40P01"})]
+
+    [result] = upsert(make_rows(2), delays, base_delay=0.5, max_delay=8.0)
+
+    assert result.ok and result.attempts == 3
+    assert delays == [0.5, 1.0]
+    assert len(stub.rows) == 2
+
+
+def test_backoff_is_capped_and_chunk_gives_up_after_max_attempts(
+    stub: PostgrestStub, delays: List[float], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(supabase_client.random, "uniform", lambda low, high: high)
+    stub.failures = [(504, "upstream request timeout")] * 4
+
+    first, second = upsert(make_rows(4), delays, chunk_size=2, max_attempts=4, max_delay=1.5)
+
+    assert not first.ok and first.attempts == 4 and "504" in (first.error or "")
+    assert delays == [0.5, 1.0, 1.5]
+    assert second.ok and second.attempts == 1
+
+
+def test_non_transient_errors_are_not_retried(stub: PostgrestStub, delays: List[float]) -> None:
+    stub.failures = [(400, {"code": "23502", "message": "null value in column"})]
+
+    first, second = upsert(make_rows(4), delays, chunk_size=2)
+
+    assert not first.ok and first.attempts == 1 and not delays
+    assert second.ok
+
+
+def test_missing_unique_index_points_at_the_migration(
+    stub: PostgrestStub, delays: List[float]
+) -> None:
+    stub.unique_index = False
+
+    results = upsert(make_rows(6), delays, chunk_size=2)
+
+    assert [result.ok for result in results] == [False, False, False]
+    assert [result.attempts for result in results] == [1, 0, 0]
+    assert all("supabase/migrations" in (result.error or "") for result in results)
+    assert len(stub.requests) == 1 and not delays
+
+
+async def async_sleep_into(delays: List[float], delay: float) -> None:
+    delays.append(delay)
+
+
+def test_async_upsert_matches_the_sync_results(
+    stub: PostgrestStub, delays: List[float], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(supabase_client.random, "uniform", lambda low, high: high)
+    stub.failures = [(503, "<html>Service Unavailable</html>")]
+
+    async def run():
+        return await supabase_client.aupsert_rows(
+            make_rows(5),
+            chunk_size=2,
+            concurrency=1,
+            sleep=lambda delay: async_sleep_into(delays, delay),
+        )
+
+    results = asyncio.run(run())
+
+    assert [(result.index, result.ok, result.attempts) for result in results] == [
+        (0, True, 2),
+        (1, True, 1),
+        (2, True, 1),
+    ]
+    assert delays == [0.5]
+    assert len(stub.rows) == 5
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_keyset_pages_never_split_a_timestamp(stub: PostgrestStub, descending: bool) -> None:
+    # Three providers share each timestamp; pages of four must complete the group.
+    rows = make_rows(11)
+    upsert(rows, [])
+
+    batches = list(supabase_client.iter_row_batches(batch_size=4, descending=descending))
+
+    async def collect():
+        return [
+            batch
+            async for batch in supabase_client.aiter_row_batches(
+                batch_size=4, descending=descending
+            )
+        ]
+
+    assert asyncio.run(collect()) == batches
+    seen = [row["retrieved_at"] for batch in batches for row in batch]
+    assert sorted(seen, reverse=descending) == seen
+    assert len(seen) == len(rows)
+    for batch, later in zip(batches, batches[1:]):
+        assert batch[-1]["retrieved_at"] != later[0]["retrieved_at"]
@@ -1,32 +1,117 @@
-"""Helper utilities shared across project scripts."""
-
-from .config import (  # noqa: F401
-    BASE_CURRENCY,
-    SUPABASE_KEY,
-    SUPABASE_TABLE,
-    SUPABASE_URL,
-    TARGET_CURRENCY,
-    load_dotenv_if_needed,
-    supabase_configured,
-)
-from .file_utils import load_json, write_json  # noqa: F401
-from .rates_scraper import collect_rates  # noqa: F401
-from .rates_service import get_latest_rates, get_rates, insert_rates  # noqa: F401
-from .supabase_client import SupabaseConfigurationError  # noqa: F401
+"""Helper utilities shared across project scripts.
+
+Exports are imported on first access, so importing one helper does not pull in
+Playwright, httpx or the Supabase SDK unless the caller actually uses them.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .config import (  # noqa: F401
+        BASE_CURRENCY,
+        SUPABASE_KEY,
+        SUPABASE_TABLE,
+        SUPABASE_URL,
+        TARGET_CURRENCY,
+        load_dotenv_if_needed,
+        supabase_configured,
+    )
+    from .file_utils import load_json, write_json  # noqa: F401
+    from .models import Rate  # noqa: F401
+    from .providers import (  # noqa: F401
+        Corridor,
+        Provider,
+        get_corridors,
+        get_providers,
+        register_provider,
+    )
+    from .rates_scraper import collect_rates  # noqa: F401
+    from .rates_service import (  # noqa: F401
+        aget_latest_rates,
+        aget_rates,
+        aget_rates_by_platform,
+        ainsert_rates,
+        aupsert_rates,
+        get_latest_rates,
+        get_rates,
+        insert_rates,
+        iter_rates,
+        upsert_rates,
+    )
+    from .supabase_client import SupabaseConfigurationError  # noqa: F401
+
+_EXPORTS = {
+    "BASE_CURRENCY": ".config",
+    "SUPABASE_KEY": ".config",
+    "SUPABASE_TABLE": ".config",
+    "SUPABASE_URL": ".config",
+    "TARGET_CURRENCY": ".config",
+    "load_dotenv_if_needed": ".config",
+    "supabase_configured": ".config",
+    "load_json": ".file_utils",
+    "write_json": ".file_utils",
+    "Rate": ".models",
+    "Corridor": ".providers",
+    "Provider": ".providers",
+    "get_corridors": ".providers",
+    "get_providers": ".providers",
+    "register_provider": ".providers",
+    "collect_rates": ".rates_scraper",
+    "aget_latest_rates": ".rates_service",
+    "aget_rates": ".rates_service",
+    "aget_rates_by_platform": ".rates_service",
+    "ainsert_rates": ".rates_service",
+    "aupsert_rates": ".rates_service",
+    "get_latest_rates": ".rates_service",
+    "get_rates": ".rates_service",
+    "insert_rates": ".rates_service",
+    "iter_rates": ".rates_service",
+    "upsert_rates": ".rates_service",
+    "SupabaseConfigurationError": ".supabase_client",
+}
 
 __all__ = [
     "BASE_CURRENCY",
+    "Corridor",
+    "Provider",
+    "Rate",
     "SUPABASE_KEY",
     "SUPABASE_TABLE",
     "SUPABASE_URL",
     "TARGET_CURRENCY",
     "SupabaseConfigurationError",
+    "aget_latest_rates",
+    "aget_rates",
+    "aget_rates_by_platform",
+    "ainsert_rates",
+    "aupsert_rates",
     "collect_rates",
+    "get_corridors",
     "get_latest_rates",
+    "get_providers",
     "get_rates",
     "insert_rates",
+    "iter_rates",
     "load_dotenv_if_needed",
     "load_json",
+    "register_provider",
     "supabase_configured",
+    "upsert_rates",
     "write_json",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
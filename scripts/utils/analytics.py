@@ -0,0 +1,145 @@
+"""Vectorized analytics over rate history loaded from the local history store."""
+
+from __future__ import annotations
+
+import warnings
+from dataclasses import dataclass
+
+import numpy as np
+
+from .history_store import HistoryArrays
+from .models import SGT
+
+# Stored timestamps are UTC epochs; hours of day are reported in Singapore time.
+SGT_OFFSET_HOURS = int(SGT.utcoffset(None).total_seconds() // 3600)
+
+
+@dataclass(frozen=True)
+class RateMatrix:
+    """Readings pivoted to one row per timestamp and one column per platform (NaN if missing)."""
+
+    timestamps: np.ndarray  # (n,) int64 epoch seconds
+    platforms: np.ndarray  # (k,) str
+    rates: np.ndarray  # (n, k) float64
+
+    def column(self, platform: str) -> np.ndarray:
+        matches = np.flatnonzero(self.platforms == platform)
+        if not len(matches):
+            raise KeyError(f"No readings for platform '{platform}'.")
+        return self.rates[:, matches[0]]
+
+
+@dataclass(frozen=True)
+class RollingStats:
+    """Rolling mean, standard deviation and log-return volatility for one platform.
+
+    Each array is aligned with ``timestamps``; the first ``window - 1`` entries
+    (``window`` for volatility) are NaN because the window is not yet full.
+    """
+
+    timestamps: np.ndarray
+    mean: np.ndarray
+    std: np.ndarray
+    volatility_bps: np.ndarray
+
+
+def pivot(history: HistoryArrays) -> RateMatrix:
+    """Pivot long-format history into a timestamp x platform matrix."""
+    timestamps, ts_index = np.unique(history.timestamps, return_inverse=True)
+    platforms, platform_index = np.unique(history.platforms, return_inverse=True)
+    rates = np.full((len(timestamps), len(platforms)), np.nan)
+    rates[ts_index, platform_index] = history.rates
+    return RateMatrix(timestamps=timestamps, platforms=platforms, rates=rates)
+
+
+def best_provider(matrix: RateMatrix) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return ``(timestamps, platform, rate)`` of the provider giving the most target currency.
+
+    Timestamps without any reading are dropped.
+    """
+    valid = ~np.isnan(matrix.rates).all(axis=1)
+    rates = matrix.rates[valid]
+    best = np.nanargmax(rates, axis=1)
+    return matrix.timestamps[valid], matrix.platforms[best], rates[np.arange(len(best)), best]
+
+
+def spread_bps(
+    matrix: RateMatrix, platform: str | None = None, reference: str | None = None
+) -> np.ndarray:
+    """Return the spread per timestamp in basis points.
+
+    With ``platform`` and ``reference`` this is ``(platform - reference) / reference``;
+    otherwise it is the best-to-worst spread across every provider quoting at
+    that timestamp. Missing readings yield NaN.
+    """
+    if platform and reference:
+        base = matrix.column(reference)
+        return (matrix.column(platform) - base) / base * 10_000
+    with warnings.catch_warnings():
+        # Timestamps with no reading produce an "All-NaN slice" warning and a NaN spread.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        high = np.nanmax(matrix.rates, axis=1)
+        low = np.nanmin(matrix.rates, axis=1)
+    return (high - low) / low * 10_000
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    totals = np.cumsum(np.concatenate(([0.0], values)))
+    return totals[window:] - totals[:-window]
+
+
+def rolling_stats(matrix: RateMatrix, platform: str, window: int = 24) -> RollingStats:
+    """Rolling statistics over the last ``window`` readings of ``platform``.
+
+    Uses cumulative sums, so the cost is O(n) regardless of the window size.
+    """
+    if window < 2:
+        raise ValueError("window must be at least 2 readings.")
+    column = matrix.column(platform)
+    present = ~np.isnan(column)
+    timestamps = matrix.timestamps[present]
+    values = column[present]
+    n = len(values)
+
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    volatility = np.full(n, np.nan)
+    if n >= window:
+        # Centre on the first value so the sum-of-squares formula keeps precision.
+        centred = values - values[0]
+        window_mean = _rolling_sum(centred, window) / window
+        window_var = _rolling_sum(centred**2, window) / window - window_mean**2
+        mean[window - 1 :] = window_mean + values[0]
+        std[window - 1 :] = np.sqrt(np.clip(window_var, 0, None) * window / (window - 1))
+    if n > window:
+        returns = np.diff(np.log(values)) * 10_000
+        returns_mean = _rolling_sum(returns, window) / window
+        returns_var = _rolling_sum(returns**2, window) / window - returns_mean**2
+        volatility[window:] = np.sqrt(np.clip(returns_var, 0, None) * window / (window - 1))
+    return RollingStats(timestamps=timestamps, mean=mean, std=std, volatility_bps=volatility)
+
+
+def hourly_profile(
+    history: HistoryArrays, platform: str | None = None, tz_offset_hours: int = SGT_OFFSET_HOURS
+) -> np.ndarray:
+    """Return the mean rate for each hour of day (24 entries, NaN for empty hours).
+
+    Stored timestamps are UTC epochs, so hours are shifted by
+    ``tz_offset_hours``; the default yields Singapore hours and 0 yields UTC.
+    """
+    mask = history.platforms == platform if platform else np.ones(len(history), dtype=bool)
+    hours = ((history.timestamps[mask] // 3600) + tz_offset_hours) % 24
+    counts = np.bincount(hours, minlength=24)
+    totals = np.bincount(hours, weights=history.rates[mask], minlength=24)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, totals / counts, np.nan)
+
+
+def best_hour_to_convert(
+    history: HistoryArrays, platform: str | None = None, tz_offset_hours: int = SGT_OFFSET_HOURS
+) -> int | None:
+    """Return the hour of day with the highest mean rate, or None without data."""
+    profile = hourly_profile(history, platform, tz_offset_hours)
+    if np.isnan(profile).all():
+        return None
+    return int(np.nanargmax(profile))
@@ -0,0 +1,249 @@
+"""Persistent HTTP cache for provider page scripts and stylesheets across runs."""
+
+from __future__ import annotations
+
+import atexit
+import json
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional
+
+from .config import ASSET_CACHE_MAX_MB, ASSET_CACHE_PATH
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Request, Route
+
+# Static resources worth keeping; documents and XHRs carry the live rate.
+CACHEABLE_RESOURCE_TYPES: frozenset[str] = frozenset({"script", "stylesheet"})
+# Marks responses fulfilled from the cache so transfer counters can skip them.
+CACHE_HEADER = "x-asset-cache"
+# Headers describing the wire encoding, which no longer apply to the stored body.
+_DROPPED_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+@dataclass
+class CachedAsset:
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    stored_at: float
+
+    def fresh(self, now: float) -> bool:
+        """Whether ``Cache-Control: max-age`` still covers the asset without revalidating."""
+        control = self.headers.get("cache-control", "").lower()
+        if "no-cache" in control:
+            return False
+        match = _MAX_AGE.search(control)
+        return bool(match) and now - self.stored_at < int(match.group(1))
+
+    def validators(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if "etag" in self.headers:
+            headers["if-none-match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            headers["if-modified-since"] = self.headers["last-modified"]
+        return headers
+
+
+@dataclass
+class AssetCacheStats:
+    """Counters collected while the cache is installed on a context."""
+
+    hits: int = 0  # served without a network round trip
+    revalidated: int = 0  # 304 Not Modified, body served from the cache
+    misses: int = 0
+    bytes_saved: int = 0
+
+    def reset(self) -> None:
+        self.hits = self.revalidated = self.misses = self.bytes_saved = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.revalidated + self.misses
+        return (self.hits + self.revalidated) / lookups if lookups else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.hits} fresh, {self.revalidated} revalidated, {self.misses} missed "
+            f"({self.hit_ratio:.0%} hit ratio), saved {self.bytes_saved / 1024:.1f} KiB"
+        )
+
+
+class AssetCache:
+    """SQLite-backed store of cacheable responses, evicted least recently used first.
+
+    Entries are served directly while ``max-age`` allows, otherwise revalidated
+    with ``If-None-Match``/``If-Modified-Since``; only a changed asset is
+    downloaded again. The stored bodies are kept under ``max_bytes``.
+    """
+
+    def __init__(
+        self, path: str | Path = ASSET_CACHE_PATH, max_bytes: int = ASSET_CACHE_MAX_MB << 20
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection shared by every context's route handler on the event loop thread.
+        self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS assets ("
+                " url TEXT PRIMARY KEY,"
+                " status INTEGER NOT NULL,"
+                " headers TEXT NOT NULL,"
+                " body BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " used_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS assets_used_at ON assets (used_at)"
+            )
+
+    def close(self) -> None:
+        """Close the connection; the last close folds the WAL back into the database file."""
+        self._connection.close()
+
+    def get(self, url: str) -> Optional[CachedAsset]:
+        row = self._connection.execute(
+            "SELECT status, headers, body, stored_at FROM assets WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        with self._connection:
+            self._connection.execute(
+                "UPDATE assets SET used_at = ? WHERE url = ?", (time.time(), url)
+            )
+        return CachedAsset(row[0], json.loads(row[1]), row[2], row[3])
+
+    def put(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        now = time.time()
+        kept = {name: value for name, value in headers.items() if name not in _DROPPED_HEADERS}
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, status, json.dumps(kept), body, len(body), now, now),
+            )
+        self.evict()
+
+    def refresh(self, url: str, headers: Dict[str, str]) -> None:
+        """Restart the freshness clock after a 304, taking any updated validators."""
+        entry = self.get(url)
+        if entry is None:
+            return
+        entry.headers.update(
+            {name: value for name, value in headers.items() if name not in _DROPPED_HEADERS}
+        )
+        with self._connection:
+            self._connection.execute(
+                "UPDATE assets SET headers = ?, stored_at = ? WHERE url = ?",
+                (json.dumps(entry.headers), time.time(), url),
+            )
+
+    def size(self) -> int:
+        return self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM assets").fetchone()[0]
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the cache fits ``max_bytes``."""
+        excess = self.size() - self.max_bytes
+        if excess <= 0:
+            return 0
+        evicted = 0
+        with self._connection:
+            rows = self._connection.execute(
+                "SELECT url, size FROM assets ORDER BY used_at"
+            ).fetchall()
+            for url, size in rows:
+                if excess <= 0:
+                    break
+                self._connection.execute("DELETE FROM assets WHERE url = ?", (url,))
+                excess -= size
+                evicted += 1
+        return evicted
+
+
+@lru_cache(maxsize=1)
+def get_asset_cache() -> Optional[AssetCache]:
+    """Return the process-wide cache, or None when ``ASSET_CACHE_PATH`` is empty.
+
+    The cache is closed at exit, so a copied ``.cache/`` directory (as the
+    scheduled workflow saves it) holds one self-contained database file.
+    """
+    if not ASSET_CACHE_PATH:
+        return None
+    cache = AssetCache()
+    atexit.register(cache.close)
+    return cache
+
+
+def _storable(status: int, headers: Dict[str, str]) -> bool:
+    control = headers.get("cache-control", "").lower()
+    if status != 200 or "no-store" in control or "private" in control:
+        return False
+    return bool(_MAX_AGE.search(control) or "etag" in headers or "last-modified" in headers)
+
+
+async def install_asset_cache(context: BrowserContext, cache: AssetCache) -> AssetCacheStats:
+    """Serve cacheable GET requests in ``context`` from ``cache`` and return live stats.
+
+    Install this before ``install_request_policy``: Playwright runs the most
+    recently registered route first, so blocked requests never reach the
+    cache and allowed ones fall back to it. Everything else falls back to the
+    network untouched.
+    """
+    from playwright.async_api import Error as PlaywrightError
+
+    stats = AssetCacheStats()
+
+    async def fulfill_cached(route: Route, entry: CachedAsset) -> None:
+        await route.fulfill(
+            status=entry.status, headers={**entry.headers, CACHE_HEADER: "hit"}, body=entry.body
+        )
+
+    async def handle(route: Route, request: Request) -> None:
+        if request.method != "GET" or request.resource_type not in CACHEABLE_RESOURCE_TYPES:
+            await route.fallback()
+            return
+        entry = cache.get(request.url)
+        if entry and entry.fresh(time.time()):
+            stats.hits += 1
+            stats.bytes_saved += len(entry.body)
+            await fulfill_cached(route, entry)
+            return
+        try:
+            response = await route.fetch(
+                headers={**request.headers, **(entry.validators() if entry else {})}
+            )
+        except PlaywrightError:
+            await route.fallback()
+            return
+        if entry and response.status == 304:
+            stats.revalidated += 1
+            stats.bytes_saved += len(entry.body)
+            cache.refresh(request.url, response.headers)
+            await fulfill_cached(route, entry)
+            return
+        stats.misses += 1
+        body = await response.body()
+        if _storable(response.status, response.headers):
+            cache.put(request.url, response.status, response.headers, body)
+        await route.fulfill(
+            response=response,
+            headers={
+                name: value
+                for name, value in response.headers.items()
+                if name not in _DROPPED_HEADERS
+            },
+            body=body,
+        )
+
+    await context.route("**/*", handle)
+    return stats
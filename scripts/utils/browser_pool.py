@@ -0,0 +1,81 @@
+"""Reusable browser contexts for the scrapers."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from playwright.async_api import Browser, BrowserContext
+
+from .asset_cache import AssetCacheStats
+from .request_policy import RequestStats
+
+
+@dataclass
+class ProviderContext:
+    """A browser context prepared for one provider, plus its usage counters."""
+
+    platform: str
+    context: BrowserContext
+    request_stats: Optional[RequestStats] = None
+    cache_stats: Optional[AssetCacheStats] = None
+    uses: int = 0
+
+
+ContextFactory = Callable[[Browser, str], Awaitable[ProviderContext]]
+
+
+@dataclass
+class ContextPool:
+    """Hand out provider contexts and recycle them after ``max_uses`` scrapes.
+
+    A context that was used for a failed scrape is closed instead of being
+    returned to the pool, so a crashed page never poisons the next run. With
+    ``max_uses=1`` the pool behaves like creating a fresh context per scrape.
+    """
+
+    browser: Browser
+    factory: ContextFactory
+    max_uses: int = 1
+    _idle: Dict[str, List[ProviderContext]] = field(default_factory=dict)
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    async def warm(self, platforms: Iterable[str]) -> None:
+        """Pre-create one idle context per platform."""
+        for platform in platforms:
+            if not self._idle.get(platform):
+                self._idle.setdefault(platform, []).append(
+                    await self.factory(self.browser, platform)
+                )
+
+    async def acquire(self, platform: str) -> ProviderContext:
+        async with self._lock:
+            idle = self._idle.get(platform)
+            if idle:
+                return idle.pop()
+        return await self.factory(self.browser, platform)
+
+    async def release(self, provider_context: ProviderContext, healthy: bool) -> None:
+        provider_context.uses += 1
+        if healthy and provider_context.uses < self.max_uses:
+            async with self._lock:
+                self._idle.setdefault(provider_context.platform, []).append(
+                    provider_context
+                )
+            return
+        await _close_quietly(provider_context.context)
+
+    async def close(self) -> None:
+        async with self._lock:
+            idle = [item for items in self._idle.values() for item in items]
+            self._idle.clear()
+        for provider_context in idle:
+            await _close_quietly(provider_context.context)
+
+
+async def _close_quietly(context: BrowserContext) -> None:
+    try:
+        await context.close()
+    except Exception as error:  # pragma: no cover - browser already gone
+        print(f"Failed to close browser context: {error}")
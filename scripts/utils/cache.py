@@ -0,0 +1,91 @@
+"""Small in-process caches for read paths."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Generic, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    size: int
+
+
+class TTLCache(Generic[T]):
+    """Thread-safe read-through cache with a TTL and LRU eviction at ``maxsize``.
+
+    A ``ttl`` of zero or less disables caching: every lookup is a miss.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple[float, T]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        # Bumped on invalidate so a load that raced a write is not cached.
+        self._generation = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], T]) -> T:
+        """Return the cached value for ``key`` or call ``loader`` and cache its result."""
+        hit, value, generation = self._lookup(key)
+        if hit:
+            return value
+        value = loader()
+        self._store(key, value, generation)
+        return value
+
+    async def aget_or_load(self, key: Hashable, loader: Callable[[], Awaitable[T]]) -> T:
+        """Like ``get_or_load`` for a coroutine ``loader``; concurrent misses each load."""
+        hit, value, generation = self._lookup(key)
+        if hit:
+            return value
+        value = await loader()
+        self._store(key, value, generation)
+        return value
+
+    def _lookup(self, key: Hashable) -> tuple[bool, Any, int]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return True, entry[1], self._generation
+            self._misses += 1
+            return False, None, self._generation
+
+    def _store(self, key: Hashable, value: T, generation: int) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self) -> None:
+        """Drop every cached entry; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(hits=self._hits, misses=self._misses, size=len(self._entries))
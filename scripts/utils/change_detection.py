@@ -0,0 +1,143 @@
+"""Suppress writes of readings whose rate has not moved since the last write."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .config import LAST_RATES_PATH
+from .file_utils import write_text_atomic
+from .models import Rate, parse_datetime
+
+
+def rate_key(platform: str, base_currency: str, target_currency: str) -> str:
+    return f"{platform} {base_currency}-{target_currency}"
+
+
+@dataclass
+class LastRate:
+    rate: str
+    written_at: str  # retrieved_at of the last row written
+    seen_at: str  # retrieved_at of the last reading, written or not
+    suppressed: int = 0  # readings skipped since the last write
+
+
+@dataclass
+class ChangeResult:
+    """Readings split by whether they need writing."""
+
+    changed: List[Rate] = field(default_factory=list)
+    heartbeats: List[Rate] = field(default_factory=list)
+    suppressed: List[Rate] = field(default_factory=list)
+
+    @property
+    def to_write(self) -> List[Rate]:
+        return self.changed + self.heartbeats
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.changed)} changed, {len(self.heartbeats)} heartbeat(s), "
+            f"{len(self.suppressed)} unchanged reading(s) suppressed"
+        )
+
+
+class LastKnownRates:
+    """Last written rate per platform and corridor, kept in a small JSON file.
+
+    Unchanged readings only bump ``seen_at`` locally, which records that the
+    stored rate was still valid then without adding a row. A reading is
+    written anyway once the last write is older than ``heartbeat``, so the
+    table still shows the provider was alive.
+    """
+
+    def __init__(self, path: str | Path | None = LAST_RATES_PATH) -> None:
+        self.path = Path(path) if path else None
+        self.entries: Dict[str, LastRate] = {}
+        if self.path and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                self.entries = {key: LastRate(**entry) for key, entry in data.items()}
+            except (ValueError, TypeError) as error:
+                print(f"Ignoring unreadable last-rates cache in {self.path}: {error}")
+
+    def seed(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Fill keys missing locally from Supabase rows (e.g. ``fetch_latest_rows``)."""
+        added = 0
+        for row in rows:
+            try:
+                rate = Rate.from_row(row)
+            except (KeyError, ValueError, ArithmeticError):
+                continue
+            key = rate_key(rate.platform, rate.base_currency, rate.target_currency)
+            if key not in self.entries:
+                stamp = rate.to_payload()["retrieved_at"]
+                self.entries[key] = LastRate(format(rate.rate, "f"), stamp, stamp)
+                added += 1
+        return added
+
+    def missing(self, rates: Sequence[Rate]) -> bool:
+        return any(
+            rate_key(rate.platform, rate.base_currency, rate.target_currency) not in self.entries
+            for rate in rates
+        )
+
+    def classify(
+        self, rates: Sequence[Rate], heartbeat: Optional[timedelta] = None
+    ) -> ChangeResult:
+        """Split ``rates`` into changed, heartbeat and suppressed readings.
+
+        Call ``commit`` with the result once the rows are safely queued.
+        """
+        result = ChangeResult()
+        for rate in rates:
+            key = rate_key(rate.platform, rate.base_currency, rate.target_currency)
+            entry = self.entries.get(key)
+            if entry is None or Decimal(entry.rate) != rate.rate:
+                result.changed.append(rate)
+            elif heartbeat is not None and rate.retrieved_at - parse_datetime(
+                entry.written_at
+            ) >= heartbeat:
+                result.heartbeats.append(rate)
+            else:
+                result.suppressed.append(rate)
+        return result
+
+    def commit(self, result: ChangeResult) -> None:
+        for rate in result.to_write:
+            stamp = rate.to_payload()["retrieved_at"]
+            key = rate_key(rate.platform, rate.base_currency, rate.target_currency)
+            self.entries[key] = LastRate(format(rate.rate, "f"), stamp, stamp)
+        for rate in result.suppressed:
+            entry = self.entries[rate_key(rate.platform, rate.base_currency, rate.target_currency)]
+            entry.seen_at = rate.to_payload()["retrieved_at"]
+            entry.suppressed += 1
+        if self.path:
+            write_text_atomic(
+                self.path,
+                json.dumps(
+                    {key: asdict(entry) for key, entry in self.entries.items()},
+                    indent=2,
+                    sort_keys=True,
+                )
+                + "\n",
+            )
+
+
+def seed_from_supabase(store: LastKnownRates, rates: Sequence[Rate]) -> None:
+    """Seed keys missing from ``store`` with one bounded read of the latest rows."""
+    from .config import supabase_configured
+    from .rates_service import get_latest_rates
+
+    if not store.missing(rates) or not supabase_configured():
+        return
+    try:
+        added = store.seed(get_latest_rates())
+    except Exception as error:
+        print(f"Could not read latest rates for change detection: {error}")
+        return
+    if added:
+        print(f"Seeded {added} last-known rate(s) from Supabase.")
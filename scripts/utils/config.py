@@ -3,9 +3,7 @@
 from __future__ import annotations
 
 import os
-from typing import Dict
-
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Tuple
 
 from .file_utils import resolve_path
 
@@ -18,6 +16,8 @@ def load_dotenv_if_needed() -> None:
     if _DOTENV_LOADED:
         return
 
+    from dotenv import load_dotenv
+
     # Attempt to load from current working directory first.
     load_dotenv()
 
@@ -35,30 +35,167 @@ def _get_env(key: str, default: str | None = None) -> str | None:
     return os.getenv(key, default)
 
 
-SUPABASE_URL: str | None = _get_env("SUPABASE_URL")
-SUPABASE_KEY: str | None = _get_env("SUPABASE_KEY")
-SUPABASE_TABLE: str = _get_env("SUPABASE_TABLE", "exchange_rates") or "exchange_rates"
+def _get_bool_env(key: str, default: bool) -> bool:
+    value = _get_env(key)
+    if value is None or not value.strip():
+        return default
+    return value.strip().lower() not in {"0", "false", "no", "off"}
+
+
+def _get_int_env(key: str, default: int) -> int:
+    value = _get_env(key)
+    if value is None or not value.strip():
+        return default
+    return int(value)
+
+
+def parse_corridors(value: str | None) -> List[Tuple[str, str]]:
+    """Parse ``"SGD-MYR,SGD-IDR"`` into ``[("SGD", "MYR"), ("SGD", "IDR")]``."""
+    corridors: List[Tuple[str, str]] = []
+    for item in (value or "").split(","):
+        item = item.strip().upper()
+        if not item:
+            continue
+        base, separator, target = item.replace("/", "-").partition("-")
+        if not separator or not base or not target:
+            raise ValueError(f"Invalid corridor '{item}'; expected BASE-TARGET, e.g. SGD-MYR.")
+        corridors.append((base, target))
+    return corridors
+
+
+if TYPE_CHECKING:
+    SUPABASE_URL: str | None
+    SUPABASE_KEY: str | None
+    SUPABASE_TABLE: str
+    SUPABASE_LATEST_VIEW: str
+    BASE_CURRENCY: str
+    TARGET_CURRENCY: str
+    CORRIDORS: List[Tuple[str, str]]
+    SCRAPE_CONCURRENCY: int
+    SCRAPE_BLOCK_REQUESTS: bool
+    SCRAPE_HTTP_FAST_PATH: bool
+    WISE_RATE_ENDPOINT: str | None
+    CIMB_RATE_ENDPOINT: str | None
+    WESTERNUNION_RATE_ENDPOINT: str | None
+    RATES_CACHE_TTL: float
+    RATES_CACHE_MAXSIZE: int
+    RATES_SPOOL_PATH: str
+    HISTORY_DB_PATH: str
+    HISTORY_SYNC_OVERLAP: float
+    SELECTOR_STATS_PATH: str
+    SELECTOR_FAILURE_WARN_AFTER: int
+    LAST_RATES_PATH: str
+    SCHEDULER_STATE_PATH: str
+    SCHEDULE_MIN_INTERVAL: float
+    SCHEDULE_MAX_INTERVAL: float
+    SCHEDULE_BUDGET_SECONDS: float
+    SCRAPE_PROVIDER_BUDGET: float
+    PROVIDER_HEALTH_PATH: str
+    CIRCUIT_FAILURE_THRESHOLD: int
+    CIRCUIT_COOLDOWN_SECONDS: float
+    CIRCUIT_MAX_COOLDOWN_SECONDS: float
+    ASSET_CACHE_PATH: str
+    ASSET_CACHE_MAX_MB: int
+
+# Settings are read (and .env loaded) on first access rather than at import,
+# so modules that only need helpers from this file stay cheap to import.
+_SETTINGS: Dict[str, Callable[[], Any]] = {
+    "SUPABASE_URL": lambda: _get_env("SUPABASE_URL"),
+    "SUPABASE_KEY": lambda: _get_env("SUPABASE_KEY"),
+    "SUPABASE_TABLE": lambda: _get_env("SUPABASE_TABLE") or "exchange_rates",
+    # View returning the newest row per platform and corridor (see supabase/migrations).
+    "SUPABASE_LATEST_VIEW": lambda: _get_env("SUPABASE_LATEST_VIEW") or "latest_exchange_rates",
+    "BASE_CURRENCY": lambda: _get_env("BASE_CURRENCY") or "SGD",
+    "TARGET_CURRENCY": lambda: _get_env("TARGET_CURRENCY") or "MYR",
+    # Currency pairs collected on every run; defaults to BASE_CURRENCY-TARGET_CURRENCY.
+    "CORRIDORS": lambda: parse_corridors(_get_env("CORRIDORS"))
+    or [(_setting("BASE_CURRENCY"), _setting("TARGET_CURRENCY"))],
+    # Maximum number of provider pages loaded at the same time.
+    "SCRAPE_CONCURRENCY": lambda: _get_int_env("SCRAPE_CONCURRENCY", 4),
+    # Abort image, font, media and tracker requests while scraping provider pages.
+    "SCRAPE_BLOCK_REQUESTS": lambda: _get_bool_env("SCRAPE_BLOCK_REQUESTS", True),
+    # Try plain JSON endpoints before launching a browser; unset endpoints are skipped.
+    # Endpoints may use {BASE}/{TARGET} (or lower-case {base}/{target}) placeholders.
+    "SCRAPE_HTTP_FAST_PATH": lambda: _get_bool_env("SCRAPE_HTTP_FAST_PATH", True),
+    "WISE_RATE_ENDPOINT": lambda: _get_env(
+        "WISE_RATE_ENDPOINT", "https://wise.com/rates/live?source={BASE}&target={TARGET}"
+    ),
+    "CIMB_RATE_ENDPOINT": lambda: _get_env("CIMB_RATE_ENDPOINT"),
+    "WESTERNUNION_RATE_ENDPOINT": lambda: _get_env("WESTERNUNION_RATE_ENDPOINT"),
+    # Seconds rates_service keeps read results; 0 disables the cache.
+    "RATES_CACHE_TTL": lambda: float(_get_env("RATES_CACHE_TTL") or 60),
+    "RATES_CACHE_MAXSIZE": lambda: _get_int_env("RATES_CACHE_MAXSIZE", 128),
+    # Local SQLite spool that holds scraped rows until Supabase accepts them.
+    "RATES_SPOOL_PATH": lambda: _get_env("RATES_SPOOL_PATH")
+    or str(resolve_path(".cache", "rates_spool.sqlite3")),
+    # Local SQLite copy of the rate history used for analytics.
+    "HISTORY_DB_PATH": lambda: _get_env("HISTORY_DB_PATH")
+    or str(resolve_path(".cache", "history.sqlite3")),
+    # Seconds before the newest synced row that each history sync re-reads, so rows
+    # drained late from the spool (with older retrieved_at values) are not missed.
+    "HISTORY_SYNC_OVERLAP": lambda: float(_get_env("HISTORY_SYNC_OVERLAP") or 7 * 24 * 3600),
+    # Per-provider selector hit statistics; empty string disables selector learning.
+    "SELECTOR_STATS_PATH": lambda: _get_env(
+        "SELECTOR_STATS_PATH", str(resolve_path(".cache", "selector_stats.json"))
+    )
+    or "",
+    # Consecutive runs the learned selector may miss before a layout-change warning.
+    "SELECTOR_FAILURE_WARN_AFTER": lambda: _get_int_env("SELECTOR_FAILURE_WARN_AFTER", 2),
+    # Last rate written per platform and corridor, used by deploy --only-changed.
+    "LAST_RATES_PATH": lambda: _get_env("LAST_RATES_PATH")
+    or str(resolve_path(".cache", "last_rates.json")),
+    # Learned change interval and scrape cost per provider and corridor (deploy --adaptive).
+    "SCHEDULER_STATE_PATH": lambda: _get_env("SCHEDULER_STATE_PATH")
+    or str(resolve_path(".cache", "scheduler.json")),
+    # Bounds, in seconds, on how often the adaptive scheduler scrapes each job.
+    "SCHEDULE_MIN_INTERVAL": lambda: float(_get_env("SCHEDULE_MIN_INTERVAL") or 300),
+    "SCHEDULE_MAX_INTERVAL": lambda: float(_get_env("SCHEDULE_MAX_INTERVAL") or 6 * 3600),
+    # Estimated wall-clock seconds an adaptive run may spend scraping; 0 disables the budget.
+    "SCHEDULE_BUDGET_SECONDS": lambda: float(_get_env("SCHEDULE_BUDGET_SECONDS") or 120),
+    # Hard wall-clock seconds for one provider page scrape; the task is cancelled after it.
+    "SCRAPE_PROVIDER_BUDGET": lambda: float(_get_env("SCRAPE_PROVIDER_BUDGET") or 60),
+    # Per-provider circuit breaker state; empty string disables the breakers.
+    "PROVIDER_HEALTH_PATH": lambda: _get_env(
+        "PROVIDER_HEALTH_PATH", str(resolve_path(".cache", "provider_health.json"))
+    )
+    or "",
+    # Consecutive failed runs (no corridor returned a rate) that open a provider's breaker.
+    "CIRCUIT_FAILURE_THRESHOLD": lambda: _get_int_env("CIRCUIT_FAILURE_THRESHOLD", 3),
+    # Seconds before an open breaker lets a probe through; doubles on each failed probe.
+    "CIRCUIT_COOLDOWN_SECONDS": lambda: float(_get_env("CIRCUIT_COOLDOWN_SECONDS") or 3600),
+    "CIRCUIT_MAX_COOLDOWN_SECONDS": lambda: float(
+        _get_env("CIRCUIT_MAX_COOLDOWN_SECONDS") or 24 * 3600
+    ),
+    # On-disk cache of provider scripts and stylesheets; empty string disables it.
+    "ASSET_CACHE_PATH": lambda: _get_env(
+        "ASSET_CACHE_PATH", str(resolve_path(".cache", "assets.sqlite3"))
+    )
+    or "",
+    "ASSET_CACHE_MAX_MB": lambda: _get_int_env("ASSET_CACHE_MAX_MB", 64),
+}
 
-BASE_CURRENCY: str = _get_env("BASE_CURRENCY", "SGD") or "SGD"
-TARGET_CURRENCY: str = _get_env("TARGET_CURRENCY", "MYR") or "MYR"
+
+def _setting(name: str) -> Any:
+    namespace = globals()
+    if name not in namespace:
+        namespace[name] = _SETTINGS[name]()
+    return namespace[name]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _setting(name)
 
 
 def supabase_configured() -> bool:
     """Return True if Supabase variables appear to be configured."""
-    return bool(
-        SUPABASE_URL
-        and SUPABASE_KEY
-        and "YOUR_SUPABASE_URL" not in SUPABASE_URL
-        and "YOUR_SUPABASE_KEY" not in SUPABASE_KEY
-    )
+    url = _setting("SUPABASE_URL")
+    key = _setting("SUPABASE_KEY")
+    return bool(url and key and "YOUR_SUPABASE_URL" not in url and "YOUR_SUPABASE_KEY" not in key)
 
 
 def get_environment_variables() -> Dict[str, str | None]:
     """Return a mapping of environment variables relevant to automation."""
-    return {
-        "SUPABASE_URL": SUPABASE_URL,
-        "SUPABASE_KEY": SUPABASE_KEY,
-        "SUPABASE_TABLE": SUPABASE_TABLE,
-        "BASE_CURRENCY": BASE_CURRENCY,
-        "TARGET_CURRENCY": TARGET_CURRENCY,
-    }
+    names = ("SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_TABLE", "BASE_CURRENCY", "TARGET_CURRENCY")
+    return {name: _setting(name) for name in names}
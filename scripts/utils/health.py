@@ -0,0 +1,136 @@
+"""Per-provider circuit breakers that persist across runs."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+from .config import (
+    CIRCUIT_COOLDOWN_SECONDS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_MAX_COOLDOWN_SECONDS,
+    PROVIDER_HEALTH_PATH,
+)
+from .file_utils import write_text_atomic
+from .models import now_sgt, parse_datetime
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass
+class ProviderHealth:
+    failures: int = 0  # consecutive failed runs
+    trips: int = 0  # times the breaker opened since the last success
+    opened_at: Optional[str] = None
+    last_error: Optional[str] = None
+    last_success_at: Optional[str] = None
+
+
+class CircuitBreakers:
+    """Consecutive-failure circuit breaker per provider, stored as JSON.
+
+    ``record`` takes one outcome per provider per run. After ``threshold``
+    failed runs in a row the provider's breaker opens and its jobs are
+    skipped. Once the cooldown has passed the breaker is half-open: one job
+    is let through as a probe. A successful probe closes the breaker; a
+    failed one reopens it with the cooldown doubled, up to ``max_cooldown``
+    seconds.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        cooldown: float = CIRCUIT_COOLDOWN_SECONDS,
+        max_cooldown: float = CIRCUIT_MAX_COOLDOWN_SECONDS,
+    ) -> None:
+        self.path = Path(path) if path else None
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.max_cooldown = max(cooldown, max_cooldown)
+        self.providers: Dict[str, ProviderHealth] = {}
+        self._probing: set[str] = set()
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: str | Path | None = PROVIDER_HEALTH_PATH) -> CircuitBreakers:
+        """Read health from ``path``; a missing or corrupt file leaves every breaker closed."""
+        breakers = cls(path)
+        if breakers.path and breakers.path.exists():
+            try:
+                data = json.loads(breakers.path.read_text(encoding="utf-8"))
+                breakers.providers = {
+                    platform: ProviderHealth(**entry) for platform, entry in data.items()
+                }
+            except (ValueError, TypeError) as error:
+                print(f"Ignoring unreadable provider health in {breakers.path}: {error}")
+        return breakers
+
+    def save(self) -> None:
+        if not self.path or not self._dirty:
+            return
+        write_text_atomic(
+            self.path,
+            json.dumps(
+                {platform: asdict(entry) for platform, entry in self.providers.items()},
+                indent=2,
+                sort_keys=True,
+            )
+            + "\n",
+        )
+        self._dirty = False
+
+    def retry_at(self, platform: str) -> Optional[datetime]:
+        """When the open breaker for ``platform`` lets a probe through, or None if closed."""
+        entry = self.providers.get(platform)
+        if not entry or not entry.opened_at:
+            return None
+        cooldown = min(self.max_cooldown, self.cooldown * 2 ** max(0, entry.trips - 1))
+        return parse_datetime(entry.opened_at) + timedelta(seconds=cooldown)
+
+    def state(self, platform: str, now: Optional[datetime] = None) -> str:
+        retry_at = self.retry_at(platform)
+        if retry_at is None:
+            return CLOSED
+        return HALF_OPEN if (now or now_sgt()) >= retry_at else OPEN
+
+    def allow(self, platform: str, now: Optional[datetime] = None) -> bool:
+        """Return whether a job for ``platform`` may run; half-open allows one probe per run."""
+        state = self.state(platform, now)
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and platform not in self._probing:
+            self._probing.add(platform)
+            return True
+        return False
+
+    def record(
+        self, platform: str, ok: bool, error: Optional[str] = None, now: Optional[datetime] = None
+    ) -> None:
+        entry = self.providers.setdefault(platform, ProviderHealth())
+        stamp = (now or now_sgt()).isoformat()
+        self._dirty = True
+        if ok:
+            if entry.opened_at:
+                print(f"[{platform}] Circuit closed after a successful probe.")
+            entry.failures = entry.trips = 0
+            entry.opened_at = entry.last_error = None
+            entry.last_success_at = stamp
+            return
+        entry.failures += 1
+        entry.last_error = error
+        probing = platform in self._probing
+        if entry.failures >= self.threshold and (entry.opened_at is None or probing):
+            self._probing.discard(platform)
+            entry.trips += 1
+            entry.opened_at = stamp
+            retry_at = self.retry_at(platform)
+            print(
+                f"[{platform}] Circuit open after {entry.failures} consecutive failure(s); "
+                f"next probe after {retry_at.isoformat() if retry_at else stamp}."
+            )
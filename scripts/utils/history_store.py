@@ -0,0 +1,265 @@
+"""Local SQLite copy of the rate history for fast range queries and aggregates."""
+
+from __future__ import annotations
+
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable
+
+from .config import HISTORY_DB_PATH, HISTORY_SYNC_OVERLAP
+from .models import SGT, parse_datetime
+from . import supabase_client
+
+if TYPE_CHECKING:
+    import numpy as np
+
+_SYNC_COLUMNS = "platform,base_currency,target_currency,retrieved_at,exchange_rate"
+# SQLite date modifier that turns a UTC epoch into a Singapore calendar day.
+_SGT_DAY = "+8 hours"
+# Version 1 stores real epochs; version 0 read naive timestamps as UTC.
+_SCHEMA_VERSION = 1
+
+
+def parse_timestamp(value: str) -> int:
+    """Return epoch seconds for an ISO timestamp; naive values are Singapore time."""
+    return int(parse_datetime(value).timestamp())
+
+
+@dataclass(frozen=True)
+class HistoryArrays:
+    """Column arrays for a slice of history, ordered by timestamp."""
+
+    timestamps: np.ndarray  # int64 epoch seconds
+    rates: np.ndarray  # float64
+    platforms: np.ndarray  # str
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+
+@dataclass(frozen=True)
+class DailyStat:
+    day: str
+    platform: str
+    minimum: float
+    maximum: float
+    mean: float
+    readings: int
+
+
+class HistoryStore:
+    """SQLite table of ``(platform, corridor, ts, rate)`` synced incrementally from Supabase.
+
+    Rates are stored as REAL and timestamps as integer epoch seconds, so range
+    filters use the index and aggregates run inside SQLite instead of over
+    Python dicts. ``ts`` is a real Unix epoch: naive ``retrieved_at`` values
+    are Singapore time, as the scraper records them (see ``parse_timestamp``).
+    Days are Singapore calendar days.
+    """
+
+    def __init__(self, path: str | Path = HISTORY_DB_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS rates ("
+                " platform TEXT NOT NULL,"
+                " base_currency TEXT NOT NULL,"
+                " target_currency TEXT NOT NULL,"
+                " ts INTEGER NOT NULL,"
+                " retrieved_at TEXT NOT NULL,"
+                " rate REAL NOT NULL,"
+                " PRIMARY KEY (platform, base_currency, target_currency, ts))"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS rates_ts ON rates (ts)")
+            if connection.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+                self._reparse_timestamps(connection)
+                connection.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+
+    @staticmethod
+    def _reparse_timestamps(connection: sqlite3.Connection) -> None:
+        # Stores written before version 1 hold naive values shifted by 8 hours.
+        rows = connection.execute("SELECT rowid, retrieved_at FROM rates").fetchall()
+        connection.executemany(
+            "UPDATE rates SET ts = ? WHERE rowid = ?",
+            [(parse_timestamp(retrieved_at), rowid) for rowid, retrieved_at in rows],
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def latest_retrieved_at(self) -> str | None:
+        """Return the newest ``retrieved_at`` already stored, as Supabase returned it."""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT retrieved_at FROM rates ORDER BY ts DESC LIMIT 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    def _sync_cursor(self, overlap: float) -> str | None:
+        latest = self.latest_retrieved_at()
+        if latest is None:
+            return None
+        # Naive Singapore wall-clock time, the form the scraper records.
+        cursor = parse_datetime(latest).astimezone(SGT) - timedelta(seconds=overlap)
+        return cursor.replace(tzinfo=None).isoformat()
+
+    def add_rows(self, rows: Iterable[dict[str, Any]]) -> int:
+        """Store rows shaped like the Supabase table; returns how many were new."""
+        records = [
+            (
+                row["platform"],
+                row.get("base_currency") or "SGD",
+                row.get("target_currency") or "MYR",
+                parse_timestamp(row["retrieved_at"]),
+                row["retrieved_at"],
+                float(row["exchange_rate"]),
+            )
+            for row in rows
+            if row.get("exchange_rate") not in (None, "")
+        ]
+        with closing(self._connect()) as connection, connection:
+            before = connection.total_changes
+            connection.executemany(
+                "INSERT OR IGNORE INTO rates"
+                " (platform, base_currency, target_currency, ts, retrieved_at, rate)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                records,
+            )
+            return connection.total_changes - before
+
+    def sync(
+        self,
+        batch_size: int = supabase_client.DEFAULT_PAGE_SIZE,
+        overlap: float | None = None,
+    ) -> int:
+        """Pull rows from ``overlap`` seconds before the newest stored one onwards.
+
+        Spooled rows reach Supabase after newer ones and keep their original
+        ``retrieved_at``, so a cursor at the newest stored row would skip them.
+        The window is re-read on every sync (``HISTORY_SYNC_OVERLAP`` by
+        default); rows already stored are ignored by their natural key.
+        Returns how many rows were added.
+        """
+        added = 0
+        for batch in supabase_client.iter_row_batches(
+            columns=_SYNC_COLUMNS,
+            batch_size=batch_size,
+            after=self._sync_cursor(HISTORY_SYNC_OVERLAP if overlap is None else overlap),
+            descending=False,
+        ):
+            added += self.add_rows(batch)
+        return added
+
+    def _where(
+        self,
+        platform: str | None,
+        start: int | None,
+        end: int | None,
+        base_currency: str,
+        target_currency: str,
+        prefix: str = "",
+    ) -> tuple[str, list[Any]]:
+        clauses = [f"{prefix}base_currency = ?", f"{prefix}target_currency = ?"]
+        params: list[Any] = [base_currency, target_currency]
+        if platform:
+            clauses.append(f"{prefix}platform = ?")
+            params.append(platform)
+        if start is not None:
+            clauses.append(f"{prefix}ts >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append(f"{prefix}ts < ?")
+            params.append(end)
+        return " AND ".join(clauses), params
+
+    def query_range(
+        self,
+        platform: str | None = None,
+        start: int | None = None,
+        end: int | None = None,
+        base_currency: str = "SGD",
+        target_currency: str = "MYR",
+    ) -> HistoryArrays:
+        """Return readings with ``start <= ts < end`` as NumPy arrays.
+
+        ``start`` and ``end`` are Unix epoch seconds; convert ISO values with
+        ``parse_timestamp``.
+        """
+        import numpy as np
+
+        where, params = self._where(platform, start, end, base_currency, target_currency)
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"SELECT ts, rate, platform FROM rates WHERE {where} ORDER BY ts, platform",
+                params,
+            ).fetchall()
+        if not rows:
+            return HistoryArrays(
+                timestamps=np.empty(0, dtype=np.int64),
+                rates=np.empty(0, dtype=np.float64),
+                platforms=np.empty(0, dtype=str),
+            )
+        timestamps, rates, platforms = zip(*rows)
+        return HistoryArrays(
+            timestamps=np.asarray(timestamps, dtype=np.int64),
+            rates=np.asarray(rates, dtype=np.float64),
+            platforms=np.asarray(platforms),
+        )
+
+    def daily_stats(
+        self,
+        platform: str | None = None,
+        start: int | None = None,
+        end: int | None = None,
+        base_currency: str = "SGD",
+        target_currency: str = "MYR",
+    ) -> list[DailyStat]:
+        """Return min, max and mean rate per Singapore calendar day and platform.
+
+        ``start`` and ``end`` are Unix epoch seconds, as for ``query_range``.
+        """
+        where, params = self._where(platform, start, end, base_currency, target_currency)
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"SELECT date(ts, 'unixepoch', '{_SGT_DAY}') AS day, platform,"
+                " MIN(rate), MAX(rate), AVG(rate), COUNT(*)"
+                f" FROM rates WHERE {where} GROUP BY day, platform ORDER BY day, platform",
+                params,
+            ).fetchall()
+        return [DailyStat(*row) for row in rows]
+
+    def spread(
+        self,
+        platform: str = "CIMB",
+        reference: str = "WISE",
+        start: int | None = None,
+        end: int | None = None,
+        base_currency: str = "SGD",
+        target_currency: str = "MYR",
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return ``(timestamps, spread_bps)`` of ``platform`` against ``reference``.
+
+        Only timestamps where both platforms have a reading are included; a
+        positive spread means ``platform`` gives more target currency.
+        """
+        import numpy as np
+
+        where, params = self._where(
+            None, start, end, base_currency, target_currency, prefix="a."
+        )
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT a.ts, a.rate, b.rate FROM rates a JOIN rates b"
+                " ON b.ts = a.ts AND b.base_currency = a.base_currency"
+                " AND b.target_currency = a.target_currency"
+                f" WHERE a.platform = ? AND b.platform = ? AND {where}"
+                " ORDER BY a.ts",
+                [platform, reference, *params],
+            ).fetchall()
+        data = np.asarray(rows, dtype=np.float64).reshape(-1, 3)
+        timestamps = data[:, 0].astype(np.int64)
+        return timestamps, (data[:, 1] - data[:, 2]) / data[:, 2] * 10_000
@@ -0,0 +1,101 @@
+"""Typed records passed between the scrapers, the spool and Supabase."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, tzinfo
+from decimal import Decimal, InvalidOperation
+from typing import TYPE_CHECKING, Any, Dict
+
+from .config import BASE_CURRENCY, TARGET_CURRENCY
+
+if TYPE_CHECKING:
+    from .providers import Corridor
+
+# ``retrieved_at`` is stored as naive Singapore wall-clock time.
+SGT = timezone(timedelta(hours=8), "SGT")
+
+_FRACTION = re.compile(r"\.(\d+)")
+
+
+def parse_datetime(value: str, assume: tzinfo = SGT) -> datetime:
+    """Parse an ISO timestamp into an aware datetime; naive values get ``assume``.
+
+    Handles the ``Z`` suffix and fractional seconds of any precision, which
+    ``datetime.fromisoformat`` rejects before Python 3.11.
+    """
+    text = value.strip().replace(" ", "T").replace("Z", "+00:00")
+    text = _FRACTION.sub(lambda match: "." + match.group(1)[:6].ljust(6, "0"), text, count=1)
+    parsed = datetime.fromisoformat(text)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=assume)
+
+
+def now_sgt() -> datetime:
+    return datetime.now(SGT)
+
+
+@dataclass(frozen=True, slots=True)
+class Rate:
+    """One exchange-rate reading.
+
+    Validated on construction, so malformed rates fail in the scraper rather
+    than in Supabase. ``platform`` stays a plain upper-case string because
+    providers are registered at runtime (see ``providers.register_provider``).
+    """
+
+    platform: str
+    rate: Decimal
+    retrieved_at: datetime
+    base_currency: str = BASE_CURRENCY
+    target_currency: str = TARGET_CURRENCY
+
+    def __post_init__(self) -> None:
+        if not self.platform or self.platform != self.platform.upper():
+            raise ValueError(
+                f"Platform must be a non-empty upper-case name, got {self.platform!r}."
+            )
+        if not isinstance(self.rate, Decimal):
+            raise TypeError(f"Rate must be a Decimal, got {type(self.rate).__name__}.")
+        if not self.rate.is_finite() or self.rate <= 0:
+            raise ValueError(f"{self.platform} rate must be a positive number, got {self.rate}.")
+        if self.retrieved_at.tzinfo is None:
+            raise ValueError("retrieved_at must be timezone-aware.")
+
+    @classmethod
+    def parse(
+        cls, platform: str, value: Any, retrieved_at: datetime, corridor: Corridor | None = None
+    ) -> Rate:
+        """Build a rate from scraped text or JSON numbers, e.g. ``"3,240.5"`` or ``3.24``."""
+        text = str(value).strip().replace(",", "")
+        try:
+            rate = Decimal(text)
+        except InvalidOperation:
+            raise ValueError(f"{platform} rate {value!r} is not a number.") from None
+        if corridor is None:
+            return cls(platform, rate, retrieved_at)
+        return cls(platform, rate, retrieved_at, corridor.base, corridor.target)
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> Rate:
+        """Build a rate from a Supabase or spool row."""
+        retrieved_at = row["retrieved_at"]
+        if isinstance(retrieved_at, str):
+            retrieved_at = parse_datetime(retrieved_at)
+        return cls(
+            platform=row["platform"],
+            rate=Decimal(str(row["exchange_rate"])),
+            retrieved_at=retrieved_at,
+            base_currency=row.get("base_currency") or BASE_CURRENCY,
+            target_currency=row.get("target_currency") or TARGET_CURRENCY,
+        )
+
+    def to_payload(self) -> Dict[str, str]:
+        """Serialize to the Supabase row format (string rate, naive Singapore time)."""
+        return {
+            "exchange_rate": format(self.rate, "f"),
+            "retrieved_at": self.retrieved_at.astimezone(SGT).replace(tzinfo=None).isoformat(),
+            "platform": self.platform,
+            "base_currency": self.base_currency,
+            "target_currency": self.target_currency,
+        }
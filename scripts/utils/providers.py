@@ -0,0 +1,177 @@
+"""Declarative registry of the exchange-rate providers the scraper supports."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from .config import (
+    CIMB_RATE_ENDPOINT,
+    CORRIDORS,
+    WESTERNUNION_RATE_ENDPOINT,
+    WISE_RATE_ENDPOINT,
+    parse_corridors,
+)
+from .rate_parser import NUMBER
+from .rates_http import find_rate_value, parse_wise_payload
+from .request_policy import RequestPolicy
+
+_HIDE_WEBDRIVER_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined,
+    });
+    window.chrome = {
+        runtime: {},
+        loadTimes: function() {},
+        csi: function() {},
+        app: {},
+    };
+    delete navigator.__proto__.webdriver;
+"""
+
+
+class Corridor(NamedTuple):
+    """A currency pair such as SGD to MYR."""
+
+    base: str
+    target: str
+
+    def __str__(self) -> str:
+        return f"{self.base}-{self.target}"
+
+    def fill(self, template: str) -> str:
+        """Substitute ``{BASE}``/``{TARGET}`` (and lower-case variants) in ``template``."""
+        return (
+            template.replace("{BASE}", self.base)
+            .replace("{TARGET}", self.target)
+            .replace("{base}", self.base.lower())
+            .replace("{target}", self.target.lower())
+        )
+
+
+def get_corridors(value: Optional[str] = None) -> List[Corridor]:
+    """Return the corridors in ``value`` (e.g. ``"SGD-MYR,SGD-IDR"``) or the configured ones."""
+    pairs = parse_corridors(value) if value else CORRIDORS
+    return [Corridor(base, target) for base, target in pairs]
+
+
+@dataclass(frozen=True)
+class Provider:
+    """Everything the shared scraping engine needs to read one provider's rate.
+
+    ``url``, ``fallback_patterns`` and ``rate_endpoint`` are templates filled per
+    corridor by :meth:`Corridor.fill`. ``fallback_patterns`` are regular
+    expressions run against the page HTML when no selector yields a rate; group
+    1 must capture the number, and the base currency code must appear in the
+    match, since only HTML around it is searched. ``rate_endpoint`` enables the
+    plain-HTTP fast path, parsed by ``parse_rate_payload``. ``targets`` limits the provider to
+    the listed target currencies. ``budget_seconds`` overrides
+    ``SCRAPE_PROVIDER_BUDGET``, the hard wall-clock limit for one page scrape.
+    """
+
+    platform: str
+    label: str
+    url: str
+    selectors: tuple[str, ...]
+    fallback_patterns: tuple[str, ...] = ()
+    cookies: tuple[Dict[str, Any], ...] = ()
+    init_scripts: tuple[str, ...] = ()
+    request_policy: RequestPolicy = field(default_factory=RequestPolicy)
+    log_response_patterns: tuple[str, ...] = ()
+    log_failed_requests: bool = False
+    rate_endpoint: Optional[str] = None
+    parse_rate_payload: Callable[[Any, Corridor], Optional[str]] = find_rate_value
+    targets: Optional[tuple[str, ...]] = None
+    budget_seconds: Optional[float] = None
+
+    def supports(self, corridor: Corridor) -> bool:
+        return self.targets is None or corridor.target in self.targets
+
+
+PROVIDERS: Dict[str, Provider] = {}
+
+
+def register_provider(provider: Provider) -> Provider:
+    """Add ``provider`` to the registry, replacing any provider with the same platform."""
+    PROVIDERS[provider.platform] = provider
+    return provider
+
+
+def get_providers(platforms: Optional[Iterable[str]] = None) -> List[Provider]:
+    """Return providers in registration order, optionally limited to ``platforms``."""
+    if platforms is None:
+        return list(PROVIDERS.values())
+    wanted = {platform.strip().upper() for platform in platforms if platform.strip()}
+    unknown = wanted - PROVIDERS.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown provider(s): {', '.join(sorted(unknown))}. "
+            f"Available: {', '.join(PROVIDERS)}"
+        )
+    return [provider for platform, provider in PROVIDERS.items() if platform in wanted]
+
+
+register_provider(
+    Provider(
+        platform="CIMB",
+        label="CIMB",
+        url="https://www.cimbclicks.com.sg/{base}-to-{target}",
+        selectors=(
+            "#rateStr",
+            "label#rateStr",
+            ".rateStr",
+            "span.exchAnimate",
+            "div.rateStr span",
+        ),
+        # CIMB serves its rate from a "cimbrate" XHR, which must survive any deny rule.
+        request_policy=RequestPolicy(allowed_url_patterns=("cimbrate",)),
+        log_response_patterns=("cimbrate",),
+        rate_endpoint=CIMB_RATE_ENDPOINT,
+        # CIMB Clicks Singapore only quotes SGD to MYR.
+        targets=("MYR",),
+    )
+)
+
+register_provider(
+    Provider(
+        platform="WISE",
+        label="Wise",
+        url="https://wise.com/gb/currency-converter/{base}-to-{target}-rate",
+        selectors=(
+            "span.cc__source-to-target",
+            "span[data-qa='exchange-rate']",
+            "span[data-qa='target-value']",
+            "div[data-qa='target-rate'] span",
+            "h2.np-text-title-section",
+            "h2[class*='np-text-title']",
+        ),
+        fallback_patterns=(rf"1\s*{{BASE}}\s*=\s*({NUMBER})\s*{{TARGET}}",),
+        rate_endpoint=WISE_RATE_ENDPOINT,
+        parse_rate_payload=parse_wise_payload,
+    )
+)
+
+register_provider(
+    Provider(
+        platform="WESTERNUNION",
+        label="Western Union",
+        url="https://www.westernunion.com/sg/en/currency-converter/{base}-to-{target}-rate.html",
+        selectors=(
+            "span.fx-to",
+            "[class*='fx-to']",
+            "[data-testid*='fx-to']",
+            "[class*='currency'] span",
+        ),
+        cookies=(
+            {
+                "name": "policy",
+                "value": "true",
+                "domain": ".westernunion.com",
+                "path": "/",
+            },
+        ),
+        init_scripts=(_HIDE_WEBDRIVER_SCRIPT,),
+        log_failed_requests=True,
+        rate_endpoint=WESTERNUNION_RATE_ENDPOINT,
+    )
+)
@@ -0,0 +1,160 @@
+"""Precompiled rate extraction for selector text and bounded HTML fallbacks."""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Iterable, Optional, Pattern, Sequence, Tuple
+
+# Digits with optional separator groups, e.g. "3.2405", "12,345.6" or "1.234,5".
+NUMBER = r"\d+(?:[.,]\d+)*"
+_NUMBER_RE = re.compile(NUMBER)
+
+# Characters kept on each side of a currency marker when searching page HTML.
+WINDOW_RADIUS = 256
+# Maximum HTML slices returned per page.
+MAX_WINDOWS = 200
+
+# Returns up to ``limit`` HTML slices reaching ``radius`` characters either side
+# of each case-insensitive occurrence of ``marker`` (overlapping slices are
+# merged), so only the slices cross the CDP connection instead of the whole
+# ``page.content()``.
+MARKER_SLICES_JS = """
+([marker, radius, limit]) => {
+    const html = document.documentElement ? document.documentElement.outerHTML : "";
+    const haystack = html.toLowerCase();
+    const needle = marker.toLowerCase();
+    const slices = [];
+    let start = -1;
+    let end = -1;
+    let index = haystack.indexOf(needle);
+    while (index !== -1 && slices.length < limit) {
+        if (start !== -1 && index - radius > end) {
+            slices.push(html.slice(start, end));
+            start = -1;
+        }
+        if (start === -1) {
+            start = Math.max(0, index - radius);
+        }
+        end = index + needle.length + radius;
+        index = haystack.indexOf(needle, index + needle.length);
+    }
+    if (start !== -1 && slices.length < limit) {
+        slices.push(html.slice(start, end));
+    }
+    return slices;
+}
+"""
+
+
+def normalize_number(token: str, decimal_comma: Optional[bool] = None) -> Optional[str]:
+    """Return ``token`` as a plain decimal string, resolving separators.
+
+    With both ``,`` and ``.`` present the last one is the decimal point
+    ("12,345.6" and "12.345,6" both give "12345.6"), and a separator repeated
+    within the number groups thousands ("1,234,567"). A lone dot is a decimal
+    point ("3.240"). A lone comma followed by exactly three digits groups
+    thousands ("12,345"); any other lone comma is a decimal comma ("3,2405").
+    Pass ``decimal_comma`` when the page's locale is known to skip the guess.
+    """
+    token = token.strip()
+    commas = token.count(",")
+    dots = token.count(".")
+    if commas and dots:
+        decimal = "," if token.rfind(",") > token.rfind(".") else "."
+        if token.count(decimal) > 1:
+            return None
+        grouping = "." if decimal == "," else ","
+        return token.replace(grouping, "").replace(decimal, ".")
+    if not commas and not dots:
+        return token or None
+    separator = "," if commas else "."
+    if token.count(separator) > 1:
+        return token.replace(separator, "")
+    whole, fraction = token.split(separator)
+    if decimal_comma is not None:
+        is_decimal = decimal_comma == (separator == ",")
+    else:
+        is_decimal = separator == "." or len(fraction) != 3 or len(whole) > 3
+    return f"{whole}.{fraction}" if is_decimal else whole + fraction
+
+
+@lru_cache(maxsize=64)
+def _target_pattern(target: str) -> Pattern[str]:
+    return re.compile(rf"{re.escape(target)}\s*({NUMBER})", re.IGNORECASE)
+
+
+@lru_cache(maxsize=64)
+def _before_target_pattern(target: str) -> Pattern[str]:
+    return re.compile(rf"({NUMBER})\s*{re.escape(target)}", re.IGNORECASE)
+
+
+@lru_cache(maxsize=64)
+def compile_pattern(pattern: str) -> Pattern[str]:
+    """Compile a provider fallback pattern once; group 1 must capture the number."""
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def extract_rate(
+    text: Optional[str], target: str = "MYR", base: Optional[str] = None
+) -> Optional[str]:
+    """Return the rate in selector ``text`` as a decimal string, or None if not rendered yet.
+
+    Only the right-hand side of an ``=`` is read, so the base amount of
+    "SGD 1.00 = MYR" is never taken for the rate. When the target currency
+    label is present, the number right after it ("MYR 3.2405") or right
+    before it ("3.2405 MYR") is the rate; a label with neither means the
+    template is still waiting for its data. Otherwise, with ``base`` given,
+    only numbers after the base code count ("1 SGD" has none), and the last
+    numeric token is taken.
+    """
+    if not text:
+        return None
+    text = text.rpartition("=")[2]
+    if target.lower() in text.lower():
+        match = _target_pattern(target).search(text) or _before_target_pattern(target).search(
+            text
+        )
+        return normalize_number(match.group(1)) if match else None
+    if base:
+        position = text.lower().rfind(base.lower())
+        if position != -1:
+            text = text[position + len(base) :]
+    tokens = _NUMBER_RE.findall(text)
+    return normalize_number(tokens[-1]) if tokens else None
+
+
+def search_patterns(
+    slices: Iterable[str], patterns: Sequence[Tuple[str, str]]
+) -> Optional[Tuple[str, str]]:
+    """Return ``(key, rate)`` for the first ``(key, pattern)`` matching any slice."""
+    slices = list(slices)
+    for key, pattern in patterns:
+        compiled = compile_pattern(pattern)
+        for text in slices:
+            match = compiled.search(text)
+            if match and (rate := normalize_number(match.group(1))):
+                return key, rate
+    return None
+
+
+def marker_windows(
+    content: str, marker: str, radius: int = WINDOW_RADIUS, limit: int = MAX_WINDOWS
+) -> list[str]:
+    """Python twin of ``MARKER_SLICES_JS`` for content already in memory."""
+    haystack = content.lower()
+    needle = marker.lower()
+    slices: list[str] = []
+    start = end = -1
+    index = haystack.find(needle)
+    while index != -1 and len(slices) < limit:
+        if start != -1 and index - radius > end:
+            slices.append(content[start:end])
+            start = -1
+        if start == -1:
+            start = max(0, index - radius)
+        end = index + len(needle) + radius
+        index = haystack.find(needle, index + len(needle))
+    if start != -1 and len(slices) < limit:
+        slices.append(content[start:end])
+    return slices
@@ -0,0 +1,195 @@
+"""Direct HTTP fetchers for providers that serve their rate from a JSON endpoint."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Tuple
+
+from .models import Rate
+from .rate_parser import normalize_number
+from .telemetry import ProviderResult, record_provider
+
+if TYPE_CHECKING:
+    import httpx
+
+    from .providers import Corridor, Provider
+
+HTTP_TIMEOUT_SECONDS = 5.0
+
+# Keys that commonly hold the converted rate in provider JSON payloads. Generic
+# keys such as "value" are left out: they also hold send and receive amounts.
+_RATE_KEYS = ("rate", "exchangeRate", "exchange_rate", "fxRate", "fx_rate")
+
+_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+def _as_rate(value: Any) -> Optional[str]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return str(value) if value > 0 else None
+    if isinstance(value, str):
+        rate = normalize_number(value)
+        try:
+            return rate if rate and float(rate) > 0 else None
+        except ValueError:
+            return None
+    return None
+
+
+def find_rate_value(payload: Any, corridor: Optional[Corridor] = None) -> Optional[str]:
+    """Return the shallowest positive number stored under a rate-like key in ``payload``.
+
+    The payload is searched breadth-first, so a top-level ``rate`` wins over
+    one nested deeper (e.g. inside a fee breakdown).
+    """
+    level: list[Any] = [payload]
+    while level:
+        children: list[Any] = []
+        for node in level:
+            if isinstance(node, dict):
+                for key in _RATE_KEYS:
+                    if key in node and (rate := _as_rate(node[key])):
+                        return rate
+                values: Iterable[Any] = node.values()
+            elif isinstance(node, list):
+                values = node
+            else:
+                continue
+            children.extend(value for value in values if isinstance(value, (dict, list)))
+        level = children
+    return None
+
+
+def parse_wise_payload(payload: Any, corridor: Corridor) -> Optional[str]:
+    """Parse the Wise live-rate payload.
+
+    The endpoint returns ``{"source": "SGD", "target": "MYR", "value": 3.24}``
+    or a list of such quotes, of which the last is used.
+    """
+    if isinstance(payload, list):
+        payload = payload[-1] if payload else None
+    if not isinstance(payload, dict):
+        return None
+    if (
+        payload.get("source", corridor.base) != corridor.base
+        or payload.get("target", corridor.target) != corridor.target
+    ):
+        return None
+    return _as_rate(payload.get("value"))
+
+
+def new_http_client(**kwargs: Any) -> httpx.AsyncClient:
+    """Return a keep-alive client for the fast path; pass ``transport`` to replay responses."""
+    # Deferred so the provider registry, which imports the payload parsers, stays light.
+    import httpx
+
+    return httpx.AsyncClient(
+        headers=_HEADERS,
+        timeout=HTTP_TIMEOUT_SECONDS,
+        follow_redirects=True,
+        **kwargs,
+    )
+
+
+async def _fetch_one(
+    client: httpx.AsyncClient,
+    provider: Provider,
+    corridor: Corridor,
+    timestamp: datetime,
+    semaphore: asyncio.Semaphore,
+) -> Optional[Rate]:
+    async with semaphore:
+        result = ProviderResult(
+            platform=provider.platform,
+            corridor=str(corridor),
+            source="http",
+            outcome="no_rate",
+            duration_ms=0.0,
+        )
+        started = asyncio.get_running_loop().time()
+        try:
+            return await _request_rate(client, provider, corridor, timestamp, result)
+        finally:
+            result.duration_ms = round((asyncio.get_running_loop().time() - started) * 1000, 3)
+            record_provider(result)
+
+
+async def _request_rate(
+    client: httpx.AsyncClient,
+    provider: Provider,
+    corridor: Corridor,
+    timestamp: datetime,
+    result: ProviderResult,
+) -> Optional[Rate]:
+    import httpx
+
+    label = f"{provider.label} {corridor}"
+    try:
+        response = await client.get(corridor.fill(provider.rate_endpoint or ""))
+        result.bytes = len(response.content)
+        response.raise_for_status()
+        parsed_rate = provider.parse_rate_payload(response.json(), corridor)
+    except (httpx.HTTPError, ValueError) as error:
+        result.outcome, result.error = "error", str(error)
+        print(f"[{label}][http] Fast path failed: {error}")
+        return None
+
+    if not parsed_rate:
+        print(f"[{label}][http] Response did not contain a rate.")
+        return None
+
+    try:
+        rate = Rate.parse(provider.platform, parsed_rate, timestamp, corridor)
+    except ValueError as error:
+        result.outcome, result.error = "error", str(error)
+        print(f"[{label}][http] Rejected rate: {error}")
+        return None
+    result.outcome = "ok"
+    print(f"[{label}][http] Exchange Rate: {rate.rate}")
+    return rate
+
+
+async def fetch_rates_http(
+    jobs: Iterable[Tuple[Provider, Corridor]],
+    timestamp: datetime,
+    client: Optional[httpx.AsyncClient] = None,
+    concurrency: int = 8,
+) -> Dict[Tuple[str, Corridor], Rate]:
+    """Fetch rates over plain HTTP for every job whose provider has a ``rate_endpoint``.
+
+    Returns the rates that succeeded keyed by ``(platform, corridor)``; callers
+    fall back to the browser scrapers for the rest.
+    """
+    selected = [(provider, corridor) for provider, corridor in jobs if provider.rate_endpoint]
+    if not selected:
+        return {}
+
+    semaphore = asyncio.Semaphore(concurrency)
+    owns_client = client is None
+    http = client or new_http_client()
+    try:
+        results = await asyncio.gather(
+            *(
+                _fetch_one(http, provider, corridor, timestamp, semaphore)
+                for provider, corridor in selected
+            )
+        )
+    finally:
+        if owns_client:
+            await http.aclose()
+
+    return {
+        (provider.platform, corridor): rate
+        for (provider, corridor), rate in zip(selected, results)
+        if rate is not None
+    }
@@ -2,23 +2,54 @@
 
 from __future__ import annotations
 
+import asyncio
 import os
-import re
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-
-from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
-from playwright.sync_api import Browser, BrowserContext, Page, sync_playwright
-
-CIMB_URL = "https://www.cimbclicks.com.sg/sgd-to-myr"
-WISE_URL = "https://wise.com/gb/currency-converter/sgd-to-myr-rate"
-WESTERNUNION_URL = (
-    "https://www.westernunion.com/sg/en/currency-converter/sgd-to-myr-rate.html"
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import httpx
+from playwright.async_api import Error as PlaywrightError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import Browser, BrowserContext, Page, async_playwright
+
+from .asset_cache import AssetCacheStats, get_asset_cache, install_asset_cache
+from .browser_pool import ContextPool, ProviderContext
+from .config import (
+    SCRAPE_BLOCK_REQUESTS,
+    SCRAPE_CONCURRENCY,
+    SCRAPE_HTTP_FAST_PATH,
+    SCRAPE_PROVIDER_BUDGET,
 )
-
-
-def _new_context(browser: Browser) -> BrowserContext:
-    return browser.new_context(
+from .health import CircuitBreakers
+from .models import Rate, now_sgt
+from .providers import PROVIDERS, Corridor, Provider, get_corridors, get_providers
+from .rate_parser import (
+    MARKER_SLICES_JS,
+    MAX_WINDOWS,
+    WINDOW_RADIUS,
+    extract_rate,
+    search_patterns,
+)
+from .rates_http import fetch_rates_http
+from .request_policy import RequestStats, install_request_policy
+from .selector_stats import SelectorStats
+from .telemetry import ProviderResult, current_report, record_provider, span
+
+# Overall wall-clock deadline for loading a provider page and reading its rate.
+PROVIDER_DEADLINE_SECONDS = 45.0
+# How often the readiness check re-reads the candidate selectors.
+READINESS_POLL_SECONDS = 0.25
+
+_READ_SELECTORS_JS = """
+(selectors) => selectors.map((selector) => {
+    const element = document.querySelector(selector);
+    return element ? element.textContent : null;
+})
+"""
+
+
+async def _new_context(browser: Browser) -> BrowserContext:
+    return await browser.new_context(
         user_agent=(
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
             "AppleWebKit/537.36 (KHTML, like Gecko) "
@@ -39,14 +70,64 @@ def _new_context(browser: Browser) -> BrowserContext:
     )
 
 
-def _launch_browser():
-    playwright = sync_playwright().start()
+async def open_provider_context(
+    browser: Browser, platform: str, use_asset_cache: bool = True
+) -> ProviderContext:
+    """Open a context with the asset cache, request policy, cookies and scripts of ``platform``."""
+    provider = PROVIDERS[platform]
+    with span("browser.new_context", platform=platform):
+        context = await _new_context(browser)
+        cache_stats: Optional[AssetCacheStats] = None
+        asset_cache = get_asset_cache() if use_asset_cache else None
+        if asset_cache:
+            # Registered first so the request policy below runs before it.
+            cache_stats = await install_asset_cache(context, asset_cache)
+        request_stats: Optional[RequestStats] = None
+        if SCRAPE_BLOCK_REQUESTS:
+            request_stats = await install_request_policy(context, provider.request_policy)
+        if provider.cookies:
+            await context.add_cookies(list(provider.cookies))
+        for script in provider.init_scripts:
+            await context.add_init_script(script)
+    return ProviderContext(
+        platform=platform,
+        context=context,
+        request_stats=request_stats,
+        cache_stats=cache_stats,
+    )
+
+
+def _report_requests(
+    label: str, provider_context: ProviderContext, result: ProviderResult
+) -> None:
+    """Print the context's request and cache counters into ``result``, then reset them."""
+    cache = provider_context.cache_stats
+    if cache:
+        result.cache_hits = cache.hits + cache.revalidated
+        result.cache_misses = cache.misses
+        result.cache_bytes_saved = cache.bytes_saved
+        print(f"[{label}] Asset cache: {cache.summary()}")
+        cache.reset()
+    stats = provider_context.request_stats
+    if stats:
+        result.bytes = stats.transferred_bytes
+        print(f"[{label}] Requests: {stats.summary()}")
+        stats.reset()
+
+
+async def launch_browser():
+    with span("browser.launch"):
+        return await _launch_browser()
+
+
+async def _launch_browser():
+    playwright = await async_playwright().start()
     is_ci = (
         os.getenv("CI") == "true"
         or os.getenv("GITHUB_ACTIONS") == "true"
         or not os.getenv("DISPLAY")
     )
-    browser = playwright.chromium.launch(
+    browser = await playwright.chromium.launch(
         headless=is_ci,
         args=[
             "--disable-blink-features=AutomationControlled",
@@ -60,275 +141,445 @@ def _launch_browser():
     return playwright, browser
 
 
-def _extract_rate_text(text: Optional[str]) -> Optional[str]:
-    if not text:
-        return None
-    # Prefer a number that follows a MYR label if present (e.g. "SGD 1.00 = MYR 3.2405").
-    myr_match = re.search(r"MYR\s*([\d]+(?:[.,]\d+)?)", text, flags=re.IGNORECASE)
-    if (match := myr_match) is not None:
-        return match.group(1).replace(",", "")
-    # Fall back to the last numeric token in the string.
-    matches = re.findall(r"[\d]+(?:[.,]\d+)?", text)
-    if matches:
-        return matches[-1].replace(",", "")
-    return None
+def provider_budget(provider: Provider) -> float:
+    """Hard wall-clock seconds allowed for one page scrape of ``provider``."""
+    return provider.budget_seconds or SCRAPE_PROVIDER_BUDGET
 
 
-def _scrape_cimb(browser: Browser, timestamp: datetime, rates: List[Dict[str, str]]) -> None:
-    print("\nAttempting to fetch CIMB rate...")
-    context: Optional[BrowserContext] = None
-    try:
-        context = _new_context(browser)
-        page = context.new_page()
+def _deadline(seconds: float = PROVIDER_DEADLINE_SECONDS) -> float:
+    return asyncio.get_running_loop().time() + seconds
 
-        def log_response(response):
-            if "cimbrate" in response.url.lower():
-                print(f"[CIMB][response] {response.status} {response.url}")
 
-        page.on("response", log_response)
+def _remaining_ms(deadline: float) -> float:
+    # Playwright treats a timeout of 0 as "wait forever", so never return it.
+    return max(1.0, (deadline - asyncio.get_running_loop().time()) * 1000)
 
-        print("Navigating to CIMB URL...")
-        page.goto(CIMB_URL, wait_until="networkidle", timeout=60000)
 
-        try:
-            page.wait_for_selector("#rateStr, span.exchAnimate", timeout=30000)
-        except PlaywrightTimeoutError:
-            print("CIMB rate elements did not appear within 30s; continuing without wait.")
-
-        selectors = [
-            "#rateStr",
-            "label#rateStr",
-            ".rateStr",
-            "span.exchAnimate",
-            "div.rateStr span",
-        ]
-        parsed_rate = None
-        for selector in selectors:
-            element = page.query_selector(selector)
-            if not element:
-                continue
-            text = element.text_content().strip()
-            parsed_rate = _extract_rate_text(text)
-            if parsed_rate:
-                print(f"Found CIMB rate element with selector '{selector}': {text}")
-                break
-
-        if parsed_rate:
-            print(f"CIMB Exchange Rate: {parsed_rate}")
-            rates.append(
-                {
-                    "exchange_rate": parsed_rate,
-                    "retrieved_at": timestamp.isoformat(),
-                    "platform": "CIMB",
-                    "base_currency": "SGD",
-                    "target_currency": "MYR",
-                }
-            )
-        else:
-            print("CIMB rate element not found or unparsable!")
+class RateMatch(NamedTuple):
+    key: str  # the selector, or the fallback pattern when ``fallback``
+    text: str
+    rate: str
+    fallback: bool = False
 
-    except PlaywrightTimeoutError as error:
-        print(f"CIMB scraping timed out: {error}")
-    except Exception as error:  # pragma: no cover - defensive path
-        print(f"Error fetching CIMB rate: {error}")
-    finally:
-        if context:
-            context.close()
 
+async def _search_fallback(
+    page: Page, base: str, patterns: Sequence[Tuple[str, str]]
+) -> Optional[RateMatch]:
+    """Search the page HTML around ``base`` for ``(key, pattern)`` pairs.
 
-def _scrape_wise(browser: Browser, timestamp: datetime, rates: List[Dict[str, str]]) -> None:
-    print("\nAttempting to fetch Wise rate...")
-    context: Optional[BrowserContext] = None
-    try:
-        context = _new_context(browser)
-        page = context.new_page()
+    Only the slices around the base currency marker leave the browser.
+    """
+    slices = await page.evaluate(MARKER_SLICES_JS, [base, WINDOW_RADIUS, MAX_WINDOWS])
+    found = search_patterns(slices, patterns)
+    if found and float(found[1]) > 0:
+        return RateMatch(found[0], found[1], found[1], fallback=True)
+    return None
 
-        print("Navigating to Wise URL...")
-        response = page.goto(WISE_URL, wait_until="domcontentloaded", timeout=60000)
-        if response:
-            print(f"[Wise] Initial response status: {response.status}")
 
+async def _wait_for_rate(
+    page: Page,
+    selectors: List[str],
+    deadline: float,
+    target: str = "MYR",
+    base: Optional[str] = None,
+    fallback_patterns: Sequence[Tuple[str, str]] = (),
+) -> Optional[RateMatch]:
+    """Return the first selector (or fallback pattern) that holds a parsable rate.
+
+    Half-rendered templates such as "SGD 1.00 = MYR" do not count as ready
+    (see ``extract_rate``).
+
+    All candidate selectors are read in a single round trip per poll, so the
+    check costs the same regardless of how many selectors a provider lists.
+    With ``fallback_patterns`` (and ``base``), each poll also searches the
+    page markup, for providers whose rate last came from a pattern. Returns
+    None once ``deadline`` (an event loop timestamp) passes.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
         try:
-            page.wait_for_selector("h2.np-text-title-section", timeout=30000)
-            print("Wise headline selector appeared.")
-        except PlaywrightTimeoutError:
-            print("Wise headline selector did not appear within 30s; continuing.")
-
-        page.wait_for_timeout(5000)
-
-        selectors = [
-            "span.cc__source-to-target",
-            "span[data-qa='exchange-rate']",
-            "span[data-qa='target-value']",
-            "div[data-qa='target-rate'] span",
-            "h2.np-text-title-section",
-            "h2[class*='np-text-title']",
-        ]
-
-        parsed_rate = None
-        for selector in selectors:
-            element = page.query_selector(selector)
-            if element:
-                text = element.text_content().strip()
-                parsed_rate = _extract_rate_text(text)
-                if parsed_rate:
-                    print(f"Found Wise rate element with selector '{selector}': {text}")
-                    break
-
-        if not parsed_rate:
-            # Fallback: search the entire page content for an SGD-to-MYR pattern.
-            print("Wise selectors failed; attempting regex fallback on page content.")
-            full_text = page.content()
-            if full_text:
-                headline_match = re.search(
-                    r"1\s*SGD\s*=\s*([\d]+(?:[.,]\d+)?)\s*MYR", full_text, flags=re.IGNORECASE
-                )
-                if headline_match:
-                    parsed_rate = headline_match.group(1).replace(",", "")
-                    print("Regex fallback extracted Wise rate from headline markup.")
-
-        if parsed_rate:
-            print(f"Wise Exchange Rate: {parsed_rate}")
-            rates.append(
-                {
-                    "exchange_rate": parsed_rate,
-                    "retrieved_at": timestamp.isoformat(),
-                    "platform": "WISE",
-                    "base_currency": "SGD",
-                    "target_currency": "MYR",
-                }
-            )
-        else:
-            print("Wise rate element not found or unparsable!")
+            texts = await page.evaluate(_READ_SELECTORS_JS, selectors)
+        except PlaywrightError:
+            # The execution context is replaced while the page is still navigating.
+            texts = []
+        for selector, text in zip(selectors, texts):
+            parsed_rate = extract_rate(text, target, base)
+            # Placeholders such as "0.0000" render before the real rate arrives.
+            if parsed_rate and float(parsed_rate) > 0:
+                return RateMatch(selector, text.strip(), parsed_rate)
+        if fallback_patterns and base:
+            try:
+                match = await _search_fallback(page, base, fallback_patterns)
+            except PlaywrightError:
+                match = None
+            if match:
+                return match
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return None
+        await asyncio.sleep(min(READINESS_POLL_SECONDS, remaining))
+
+
+async def scrape_provider(
+    provider: Provider,
+    corridor: Corridor,
+    provider_context: ProviderContext,
+    timestamp: datetime,
+    selector_stats: Optional[SelectorStats] = None,
+) -> Optional[Rate]:
+    """Load ``provider``'s page for ``corridor`` in ``provider_context`` and return its rate.
+
+    With ``selector_stats``, selectors and fallback patterns that matched in
+    earlier runs are tried first and the outcome is recorded for later runs.
+    """
+    label = f"{provider.label} {corridor}"
+    print(f"\nAttempting to fetch {label} rate...")
+    page: Optional[Page] = None
+    result = ProviderResult(
+        platform=provider.platform,
+        corridor=str(corridor),
+        source="browser",
+        outcome="no_rate",
+        duration_ms=0.0,
+    )
+    started = asyncio.get_running_loop().time()
+    try:
+        page = await provider_context.context.new_page()
 
-    except PlaywrightTimeoutError as error:
-        print(f"Wise scraping timed out: {error}")
-    except Exception as error:
-        print(f"Error fetching Wise rate: {error}")
-    finally:
-        if context:
-            context.close()
+        if provider.log_response_patterns:
 
+            def log_response(response):
+                url = response.url.lower()
+                if any(pattern in url for pattern in provider.log_response_patterns):
+                    print(f"[{label}][response] {response.status} {response.url}")
 
-def _scrape_western_union(
-    browser: Browser, timestamp: datetime, rates: List[Dict[str, str]]
-) -> None:
-    print("\nAttempting to fetch Western Union rate...")
-    context: Optional[BrowserContext] = None
-    page: Optional[Page] = None
-    try:
-        context = _new_context(browser)
-        context.add_cookies(
-            [
-                {
-                    "name": "policy",
-                    "value": "true",
-                    "domain": ".westernunion.com",
-                    "path": "/",
-                }
-            ]
-        )
-        page = context.new_page()
+            page.on("response", log_response)
 
-        def log_failed_request(request):
-            print(
-                f"[WesternUnion request failed] {request.method} {request.url} - {request.failure}"
-            )
+        if provider.log_failed_requests:
 
-        page.on("request_failed", log_failed_request)
-
-        print("Navigating to Western Union URL...")
-        page.add_init_script(
-            """
-            Object.defineProperty(navigator, 'webdriver', {
-                get: () => undefined,
-            });
-            window.chrome = {
-                runtime: {},
-                loadTimes: function() {},
-                csi: function() {},
-                app: {},
-            };
-            delete navigator.__proto__.webdriver;
-        """
-        )
+            def log_failed_request(request):
+                print(
+                    f"[{label} request failed] {request.method} {request.url} - {request.failure}"
+                )
 
-        try:
-            response = page.goto(
-                WESTERNUNION_URL, timeout=60000, wait_until="domcontentloaded"
-            )
-        except PlaywrightTimeoutError:
-            print(
-                "Western Union navigation timed out while waiting for domcontentloaded; continuing."
-            )
-            response = None
+            page.on("requestfailed", log_failed_request)
 
+        print(f"Navigating to {label} URL...")
+        deadline = _deadline(min(PROVIDER_DEADLINE_SECONDS, provider_budget(provider)))
         try:
-            page.wait_for_load_state("networkidle", timeout=30000)
-            print("Western Union page reached 'networkidle' state.")
+            with span("scrape.navigate", platform=provider.platform, corridor=str(corridor)):
+                response = await page.goto(
+                    corridor.fill(provider.url),
+                    wait_until="commit",
+                    timeout=_remaining_ms(deadline),
+                )
+            if response:
+                print(f"[{label}] Initial response status: {response.status}")
         except PlaywrightTimeoutError:
-            print("Western Union page did not reach 'networkidle' within 30s; continuing.")
-
-        page.wait_for_timeout(5000)
-
-        selectors = [
-            "span.fx-to",
-            "[class*='fx-to']",
-            "[data-testid*='fx-to']",
-            "[class*='currency'] span",
-        ]
-
-        parsed_rate = None
-        for selector in selectors:
-            rate_element = page.query_selector(selector)
-            if rate_element:
-                text = rate_element.text_content().strip()
-                parsed_rate = _extract_rate_text(text)
-                if parsed_rate:
-                    print(f"Found rate element with selector: {selector}")
-                    break
-
-        if parsed_rate:
-            print(f"Western Union Exchange Rate: {parsed_rate}")
-            rates.append(
-                {
-                    "exchange_rate": parsed_rate,
-                    "retrieved_at": timestamp.isoformat(),
-                    "platform": "WESTERNUNION",
-                    "base_currency": "SGD",
-                    "target_currency": "MYR",
-                }
+            print(f"{label} navigation timed out before the response arrived; continuing.")
+
+        selectors = list(provider.selectors)
+        fallback_patterns = list(provider.fallback_patterns)
+        if selector_stats:
+            selectors = selector_stats.order(provider.platform, selectors)
+            fallback_patterns = selector_stats.order(provider.platform, fallback_patterns)
+
+        patterns = [(pattern, corridor.fill(pattern)) for pattern in fallback_patterns]
+        eager = bool(selector_stats and selector_stats.fallback_first(provider.platform))
+        with span("scrape.wait_for_rate", platform=provider.platform, corridor=str(corridor)):
+            match = await _wait_for_rate(
+                page,
+                selectors,
+                deadline,
+                corridor.target,
+                corridor.base,
+                patterns if eager else (),
+            )
+        if match and not match.fallback:
+            result.selector = match.key
+            result.selector_index = list(provider.selectors).index(match.key)
+            print(f"Found {label} rate element with selector '{match.key}': {match.text}")
+        elif not match and patterns:
+            print(f"{label} selectors failed; attempting regex fallback on page content.")
+            with span("scrape.fallback", platform=provider.platform, corridor=str(corridor)):
+                match = await _search_fallback(page, corridor.base, patterns)
+        if match and match.fallback:
+            result.selector = "regex fallback"
+            print(f"Regex fallback extracted {label} rate from page markup.")
+        if selector_stats:
+            selector_stats.record(
+                provider.platform,
+                match.key if match else None,
+                fallback=match is None or match.fallback,
             )
-        else:
-            print("Western Union rate element not found or unparsable!")
+
+        if match:
+            rate = Rate.parse(provider.platform, match.rate, timestamp, corridor)
+            result.outcome = "ok"
+            print(f"{label} Exchange Rate: {rate.rate}")
+            return rate
+        print(f"{label} rate element not found or unparsable!")
 
     except PlaywrightTimeoutError as error:
-        print(f"Western Union scraping timed out: {error}")
+        result.outcome, result.error = "error", f"timeout: {error}"
+        print(f"{label} scraping timed out: {error}")
+    except asyncio.CancelledError:
+        result.outcome, result.error = "error", "cancelled: provider budget exceeded"
+        raise
     except Exception as error:
-        print(f"Error fetching Western Union rate: {error}")
+        result.outcome, result.error = "error", str(error)
+        print(f"Error fetching {label} rate: {error}")
     finally:
+        _report_requests(label, provider_context, result)
         if page:
-            page.close()
-        if context:
-            context.close()
+            await page.close()
+        result.duration_ms = round((asyncio.get_running_loop().time() - started) * 1000, 3)
+        record_provider(result)
+    return None
 
 
-def collect_rates() -> List[Dict[str, str]]:
-    """Collect exchange rates from the supported providers."""
-    playwright = None
-    browser = None
+async def _scrape_corridors(
+    pool: ContextPool,
+    provider: Provider,
+    corridors: List[Corridor],
+    timestamp: datetime,
+    semaphore: asyncio.Semaphore,
+    selector_stats: Optional[SelectorStats] = None,
+) -> List[Optional[Rate]]:
+    """Scrape ``provider``'s corridors as parallel pages of one pooled context.
+
+    Every page takes its own slot from ``semaphore``. The context is acquired
+    when the first page gets a slot and released once every page is done, as
+    unhealthy if any corridor went without a rate.
+    """
+    provider_context: Optional[ProviderContext] = None
+    acquiring = asyncio.Lock()
+    budget = provider_budget(provider)
+
+    async def scrape(corridor: Corridor) -> Optional[Rate]:
+        nonlocal provider_context
+        async with semaphore:
+            async with acquiring:
+                if provider_context is None:
+                    provider_context = await pool.acquire(provider.platform)
+            try:
+                return await asyncio.wait_for(
+                    scrape_provider(
+                        provider, corridor, provider_context, timestamp, selector_stats
+                    ),
+                    timeout=budget,
+                )
+            except asyncio.TimeoutError:
+                print(f"[{provider.label} {corridor}] Gave up after its {budget:g}s budget.")
+                return None
+
+    rates: List[Optional[Rate]] = []
     try:
-        playwright, browser = _launch_browser()
-        rates: List[Dict[str, str]] = []
-        timestamp = datetime.utcnow() + timedelta(hours=8)
+        rates = list(await asyncio.gather(*(scrape(corridor) for corridor in corridors)))
+    finally:
+        if provider_context is not None:
+            healthy = len(rates) == len(corridors) and all(rates)
+            await pool.release(provider_context, healthy=healthy)
+    return rates
+
+
+def _skip_open(
+    jobs: List[Tuple[Provider, Corridor]], breakers: CircuitBreakers
+) -> List[Tuple[Provider, Corridor]]:
+    """Return the jobs whose provider's breaker lets them run; report the rest as skipped."""
+    allowed = []
+    for provider, corridor in jobs:
+        if breakers.allow(provider.platform):
+            allowed.append((provider, corridor))
+            continue
+        retry_at = breakers.retry_at(provider.platform)
+        reason = f"circuit open until {retry_at.isoformat() if retry_at else 'unknown'}"
+        print(f"[{provider.label} {corridor}] Skipped: {reason}.")
+        record_provider(
+            ProviderResult(
+                platform=provider.platform,
+                corridor=str(corridor),
+                source="breaker",
+                outcome="skipped",
+                duration_ms=0.0,
+                error=reason,
+            )
+        )
+    return allowed
 
-        _scrape_cimb(browser, timestamp, rates)
-        _scrape_wise(browser, timestamp, rates)
-        _scrape_western_union(browser, timestamp, rates)
 
+def _last_error(platform: str, corridor: Corridor) -> Optional[str]:
+    report = current_report()
+    if not report:
+        return None
+    errors = [
+        result.error
+        for result in report.providers
+        if result.platform == platform and result.corridor == str(corridor) and result.error
+    ]
+    return errors[-1] if errors else None
+
+
+def _record_health(
+    breakers: CircuitBreakers,
+    jobs: Sequence[Tuple[Provider, Corridor]],
+    rates: Sequence[Optional[Rate]],
+) -> None:
+    """Record one outcome per provider for this run, however many corridors it served.
+
+    A provider succeeds when any of its corridors returned a rate; otherwise
+    the first corridor's error is kept. Corridors that keep failing on a live
+    provider are backed off by the scheduler instead.
+    """
+    succeeded: set[str] = set()
+    errors: Dict[str, str] = {}
+    for (provider, corridor), rate in zip(jobs, rates):
+        if rate is not None:
+            succeeded.add(provider.platform)
+        elif provider.platform not in errors:
+            errors[provider.platform] = _last_error(provider.platform, corridor) or "no rate"
+    for platform in dict.fromkeys(provider.platform for provider, _ in jobs):
+        ok = platform in succeeded
+        breakers.record(platform, ok=ok, error=None if ok else errors.get(platform))
+
+
+def build_jobs(
+    providers: Optional[Sequence[str]] = None,
+    corridors: Optional[Sequence[Corridor]] = None,
+) -> List[Tuple[Provider, Corridor]]:
+    """Return the ``(provider, corridor)`` pairs to scrape, in registry then corridor order."""
+    selected_corridors = list(corridors) if corridors else get_corridors()
+    return [
+        (provider, corridor)
+        for provider in get_providers(providers)
+        for corridor in selected_corridors
+        if provider.supports(corridor)
+    ]
+
+
+async def collect_rates_async(
+    providers: Optional[Sequence[str]] = None,
+    corridors: Optional[Sequence[Corridor]] = None,
+    concurrent: bool = True,
+    concurrency: Optional[int] = None,
+    pool: Optional[ContextPool] = None,
+    http_client: Optional[httpx.AsyncClient] = None,
+    jobs: Optional[Sequence[Tuple[Provider, Corridor]]] = None,
+) -> List[Rate]:
+    """Collect exchange rates for every provider and corridor in one run.
+
+    ``providers`` and ``corridors`` default to the full registry and the
+    configured ``CORRIDORS``; pass ``jobs`` (e.g. from a ``Scheduler`` plan)
+    to scrape an explicit subset of ``build_jobs()`` instead. Jobs whose
+    provider's circuit breaker is open are skipped and reported. Jobs with a
+    ``rate_endpoint`` are fetched over plain HTTP first; Chromium is only
+    launched for the ones whose fast path fails. One browser serves every
+    remaining job, at most ``concurrency`` pages load at a time (one when
+    ``concurrent`` is False), each page scrape is cancelled after its
+    provider's budget, and each provider's corridors load as parallel pages
+    of one shared context. Pass a long-lived ``pool`` (and ``http_client``) to reuse a warm
+    browser across calls. Results are always returned in registry order, then
+    corridor order.
+    """
+    with span("collect_rates") as run_span:
+        rates = await _collect_rates(
+            list(jobs) if jobs is not None else build_jobs(providers, corridors),
+            concurrent,
+            concurrency,
+            pool,
+            http_client,
+        )
+        run_span.attributes["rates"] = len(rates)
         return rates
-    finally:
-        if browser:
-            browser.close()
-        if playwright:
-            playwright.stop()
+
+
+async def _collect_rates(
+    jobs: List[Tuple[Provider, Corridor]],
+    concurrent: bool,
+    concurrency: Optional[int],
+    pool: Optional[ContextPool],
+    http_client: Optional[httpx.AsyncClient],
+) -> List[Rate]:
+    breakers = CircuitBreakers.load()
+    runnable = _skip_open(jobs, breakers)
+    limit = max(1, concurrency or SCRAPE_CONCURRENCY) if concurrent else 1
+    timestamp = now_sgt()
+    fast_rates: Dict[Tuple[str, Corridor], Rate] = {}
+    if SCRAPE_HTTP_FAST_PATH:
+        with span("http.fast_path", jobs=len(runnable)):
+            fast_rates = await fetch_rates_http(
+                runnable, timestamp, client=http_client, concurrency=max(limit, 8)
+            )
+
+    pending = [
+        (provider, corridor)
+        for provider, corridor in runnable
+        if (provider.platform, corridor) not in fast_rates
+    ]
+    scraped: Dict[Tuple[str, Corridor], Optional[Rate]] = {}
+    if pending:
+        playwright = None
+        owned_pool: Optional[ContextPool] = None
+        selector_stats = SelectorStats.load()
+        try:
+            if pool is None:
+                playwright, browser = await launch_browser()
+                owned_pool = ContextPool(browser, open_provider_context)
+            active_pool = pool or owned_pool
+            semaphore = asyncio.Semaphore(limit)
+            # Every corridor gets its own page under the shared semaphore; a
+            # provider's pages share one context, so the pool never holds two
+            # contexts per platform.
+            by_provider: Dict[str, Tuple[Provider, List[Corridor]]] = {}
+            for provider, corridor in pending:
+                by_provider.setdefault(provider.platform, (provider, []))[1].append(corridor)
+            results = await asyncio.gather(
+                *(
+                    _scrape_corridors(
+                        active_pool, provider, corridors, timestamp, semaphore, selector_stats
+                    )
+                    for provider, corridors in by_provider.values()
+                )
+            )
+            scraped = {
+                (provider.platform, corridor): rate
+                for (provider, corridors), provider_rates in zip(by_provider.values(), results)
+                for corridor, rate in zip(corridors, provider_rates)
+            }
+        finally:
+            selector_stats.save()
+            if owned_pool:
+                await owned_pool.close()
+                await owned_pool.browser.close()
+            if playwright:
+                await playwright.stop()
+    elif runnable:
+        print("All providers answered over HTTP; skipping browser launch.")
+
+    rates = [
+        fast_rates.get((provider.platform, corridor))
+        or scraped.get((provider.platform, corridor))
+        for provider, corridor in runnable
+    ]
+    _record_health(breakers, runnable, rates)
+    breakers.save()
+    return [rate for rate in rates if rate]
+
+
+def collect_rates(
+    providers: Optional[Sequence[str]] = None,
+    corridors: Optional[Sequence[Corridor]] = None,
+    concurrent: bool = True,
+    concurrency: Optional[int] = None,
+    jobs: Optional[Sequence[Tuple[Provider, Corridor]]] = None,
+) -> List[Rate]:
+    """Collect exchange rates for every provider and corridor in one run."""
+    return asyncio.run(
+        collect_rates_async(
+            providers=providers,
+            corridors=corridors,
+            concurrent=concurrent,
+            concurrency=concurrency,
+            jobs=jobs,
+        )
+    )
@@ -2,39 +2,172 @@
 
 from __future__ import annotations
 
-from collections import OrderedDict
-from typing import Any
+import asyncio
+from typing import TYPE_CHECKING, Any, Iterator, Sequence, Union
 
-from .config import BASE_CURRENCY, TARGET_CURRENCY
+from .cache import CacheStats, TTLCache
+from .config import BASE_CURRENCY, RATES_CACHE_MAXSIZE, RATES_CACHE_TTL, TARGET_CURRENCY
+from .models import Rate
+from .telemetry import span
 from . import supabase_client
 
+if TYPE_CHECKING:
+    from .history_store import HistoryStore
 
-def insert_rates(rates: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    """Insert rates after enriching with base/target currencies."""
-    if not rates:
-        return []
+RateLike = Union[Rate, dict[str, Any]]
+
+# Reads only change when new rows are written, which invalidates this cache.
+_READ_CACHE: TTLCache[list[dict[str, Any]]] = TTLCache(
+    maxsize=RATES_CACHE_MAXSIZE, ttl=RATES_CACHE_TTL
+)
+
+
+def cache_stats() -> CacheStats:
+    """Return hit/miss counters for the read cache."""
+    return _READ_CACHE.stats()
 
-    enriched = [
-        {
+
+def clear_cache() -> None:
+    """Drop cached reads so the next call hits Supabase."""
+    _READ_CACHE.invalidate()
+
+
+def _to_payloads(rates: Sequence[RateLike]) -> list[dict[str, Any]]:
+    """Serialize ``Rate`` records; legacy dict rows get default base/target currencies."""
+    return [
+        rate.to_payload()
+        if isinstance(rate, Rate)
+        else {
             **rate,
             "base_currency": rate.get("base_currency", BASE_CURRENCY),
             "target_currency": rate.get("target_currency", TARGET_CURRENCY),
         }
         for rate in rates
     ]
-    return supabase_client.insert_rows(enriched)
 
 
-def get_rates(limit: int | None = None) -> list[dict[str, Any]]:
-    """Return exchange rates ordered newest first."""
-    return supabase_client.fetch_rows(limit=limit)
+def insert_rates(rates: Sequence[RateLike]) -> list[dict[str, Any]]:
+    """Insert rates, serializing them to Supabase rows."""
+    if not rates:
+        return []
+    try:
+        with span("supabase.insert", rows=len(rates)):
+            return supabase_client.insert_rows(_to_payloads(rates))
+    finally:
+        _READ_CACHE.invalidate()
+
+
+def upsert_rates(
+    rates: Sequence[RateLike], chunk_size: int = 500
+) -> list[supabase_client.ChunkResult]:
+    """Idempotently write rates in retried chunks; see ``supabase_client.upsert_rows``."""
+    if not rates:
+        return []
+    try:
+        with span("supabase.upsert", rows=len(rates)) as write_span:
+            results = supabase_client.upsert_rows(_to_payloads(rates), chunk_size=chunk_size)
+            write_span.attributes["failed_chunks"] = sum(not result.ok for result in results)
+            return results
+    finally:
+        _READ_CACHE.invalidate()
+
+
+def iter_rates(
+    columns: str = "*", batch_size: int = supabase_client.DEFAULT_PAGE_SIZE, **filters: Any
+) -> Iterator[dict[str, Any]]:
+    """Stream exchange rates newest first without loading the table into memory."""
+    return supabase_client.iter_rows(columns=columns, batch_size=batch_size, **filters)
+
+
+def get_rates(limit: int | None = None, columns: str = "*") -> list[dict[str, Any]]:
+    """Return exchange rates ordered newest first (cached; see ``RATES_CACHE_TTL``)."""
+    return list(
+        _READ_CACHE.get_or_load(
+            ("get_rates", limit, columns),
+            lambda: supabase_client.fetch_rows(limit=limit, columns=columns),
+        )
+    )
 
 
 def get_latest_rates() -> list[dict[str, Any]]:
-    """Return the most recent rate per platform."""
-    latest: "OrderedDict[str, dict[str, Any]]" = OrderedDict()
-    for row in get_rates():
-        platform = row.get("platform")
-        if platform not in latest:
-            latest[platform] = row
-    return list(latest.values())
+    """Return the most recent rate per platform and corridor (cached)."""
+    return list(
+        _READ_CACHE.get_or_load(("get_latest_rates",), supabase_client.fetch_latest_rows)
+    )
+
+
+async def ainsert_rates(rates: Sequence[RateLike]) -> list[dict[str, Any]]:
+    """Async ``insert_rates`` over the shared PostgREST session."""
+    if not rates:
+        return []
+    try:
+        with span("supabase.insert", rows=len(rates)):
+            return await supabase_client.ainsert_rows(_to_payloads(rates))
+    finally:
+        _READ_CACHE.invalidate()
+
+
+async def aupsert_rates(
+    rates: Sequence[RateLike], chunk_size: int = 500, concurrency: int = 4
+) -> list[supabase_client.ChunkResult]:
+    """Async ``upsert_rates``; up to ``concurrency`` chunks are written at once."""
+    if not rates:
+        return []
+    try:
+        with span("supabase.upsert", rows=len(rates)) as write_span:
+            results = await supabase_client.aupsert_rows(
+                _to_payloads(rates), chunk_size=chunk_size, concurrency=concurrency
+            )
+            write_span.attributes["failed_chunks"] = sum(not result.ok for result in results)
+            return results
+    finally:
+        _READ_CACHE.invalidate()
+
+
+async def aget_rates(limit: int | None = None, columns: str = "*") -> list[dict[str, Any]]:
+    """Async ``get_rates``; shares the read cache with the synchronous functions."""
+    return list(
+        await _READ_CACHE.aget_or_load(
+            ("get_rates", limit, columns),
+            lambda: supabase_client.afetch_rows(limit=limit, columns=columns),
+        )
+    )
+
+
+async def aget_latest_rates() -> list[dict[str, Any]]:
+    """Async ``get_latest_rates`` (cached)."""
+    return list(
+        await _READ_CACHE.aget_or_load(
+            ("get_latest_rates",), supabase_client.afetch_latest_rows
+        )
+    )
+
+
+async def aget_rates_by_platform(
+    platforms: Sequence[str],
+    after: str | None = None,
+    before: str | None = None,
+    columns: str = "*",
+    **filters: Any,
+) -> dict[str, list[dict[str, Any]]]:
+    """Fetch each platform's rows between ``after`` and ``before`` concurrently.
+
+    One query per platform runs over the shared session, so the total time is
+    close to the slowest platform rather than the sum of all of them.
+    """
+
+    async def fetch(platform: str) -> list[dict[str, Any]]:
+        with span("supabase.select", platform=platform):
+            return await supabase_client.afetch_rows(
+                columns=columns, after=after, before=before, platform=platform, **filters
+            )
+
+    results = await asyncio.gather(*(fetch(platform) for platform in platforms))
+    return dict(zip(platforms, results))
+
+
+def sync_history(store: HistoryStore | None = None) -> int:
+    """Pull new rows into the local history store; returns how many were added."""
+    from .history_store import HistoryStore
+
+    return (store or HistoryStore()).sync()
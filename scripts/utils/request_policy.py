@@ -0,0 +1,136 @@
+"""Request interception policies that keep scraper page loads lean."""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from .asset_cache import CACHE_HEADER
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Request, Response, Route
+
+# Resource types that never carry the rate we read from the page.
+DEFAULT_BLOCKED_RESOURCE_TYPES: frozenset[str] = frozenset({"image", "font", "media"})
+
+# Analytics, advertising, chat and A/B-testing hosts seen on the provider pages.
+DEFAULT_BLOCKED_DOMAINS: tuple[str, ...] = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "facebook.net",
+    "connect.facebook.com",
+    "hotjar.com",
+    "clarity.ms",
+    "bat.bing.com",
+    "analytics.tiktok.com",
+    "snap.licdn.com",
+    "ads.linkedin.com",
+    "demdex.net",
+    "omtrdc.net",
+    "newrelic.com",
+    "nr-data.net",
+    "segment.io",
+    "segment.com",
+    "optimizely.com",
+    "abtasty.com",
+    "visualwebsiteoptimizer.com",
+    "intercom.io",
+    "zdassets.com",
+    "zendesk.com",
+    "livechatinc.com",
+)
+
+
+@dataclass(frozen=True)
+class RequestPolicy:
+    """Allow and deny lists applied to every request a scraper context makes.
+
+    ``allowed_url_patterns`` and ``allowed_domains`` always win, so a provider can
+    keep a rate XHR alive even when it would otherwise match a deny rule.
+    """
+
+    blocked_resource_types: frozenset[str] = DEFAULT_BLOCKED_RESOURCE_TYPES
+    blocked_domains: tuple[str, ...] = DEFAULT_BLOCKED_DOMAINS
+    allowed_domains: tuple[str, ...] = ()
+    allowed_url_patterns: tuple[str, ...] = ()
+
+    def allows(self, url: str, resource_type: str) -> bool:
+        lowered = url.lower()
+        if any(pattern in lowered for pattern in self.allowed_url_patterns):
+            return True
+        host = urlsplit(lowered).hostname or ""
+        if _matches_domain(host, self.allowed_domains):
+            return True
+        if resource_type in self.blocked_resource_types:
+            return False
+        return not _matches_domain(host, self.blocked_domains)
+
+
+@dataclass
+class RequestStats:
+    """Counters collected while a policy is installed on a context."""
+
+    blocked_requests: int = 0
+    blocked_by_type: Counter = field(default_factory=Counter)
+    allowed_requests: int = 0
+    transferred_bytes: int = 0
+
+    def reset(self) -> None:
+        self.blocked_requests = 0
+        self.blocked_by_type.clear()
+        self.allowed_requests = 0
+        self.transferred_bytes = 0
+
+    def summary(self) -> str:
+        by_type = ", ".join(
+            f"{kind}: {count}" for kind, count in self.blocked_by_type.most_common()
+        )
+        return (
+            f"blocked {self.blocked_requests} requests"
+            + (f" ({by_type})" if by_type else "")
+            + f", allowed {self.allowed_requests}"
+            + f", transferred {self.transferred_bytes / 1024:.1f} KiB"
+        )
+
+
+def _matches_domain(host: str, domains: tuple[str, ...]) -> bool:
+    return any(host == domain or host.endswith(f".{domain}") for domain in domains)
+
+
+async def install_request_policy(
+    context: BrowserContext, policy: RequestPolicy
+) -> RequestStats:
+    """Route every request in ``context`` through ``policy`` and return live stats.
+
+    Allowed requests fall back to any other route handler registered on the
+    context (or the network), so further handlers can be layered on top.
+    Blocked requests never hit the network, which means their size is unknown;
+    ``transferred_bytes`` counts what the allowed responses declared in their
+    ``Content-Length`` headers instead, leaving out responses served by the
+    asset cache.
+    """
+    stats = RequestStats()
+
+    async def handle(route: Route, request: Request) -> None:
+        if policy.allows(request.url, request.resource_type):
+            stats.allowed_requests += 1
+            await route.fallback()
+            return
+        stats.blocked_requests += 1
+        stats.blocked_by_type[request.resource_type] += 1
+        await route.abort("blockedbyclient")
+
+    def record_response(response: Response) -> None:
+        if CACHE_HEADER in response.headers:
+            return
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            stats.transferred_bytes += int(length)
+
+    await context.route("**/*", handle)
+    context.on("response", record_response)
+    return stats
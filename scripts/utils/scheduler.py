@@ -0,0 +1,260 @@
+"""Adaptive polling: scrape fast-moving, cheap providers often and slow or costly ones rarely."""
+
+from __future__ import annotations
+
+import json
+import math
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from statistics import median
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import (
+    SCHEDULE_BUDGET_SECONDS,
+    SCHEDULE_MAX_INTERVAL,
+    SCHEDULE_MIN_INTERVAL,
+    SCHEDULER_STATE_PATH,
+    SCRAPE_CONCURRENCY,
+)
+from .file_utils import write_text_atomic
+from .models import Rate, now_sgt, parse_datetime
+from .providers import Corridor, Provider
+from .telemetry import ProviderResult
+
+Job = Tuple[Provider, Corridor]
+
+# Weight of the newest sample in the change-interval and cost moving averages.
+EWMA_ALPHA = 0.3
+# Scrape cost assumed for jobs that have never been timed.
+DEFAULT_COST_SECONDS = 5.0
+
+
+def job_key(platform: str, corridor: Corridor | str) -> str:
+    return f"{platform} {corridor}"
+
+
+def _ewma(previous: Optional[float], sample: float) -> float:
+    return sample if previous is None else EWMA_ALPHA * sample + (1 - EWMA_ALPHA) * previous
+
+
+@dataclass
+class JobState:
+    last_attempt_at: Optional[str] = None
+    last_success_at: Optional[str] = None
+    last_rate: Optional[str] = None
+    last_change_at: Optional[str] = None
+    change_interval: Optional[float] = None  # EWMA of seconds between rate changes
+    cost: Optional[float] = None  # EWMA of seconds spent scraping the job
+    failures: int = 0  # consecutive attempts without a rate
+
+
+@dataclass
+class PlannedJob:
+    platform: str
+    corridor: str
+    interval: float  # target seconds between scrapes
+    overdue: float  # seconds since the last success divided by ``interval``
+    cost: float  # expected scrape seconds
+
+
+@dataclass
+class SchedulePlan:
+    due: List[Job] = field(default_factory=list)
+    planned: List[PlannedJob] = field(default_factory=list)
+    waiting: List[PlannedJob] = field(default_factory=list)  # not due yet
+    over_budget: List[PlannedJob] = field(default_factory=list)  # due, left for a later run
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.due)} due, {len(self.waiting)} not due yet, "
+            f"{len(self.over_budget)} deferred by the run budget"
+        )
+
+
+class Scheduler:
+    """Per-job change interval and scrape cost, learned from past runs and stored as JSON.
+
+    A job's target interval is half its observed change interval (so a change
+    is usually seen within one interval), stretched by the square root of its
+    cost relative to the median job and clamped to ``[min_interval,
+    max_interval]``. Untimed or never-changed jobs start at ``min_interval``;
+    a rate that has not changed for longer than its estimate stretches the
+    estimate, so quiet providers back off, while ``max_interval`` bounds how
+    stale any job can get. Failing jobs back off too (see ``retry_delay``).
+    ``plan`` returns the due jobs, most overdue per second of cost first,
+    until their estimated wall time fills ``budget``.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        min_interval: float = SCHEDULE_MIN_INTERVAL,
+        max_interval: float = SCHEDULE_MAX_INTERVAL,
+    ) -> None:
+        self.path = Path(path) if path else None
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.jobs: Dict[str, JobState] = {}
+
+    @classmethod
+    def load(cls, path: str | Path | None = SCHEDULER_STATE_PATH, **kwargs: float) -> Scheduler:
+        """Read state from ``path``; a missing or corrupt file starts empty."""
+        scheduler = cls(path, **kwargs)
+        if scheduler.path and scheduler.path.exists():
+            try:
+                data = json.loads(scheduler.path.read_text(encoding="utf-8"))
+                scheduler.jobs = {key: JobState(**entry) for key, entry in data.items()}
+            except (ValueError, TypeError) as error:
+                print(f"Ignoring unreadable scheduler state in {scheduler.path}: {error}")
+        return scheduler
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        write_text_atomic(
+            self.path,
+            json.dumps(
+                {key: asdict(state) for key, state in self.jobs.items()}, indent=2, sort_keys=True
+            )
+            + "\n",
+        )
+
+    def _median_cost(self) -> float:
+        costs = [state.cost for state in self.jobs.values() if state.cost]
+        return median(costs) if costs else DEFAULT_COST_SECONDS
+
+    def interval(self, state: JobState, now: datetime, median_cost: float) -> float:
+        """Target seconds between scrapes of the job described by ``state``."""
+        change_interval = state.change_interval or 0.0
+        if state.last_change_at:
+            quiet = (now - parse_datetime(state.last_change_at)).total_seconds()
+            change_interval = max(change_interval, quiet)
+        if not change_interval:
+            return self.min_interval
+        cost_factor = math.sqrt((state.cost or median_cost) / median_cost)
+        return min(self.max_interval, max(self.min_interval, change_interval / 2 * cost_factor))
+
+    def retry_delay(self, state: JobState) -> float:
+        """Seconds a job waits after a failed attempt.
+
+        ``min_interval`` after one failure, doubled for each further
+        consecutive failure, up to ``max_interval``.
+        """
+        if state.failures <= 1:
+            return self.min_interval
+        return min(self.max_interval, self.min_interval * 2 ** (state.failures - 1))
+
+    def plan(
+        self,
+        jobs: Sequence[Job],
+        budget: Optional[float] = None,
+        concurrency: Optional[int] = None,
+        now: Optional[datetime] = None,
+    ) -> SchedulePlan:
+        """Pick the jobs to scrape now.
+
+        A job is due once ``interval`` has passed since its last success; a
+        failed job waits ``retry_delay`` before it is retried. Due jobs are
+        taken in order of overdue ratio per second of cost while their summed
+        cost, spread over ``concurrency`` pages (default
+        ``SCRAPE_CONCURRENCY``), stays within ``budget``
+        seconds (default ``SCHEDULE_BUDGET_SECONDS``; 0 means no budget). The
+        first due job is always taken.
+        The returned ``due`` jobs keep the order of ``jobs``.
+        """
+        now = now or now_sgt()
+        concurrency = max(1, concurrency or SCRAPE_CONCURRENCY)
+        budget = SCHEDULE_BUDGET_SECONDS if budget is None else budget
+        median_cost = self._median_cost()
+        candidates: List[Tuple[float, int, PlannedJob]] = []
+        plan = SchedulePlan()
+        for index, (provider, corridor) in enumerate(jobs):
+            state = self.jobs.get(job_key(provider.platform, corridor), JobState())
+            interval = self.interval(state, now, median_cost)
+            cost = state.cost or median_cost
+            since_success = (
+                (now - parse_datetime(state.last_success_at)).total_seconds()
+                if state.last_success_at
+                else math.inf
+            )
+            since_attempt = (
+                (now - parse_datetime(state.last_attempt_at)).total_seconds()
+                if state.last_attempt_at
+                else math.inf
+            )
+            planned = PlannedJob(
+                provider.platform,
+                str(corridor),
+                round(interval, 1),
+                since_success / interval,
+                cost,
+            )
+            plan.planned.append(planned)
+            if since_success < interval or since_attempt < self.retry_delay(state):
+                plan.waiting.append(planned)
+            else:
+                candidates.append((planned.overdue / cost, index, planned))
+
+        candidates.sort(key=lambda candidate: (-candidate[0], candidate[1]))
+        chosen: List[int] = []
+        spent = 0.0
+        for _, index, planned in candidates:
+            estimate = (spent + planned.cost) / concurrency
+            if budget and chosen and estimate > budget:
+                plan.over_budget.append(planned)
+                continue
+            chosen.append(index)
+            spent += planned.cost
+        plan.due = [jobs[index] for index in sorted(chosen)]
+        return plan
+
+    def observe(
+        self,
+        jobs: Sequence[Job],
+        rates: Sequence[Rate],
+        results: Sequence[ProviderResult] = (),
+        now: Optional[datetime] = None,
+    ) -> None:
+        """Update each attempted job from its rate (if any) and timed results.
+
+        Jobs skipped by an open circuit breaker were never attempted, so they
+        keep their state (and their failure count) unchanged.
+        """
+        now = now or now_sgt()
+        stamp = now.isoformat()
+        by_job = {
+            job_key(rate.platform, Corridor(rate.base_currency, rate.target_currency)): rate
+            for rate in rates
+        }
+        durations: Dict[str, float] = {}
+        skipped: set[str] = set()
+        for result in results:
+            key = job_key(result.platform, result.corridor)
+            if result.outcome == "skipped":
+                skipped.add(key)
+                continue
+            durations[key] = durations.get(key, 0.0) + result.duration_ms / 1000
+        for provider, corridor in jobs:
+            key = job_key(provider.platform, corridor)
+            if key in skipped:
+                continue
+            state = self.jobs.setdefault(key, JobState())
+            state.last_attempt_at = stamp
+            if key in durations:
+                state.cost = round(_ewma(state.cost, durations[key]), 3)
+            rate = by_job.get(key)
+            if rate is None:
+                state.failures += 1
+                continue
+            state.failures = 0
+            state.last_success_at = stamp
+            if state.last_rate is None:
+                state.last_change_at = stamp
+            elif Decimal(state.last_rate) != rate.rate:
+                if state.last_change_at:
+                    elapsed = (now - parse_datetime(state.last_change_at)).total_seconds()
+                    state.change_interval = round(_ewma(state.change_interval, elapsed), 1)
+                state.last_change_at = stamp
+            state.last_rate = format(rate.rate, "f")
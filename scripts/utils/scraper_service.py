@@ -0,0 +1,244 @@
+"""Long-running scraper service that keeps one warm browser between runs."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from .browser_pool import ContextPool
+from .models import Rate
+from .rates_http import new_http_client
+from .providers import Corridor, get_providers
+from .rates_scraper import (
+    build_jobs,
+    collect_rates_async,
+    launch_browser,
+    open_provider_context,
+)
+from .scheduler import Job, Scheduler
+from .telemetry import RunReport, run_report
+
+RatesHandler = Callable[[List[Rate]], Awaitable[None]]
+ReportHandler = Callable[[RunReport], None]
+
+
+@dataclass
+class ServiceStatus:
+    """Health snapshot served from ``GET /health``."""
+
+    started_at: str
+    runs: int = 0
+    last_run_at: Optional[str] = None
+    last_run_seconds: Optional[float] = None
+    last_rate_count: int = 0
+    last_error: Optional[str] = None
+    browser_restarts: int = 0
+    browser_connected: bool = False
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class ScraperService:
+    """Scrape every ``interval`` seconds with a persistent browser and context pool.
+
+    Contexts are recycled after ``max_context_uses`` scrapes or after a failed
+    scrape, and the browser is relaunched if it disconnects. A small HTTP server
+    on ``host:port`` exposes ``GET /health`` and ``POST /trigger``; the latter
+    starts a run immediately instead of waiting for the next interval.
+    Each run's spans and provider results are passed to ``on_report``. With a
+    ``scheduler``, ``interval`` is only the tick: each run scrapes the jobs the
+    scheduler says are due within ``budget`` and skips the rest.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        on_rates: RatesHandler,
+        max_context_uses: int = 20,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        concurrent: bool = True,
+        providers: Optional[Sequence[str]] = None,
+        corridors: Optional[Sequence[Corridor]] = None,
+        concurrency: Optional[int] = None,
+        on_report: Optional[ReportHandler] = None,
+        scheduler: Optional[Scheduler] = None,
+        budget: Optional[float] = None,
+        persist_schedule: bool = True,
+    ) -> None:
+        self.interval = interval
+        self.on_rates = on_rates
+        self.on_report = on_report
+        self.max_context_uses = max_context_uses
+        self.host = host
+        self.port = port
+        self.concurrent = concurrent
+        self.providers = [provider.platform for provider in get_providers(providers)]
+        self.corridors = list(corridors) if corridors else None
+        self.concurrency = concurrency
+        self.scheduler = scheduler
+        self.budget = budget
+        self.persist_schedule = persist_schedule
+        self.status = ServiceStatus(started_at=_now())
+        self._status_lock = threading.Lock()
+        self._trigger: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._playwright: Any = None
+        self._pool: Optional[ContextPool] = None
+
+    async def _ensure_browser(self) -> ContextPool:
+        if self._pool and self._pool.browser.is_connected():
+            return self._pool
+        if self._pool:
+            print("Browser disconnected; relaunching.")
+            await self._shutdown_browser()
+            with self._status_lock:
+                self.status.browser_restarts += 1
+        self._playwright, browser = await launch_browser()
+        self._pool = ContextPool(
+            browser, open_provider_context, max_uses=self.max_context_uses
+        )
+        await self._pool.warm(self.providers)
+        return self._pool
+
+    async def _shutdown_browser(self) -> None:
+        pool, self._pool = self._pool, None
+        playwright, self._playwright = self._playwright, None
+        if pool:
+            await pool.close()
+            try:
+                await pool.browser.close()
+            except Exception as error:  # pragma: no cover - browser already gone
+                print(f"Failed to close browser: {error}")
+        if playwright:
+            await playwright.stop()
+
+    async def _run_once(self, http_client: Any) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        error: Optional[str] = None
+        rates: List[Rate] = []
+        with run_report() as report:
+            try:
+                jobs = self._plan()
+                if jobs == []:
+                    print("No provider is due; skipping this run.")
+                else:
+                    pool = await self._ensure_browser()
+                    rates = await collect_rates_async(
+                        concurrent=self.concurrent,
+                        concurrency=self.concurrency,
+                        pool=pool,
+                        http_client=http_client,
+                        jobs=jobs or build_jobs(self.providers, self.corridors),
+                    )
+                    self._observe(jobs, rates, report)
+                    await self.on_rates(rates)
+            except Exception as exc:
+                error = str(exc)
+                print(f"Scrape run failed: {exc}")
+        if self.on_report:
+            try:
+                self.on_report(report)
+            except Exception as exc:
+                print(f"Failed to write run report: {exc}")
+        with self._status_lock:
+            self.status.runs += 1
+            self.status.last_run_at = _now()
+            self.status.last_run_seconds = round(loop.time() - started, 3)
+            self.status.last_rate_count = len(rates)
+            self.status.last_error = error
+            self.status.browser_connected = bool(
+                self._pool and self._pool.browser.is_connected()
+            )
+
+    def _plan(self) -> Optional[List[Job]]:
+        """Return the due jobs, or None when every job runs every time."""
+        if not self.scheduler:
+            return None
+        plan = self.scheduler.plan(
+            build_jobs(self.providers, self.corridors),
+            budget=self.budget,
+            concurrency=self.concurrency if self.concurrent else 1,
+        )
+        print(f"Adaptive schedule: {plan.summary()}.")
+        return plan.due
+
+    def _observe(self, jobs: Optional[List[Job]], rates: List[Rate], report: RunReport) -> None:
+        if not self.scheduler or not jobs:
+            return
+        self.scheduler.observe(jobs, rates, report.providers)
+        if self.persist_schedule:
+            self.scheduler.save()
+
+    def _request_trigger(self) -> None:
+        if self._loop and self._trigger:
+            self._loop.call_soon_threadsafe(self._trigger.set)
+
+    def _snapshot(self) -> Dict[str, Any]:
+        with self._status_lock:
+            return asdict(self.status)
+
+    def _start_http_server(self) -> ThreadingHTTPServer:
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, code: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                if self.path == "/health":
+                    self._send(200, service._snapshot())
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self) -> None:  # noqa: N802 - http.server naming
+                if self.path == "/trigger":
+                    service._request_trigger()
+                    self._send(202, {"triggered": True})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+        server = ThreadingHTTPServer((self.host, self.port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"Scraper service listening on http://{self.host}:{self.port}")
+        return server
+
+    async def serve(self, max_runs: Optional[int] = None) -> None:
+        """Run until cancelled (or until ``max_runs`` runs have completed)."""
+        self._loop = asyncio.get_running_loop()
+        self._trigger = asyncio.Event()
+        server = self._start_http_server()
+        http_client = new_http_client()
+        try:
+            runs = 0
+            while max_runs is None or runs < max_runs:
+                self._trigger.clear()
+                await self._run_once(http_client)
+                runs += 1
+                if max_runs is not None and runs >= max_runs:
+                    break
+                try:
+                    await asyncio.wait_for(self._trigger.wait(), timeout=self.interval)
+                    print("Manual trigger received; scraping now.")
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            server.shutdown()
+            await http_client.aclose()
+            await self._shutdown_browser()
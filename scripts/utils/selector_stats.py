@@ -0,0 +1,124 @@
+"""Persisted per-provider selector statistics used to try known-good selectors first."""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+from .config import SELECTOR_FAILURE_WARN_AFTER, SELECTOR_STATS_PATH
+from .file_utils import write_text_atomic
+
+
+@dataclass
+class ProviderSelectorStats:
+    learned: Optional[str] = None
+    hits: Dict[str, int] = field(default_factory=dict)
+    # Scrapes in a row in which the learned selector did not produce the rate.
+    learned_failures: int = 0
+    last_hit_at: Optional[str] = None
+    # Whether the latest rate came from a fallback pattern rather than a selector.
+    last_fallback: bool = False
+
+
+class SelectorStats:
+    """Hit counts per provider selector and fallback pattern, stored as JSON.
+
+    ``order`` puts the learned selector (the one that matched last) first and
+    the rest by hit count, so the readiness check settles on the known-good
+    selector and patterns that matched before are tried first. ``record``
+    updates the counters after each scrape; it warns when another selector
+    takes over from the learned one, and when the learned selector has missed
+    ``warn_after`` scrapes in a row without a replacement. Both usually mean the
+    provider changed its page layout.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        warn_after: int = SELECTOR_FAILURE_WARN_AFTER,
+    ) -> None:
+        self.path = Path(path) if path else None
+        self.warn_after = warn_after
+        self.providers: Dict[str, ProviderSelectorStats] = {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: str | Path | None = SELECTOR_STATS_PATH) -> SelectorStats:
+        """Read stats from ``path``; a missing or corrupt file starts empty."""
+        stats = cls(path)
+        if stats.path and stats.path.exists():
+            try:
+                data = json.loads(stats.path.read_text(encoding="utf-8"))
+                stats.providers = {
+                    platform: ProviderSelectorStats(**entry) for platform, entry in data.items()
+                }
+            except (ValueError, TypeError) as error:
+                print(f"Ignoring unreadable selector stats in {stats.path}: {error}")
+        return stats
+
+    def save(self) -> None:
+        if not self.path or not self._dirty:
+            return
+        write_text_atomic(
+            self.path,
+            json.dumps(
+                {platform: asdict(entry) for platform, entry in self.providers.items()},
+                indent=2,
+                sort_keys=True,
+            )
+            + "\n",
+        )
+        self._dirty = False
+
+    def order(self, platform: str, candidates: Sequence[str]) -> list[str]:
+        """Return ``candidates`` with the learned one first, then by hits (stable)."""
+        entry = self.providers.get(platform)
+        if not entry:
+            return list(candidates)
+        return sorted(
+            candidates,
+            key=lambda candidate: (candidate != entry.learned, -entry.hits.get(candidate, 0)),
+        )
+
+    def fallback_first(self, platform: str) -> bool:
+        """Whether ``platform``'s latest rate came from a fallback pattern.
+
+        The scraper then searches the patterns while it polls the selectors,
+        instead of only after the readiness deadline has passed.
+        """
+        entry = self.providers.get(platform)
+        return bool(entry and entry.last_fallback)
+
+    def record(self, platform: str, matched: Optional[str], fallback: bool = False) -> None:
+        """Record the selector (or, with ``fallback``, the pattern) that produced the rate.
+
+        ``matched`` is None when neither selectors nor fallbacks found a rate.
+        """
+        entry = self.providers.setdefault(platform, ProviderSelectorStats())
+        self._dirty = True
+        if matched:
+            entry.hits[matched] = entry.hits.get(matched, 0) + 1
+            entry.last_hit_at = datetime.now(timezone.utc).isoformat()
+            entry.last_fallback = fallback
+        if matched and not fallback:
+            if entry.learned and matched != entry.learned:
+                print(
+                    f"[{platform}] Learned selector {entry.learned!r} stopped matching; "
+                    f"switching to {matched!r}. The page layout may have changed."
+                )
+            entry.learned = matched
+            entry.learned_failures = 0
+            return
+        if entry.learned is None:
+            return
+        entry.learned_failures += 1
+        if entry.learned_failures >= self.warn_after:
+            how = "the regex fallback was needed" if matched else "nothing matched"
+            print(
+                f"[{platform}] Learned selector {entry.learned!r} has failed "
+                f"{entry.learned_failures} scrape(s) in a row ({how}); "
+                "the page layout may have changed."
+            )
@@ -0,0 +1,118 @@
+"""Durable local spool that holds scraped rates until Supabase accepts them."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Sequence, Union
+
+from .config import RATES_SPOOL_PATH
+from .models import Rate
+from .supabase_client import ChunkResult
+
+Writer = Callable[[list[dict[str, Any]]], list[ChunkResult]]
+
+
+@dataclass
+class DrainResult:
+    """Summary of one drain pass."""
+
+    written: int
+    remaining: int
+    batches: int
+    error: str | None = None
+
+
+class RateSpool:
+    """Append-only SQLite queue of rate rows awaiting a successful write.
+
+    Rows are appended before any network call, so a slow or unavailable
+    Supabase never loses a scrape. ``drain`` flushes pending rows in bulk and
+    only deletes them once the write succeeds; because writes are upserts, a
+    crash between write and delete just replays an idempotent batch.
+    """
+
+    def __init__(self, path: str | Path = RATES_SPOOL_PATH) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS pending ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " payload TEXT NOT NULL,"
+                " enqueued_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def append(self, rows: Sequence[Union[Rate, dict[str, Any]]]) -> int:
+        """Persist ``rows`` (serialized to Supabase payloads) and return how many were added."""
+        if not rows:
+            return 0
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                "INSERT INTO pending (payload) VALUES (?)",
+                [
+                    (
+                        json.dumps(
+                            row.to_payload() if isinstance(row, Rate) else row, sort_keys=True
+                        ),
+                    )
+                    for row in rows
+                ],
+            )
+        return len(rows)
+
+    def pending_count(self) -> int:
+        with closing(self._connect()) as connection:
+            return connection.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    def drain(self, write: Writer, batch_size: int = 500) -> DrainResult:
+        """Write pending rows oldest first in ``batch_size`` batches until empty or one fails.
+
+        ``write`` reports one ``ChunkResult`` per consecutive chunk of the
+        batch; rows of acknowledged chunks are deleted even when a later chunk
+        of the same batch fails, and the rest stay spooled for the next drain.
+        """
+        written = 0
+        batches = 0
+        error: str | None = None
+        with closing(self._connect()) as connection:
+            while True:
+                batch = connection.execute(
+                    "SELECT id, payload FROM pending ORDER BY id LIMIT ?", (batch_size,)
+                ).fetchall()
+                if not batch:
+                    break
+                batches += 1
+                rows = [json.loads(payload) for _, payload in batch]
+                try:
+                    results = write(rows)
+                except Exception as exc:
+                    error = str(exc)
+                    break
+                acknowledged: list[int] = []
+                offset = 0
+                for result in sorted(results, key=lambda result: result.index):
+                    chunk = batch[offset : offset + result.rows]
+                    if result.ok:
+                        acknowledged.extend(row_id for row_id, _ in chunk)
+                    elif error is None:
+                        error = result.error or "write failed"
+                    offset += result.rows
+                if error is None and offset < len(batch):
+                    error = f"write acknowledged {offset} of {len(batch)} rows"
+                with connection:
+                    connection.executemany(
+                        "DELETE FROM pending WHERE id = ?", [(row_id,) for row_id in acknowledged]
+                    )
+                written += len(acknowledged)
+                if error is not None:
+                    break
+            remaining = connection.execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+        return DrainResult(written=written, remaining=remaining, batches=batches, error=error)
@@ -2,18 +2,58 @@
 
 from __future__ import annotations
 
+import asyncio
+import random
+import time
+import weakref
+from dataclasses import dataclass, field
 from functools import lru_cache
-from typing import Any, Sequence
+from itertools import islice
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Iterator, Sequence
 
-from supabase import Client, create_client
+from .config import (
+    SUPABASE_KEY,
+    SUPABASE_LATEST_VIEW,
+    SUPABASE_TABLE,
+    SUPABASE_URL,
+    supabase_configured,
+)
 
-from .config import SUPABASE_KEY, SUPABASE_TABLE, SUPABASE_URL, supabase_configured
+if TYPE_CHECKING:
+    from postgrest import AsyncPostgrestClient
+    from supabase import Client
+
+
+# Columns that identify one reading; backed by a unique index (see supabase/migrations).
+NATURAL_KEY = "platform,base_currency,target_currency,retrieved_at"
+
+# PostgREST/Postgres error codes worth retrying: connection and schema-cache
+# errors, statement timeouts, serialization failures, deadlocks, too many connections.
+_TRANSIENT_ERROR_CODES = frozenset(
+    {"PGRST000", "PGRST001", "PGRST002", "PGRST003", "57014", "40001", "40P01", "53300"}
+)
+# "No unique or exclusion constraint matching the ON CONFLICT specification":
+# the unique index from supabase/migrations has not been applied yet.
+_MISSING_CONFLICT_TARGET_CODE = "42P10"
 
 
 class SupabaseConfigurationError(RuntimeError):
     """Raised when Supabase credentials are missing or invalid."""
 
 
+@dataclass
+class ChunkResult:
+    """Outcome of writing one chunk of rows."""
+
+    index: int
+    rows: int
+    ok: bool
+    attempts: int
+    seconds: float
+    error: str | None = None
+    data: list[dict[str, Any]] = field(default_factory=list)
+
+
 @lru_cache(maxsize=1)
 def get_client() -> Client:
     """Return a cached Supabase client instance."""
@@ -21,9 +61,55 @@ def get_client() -> Client:
         raise SupabaseConfigurationError(
             "Supabase credentials are not configured. Check your environment variables."
         )
+    # Imported here so modules that never talk to Supabase skip loading the SDK.
+    from supabase import create_client
+
     return create_client(SUPABASE_URL, SUPABASE_KEY)
 
 
+# One async PostgREST client, and so one pooled HTTP/2 session, per event loop:
+# httpx connections cannot be shared across loops.
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncPostgrestClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Seconds before an async PostgREST request times out.
+ASYNC_TIMEOUT_SECONDS = 30.0
+
+
+def get_async_client() -> AsyncPostgrestClient:
+    """Return the async PostgREST client shared by every coroutine on the running loop."""
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is not None:
+        return client
+    if not supabase_configured():
+        raise SupabaseConfigurationError(
+            "Supabase credentials are not configured. Check your environment variables."
+        )
+    from postgrest import AsyncPostgrestClient
+
+    client = AsyncPostgrestClient(
+        f"{SUPABASE_URL.rstrip('/')}/rest/v1",
+        headers={
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+            "apiKey": SUPABASE_KEY,
+            "Authorization": f"Bearer {SUPABASE_KEY}",
+        },
+        timeout=ASYNC_TIMEOUT_SECONDS,
+    )
+    _ASYNC_CLIENTS[loop] = client
+    return client
+
+
+async def aclose_async_client() -> None:
+    """Close the running loop's async client and its connection pool, if one was opened."""
+    client = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
 def insert_rows(rows: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
     """Insert rows into the exchange rates table."""
     if not rows:
@@ -32,15 +118,389 @@ def insert_rows(rows: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
     return response.data or []
 
 
-def fetch_rows(limit: int | None = None) -> list[dict[str, Any]]:
+# Rows per PostgREST request when paging through the table.
+DEFAULT_PAGE_SIZE = 1000
+
+
+def _select(
+    columns: str,
+    platform: str | None,
+    base_currency: str | None,
+    target_currency: str | None,
+    client: Any = None,
+) -> Any:
+    query = (client or get_client()).table(SUPABASE_TABLE).select(columns)
+    for column, value in (
+        ("platform", platform),
+        ("base_currency", base_currency),
+        ("target_currency", target_currency),
+    ):
+        if value:
+            query = query.eq(column, value)
+    return query
+
+
+def _keyset_columns(columns: str) -> str:
+    """``columns`` plus ``retrieved_at``, which the keyset cursor needs."""
+    if columns != "*" and "retrieved_at" not in {c.strip() for c in columns.split(",")}:
+        return f"{columns},retrieved_at"
+    return columns
+
+
+def _keyset_page(
+    query: Any, lower: str | None, upper: str | None, descending: bool, batch_size: int
+) -> Any:
+    if lower:
+        query = query.gt("retrieved_at", lower)
+    if upper:
+        query = query.lt("retrieved_at", upper)
+    return query.order("retrieved_at", desc=descending).limit(batch_size)
+
+
+def _complete_page(
+    rows: list[dict[str, Any]],
+    group: list[dict[str, Any]],
+    lower: str | None,
+    upper: str | None,
+    descending: bool,
+) -> tuple[list[dict[str, Any]], str | None, str | None]:
+    """Replace the rows of the page's last timestamp with its full ``group``.
+
+    Returns the completed page and the ``(lower, upper)`` bounds that move the
+    cursor past that timestamp.
+    """
+    boundary = rows[-1]["retrieved_at"]
+    page = [row for row in rows if row["retrieved_at"] != boundary] + group
+    return (page, lower, boundary) if descending else (page, boundary, upper)
+
+
+def iter_row_batches(
+    columns: str = "*",
+    batch_size: int = DEFAULT_PAGE_SIZE,
+    after: str | None = None,
+    before: str | None = None,
+    platform: str | None = None,
+    base_currency: str | None = None,
+    target_currency: str | None = None,
+    descending: bool = True,
+) -> Iterator[list[dict[str, Any]]]:
+    """Yield pages of rows using keyset pagination on ``retrieved_at``.
+
+    ``after``/``before`` are exclusive ``retrieved_at`` bounds. ``columns`` is a
+    PostgREST projection and always gains ``retrieved_at``, which the cursor
+    needs. Several rows share a timestamp (one per provider and corridor), so a
+    full page is completed with the rest of its last timestamp before the cursor
+    moves past it; pages can therefore be slightly larger than ``batch_size``.
+    """
+    columns = _keyset_columns(columns)
+
+    def select() -> Any:
+        return _select(columns, platform, base_currency, target_currency)
+
+    lower, upper = after, before
+    while True:
+        rows = _keyset_page(select(), lower, upper, descending, batch_size).execute().data or []
+        if len(rows) < batch_size:
+            if rows:
+                yield rows
+            return
+
+        group = select().eq("retrieved_at", rows[-1]["retrieved_at"]).execute().data or []
+        page, lower, upper = _complete_page(rows, group, lower, upper, descending)
+        yield page
+
+
+def iter_rows(
+    columns: str = "*",
+    batch_size: int = DEFAULT_PAGE_SIZE,
+    **filters: Any,
+) -> Iterator[dict[str, Any]]:
+    """Yield rows one at a time; accepts the same filters as ``iter_row_batches``."""
+    for batch in iter_row_batches(columns=columns, batch_size=batch_size, **filters):
+        yield from batch
+
+
+def fetch_rows(limit: int | None = None, columns: str = "*") -> list[dict[str, Any]]:
     """Fetch rows ordered by most recent first."""
-    query = (
-        get_client()
-        .table(SUPABASE_TABLE)
-        .select("*")
-        .order("retrieved_at", desc=True)
+    batch_size = min(limit, DEFAULT_PAGE_SIZE) if limit else DEFAULT_PAGE_SIZE
+    rows = iter_rows(columns=columns, batch_size=batch_size)
+    return list(islice(rows, limit) if limit else rows)
+
+
+def _latest_key(row: dict[str, Any]) -> tuple[Any, Any, Any]:
+    return (row.get("platform"), row.get("base_currency"), row.get("target_currency"))
+
+
+def fetch_latest_rows(columns: str = "*", window: int = 500) -> list[dict[str, Any]]:
+    """Return the newest row per platform and corridor, newest first.
+
+    Reads the ``SUPABASE_LATEST_VIEW`` view when it exists. Without it, only the
+    newest ``window`` rows are scanned, so the cost stays flat as history grows;
+    a provider with no reading inside that window is omitted.
+    """
+    from postgrest.exceptions import APIError
+
+    try:
+        rows = get_client().table(SUPABASE_LATEST_VIEW).select(columns).execute().data or []
+    except APIError as error:
+        print(f"Latest-rates view unavailable ({error.code}); scanning the newest {window} rows.")
+        latest: dict[tuple[Any, Any, Any], dict[str, Any]] = {}
+        for row in fetch_rows(limit=window, columns=columns):
+            latest.setdefault(_latest_key(row), row)
+        rows = list(latest.values())
+    return sorted(rows, key=lambda row: row.get("retrieved_at") or "", reverse=True)
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Return True for failures that may succeed if the same request is retried."""
+    import httpx
+    from postgrest.exceptions import APIError
+
+    if isinstance(error, (httpx.TimeoutException, httpx.TransportError)):
+        return True
+    if isinstance(error, APIError):
+        code = str(error.code or "")
+        # Gateway errors surface as bare HTTP status codes (502, 503, 504, ...).
+        return code in _TRANSIENT_ERROR_CODES or (len(code) == 3 and code.startswith("5"))
+    return False
+
+
+def _missing_conflict_target(error: Exception, on_conflict: str) -> str | None:
+    """Explain a 42P10 upsert failure, or return None for any other error."""
+    from postgrest.exceptions import APIError
+
+    if not isinstance(error, APIError) or error.code != _MISSING_CONFLICT_TARGET_CODE:
+        return None
+    return (
+        f"No unique index on ({on_conflict}) in {SUPABASE_TABLE}; apply supabase/migrations "
+        f"before deploying code that upserts ({error.message})"
+    )
+
+
+def _backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    # Full jitter keeps concurrent writers from retrying in lockstep.
+    return random.uniform(0, min(max_delay, base_delay * 2**attempt))
+
+
+def _chunk_result(
+    index: int,
+    chunk: list[dict[str, Any]],
+    attempts: int,
+    started: float,
+    data: list[dict[str, Any]] | None = None,
+    error: str | None = None,
+) -> ChunkResult:
+    return ChunkResult(
+        index=index,
+        rows=len(chunk),
+        ok=error is None,
+        attempts=attempts,
+        seconds=time.perf_counter() - started,
+        error=error,
+        data=data or [],
     )
-    if limit:
-        query = query.limit(limit)
-    response = query.execute()
+
+
+def _retry_delay(
+    error: Exception,
+    index: int,
+    attempt: int,
+    max_attempts: int,
+    base_delay: float,
+    max_delay: float,
+) -> float | None:
+    """Return the backoff before retrying a failed chunk, or None to give up on it."""
+    if attempt >= max_attempts or not is_transient_error(error):
+        return None
+    delay = _backoff_delay(attempt - 1, base_delay, max_delay)
+    print(f"Chunk {index} attempt {attempt} failed ({error}); retrying in {delay:.2f}s.")
+    return delay
+
+
+def upsert_rows(
+    rows: Sequence[dict[str, Any]],
+    chunk_size: int = 500,
+    max_attempts: int = 5,
+    on_conflict: str = NATURAL_KEY,
+    base_delay: float = 0.5,
+    max_delay: float = 8.0,
+    sleep: Callable[[float], None] = time.sleep,
+) -> list[ChunkResult]:
+    """Upsert rows in chunks, retrying transient failures with exponential backoff.
+
+    Rows are merged on ``on_conflict`` so re-running the same batch never
+    creates duplicates. Each chunk is attempted independently; a chunk that
+    still fails after ``max_attempts`` (or hits a non-transient error) is
+    reported with ``ok=False`` and the remaining chunks are still written.
+    If the table lacks the unique index behind ``on_conflict`` (error 42P10),
+    every chunk is reported failed after the first request, with a message
+    pointing at the missing migration.
+    """
+    if not rows:
+        return []
+    table = get_client().table(SUPABASE_TABLE)
+    results: list[ChunkResult] = []
+    missing_index: str | None = None
+    for index, start in enumerate(range(0, len(rows), chunk_size)):
+        chunk = list(rows[start : start + chunk_size])
+        started = time.perf_counter()
+        if missing_index:
+            # Every later chunk would hit the same error.
+            results.append(_chunk_result(index, chunk, 0, started, error=missing_index))
+            continue
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = table.upsert(chunk, on_conflict=on_conflict).execute()
+            except Exception as error:
+                delay = _retry_delay(error, index, attempt, max_attempts, base_delay, max_delay)
+                if delay is not None:
+                    sleep(delay)
+                    continue
+                missing_index = _missing_conflict_target(error, on_conflict)
+                if missing_index:
+                    print(missing_index)
+                message = missing_index or str(error)
+                results.append(_chunk_result(index, chunk, attempt, started, error=message))
+            else:
+                results.append(_chunk_result(index, chunk, attempt, started, response.data))
+            break
+    return results
+
+
+async def ainsert_rows(rows: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Async ``insert_rows``."""
+    if not rows:
+        return []
+    response = await get_async_client().table(SUPABASE_TABLE).insert(list(rows)).execute()
     return response.data or []
+
+
+async def aiter_row_batches(
+    columns: str = "*",
+    batch_size: int = DEFAULT_PAGE_SIZE,
+    after: str | None = None,
+    before: str | None = None,
+    platform: str | None = None,
+    base_currency: str | None = None,
+    target_currency: str | None = None,
+    descending: bool = True,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Async ``iter_row_batches``: the same keyset pagination over the shared session."""
+    columns = _keyset_columns(columns)
+    client = get_async_client()
+
+    def select() -> Any:
+        return _select(columns, platform, base_currency, target_currency, client)
+
+    lower, upper = after, before
+    while True:
+        response = await _keyset_page(select(), lower, upper, descending, batch_size).execute()
+        rows = response.data or []
+        if len(rows) < batch_size:
+            if rows:
+                yield rows
+            return
+
+        group = (await select().eq("retrieved_at", rows[-1]["retrieved_at"]).execute()).data or []
+        page, lower, upper = _complete_page(rows, group, lower, upper, descending)
+        yield page
+
+
+async def afetch_rows(
+    limit: int | None = None, columns: str = "*", **filters: Any
+) -> list[dict[str, Any]]:
+    """Async ``fetch_rows``; also accepts the ``aiter_row_batches`` filters."""
+    batch_size = min(limit, DEFAULT_PAGE_SIZE) if limit else DEFAULT_PAGE_SIZE
+    rows: list[dict[str, Any]] = []
+    async for batch in aiter_row_batches(columns=columns, batch_size=batch_size, **filters):
+        rows.extend(batch)
+        if limit and len(rows) >= limit:
+            return rows[:limit]
+    return rows
+
+
+async def afetch_latest_rows(columns: str = "*", window: int = 500) -> list[dict[str, Any]]:
+    """Async ``fetch_latest_rows``."""
+    from postgrest.exceptions import APIError
+
+    try:
+        response = await get_async_client().table(SUPABASE_LATEST_VIEW).select(columns).execute()
+        rows = response.data or []
+    except APIError as error:
+        print(f"Latest-rates view unavailable ({error.code}); scanning the newest {window} rows.")
+        latest: dict[tuple[Any, Any, Any], dict[str, Any]] = {}
+        for row in await afetch_rows(limit=window, columns=columns):
+            latest.setdefault(_latest_key(row), row)
+        rows = list(latest.values())
+    return sorted(rows, key=lambda row: row.get("retrieved_at") or "", reverse=True)
+
+
+async def _aupsert_chunk(
+    table: Any,
+    index: int,
+    chunk: list[dict[str, Any]],
+    on_conflict: str,
+    max_attempts: int,
+    base_delay: float,
+    max_delay: float,
+    sleep: Callable[[float], Awaitable[None]],
+) -> ChunkResult:
+    started = time.perf_counter()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            response = await table.upsert(chunk, on_conflict=on_conflict).execute()
+        except Exception as error:
+            delay = _retry_delay(error, index, attempt, max_attempts, base_delay, max_delay)
+            if delay is None:
+                message = _missing_conflict_target(error, on_conflict) or str(error)
+                return _chunk_result(index, chunk, attempt, started, error=message)
+            await sleep(delay)
+        else:
+            return _chunk_result(index, chunk, attempt, started, response.data)
+
+
+async def aupsert_rows(
+    rows: Sequence[dict[str, Any]],
+    chunk_size: int = 500,
+    max_attempts: int = 5,
+    on_conflict: str = NATURAL_KEY,
+    base_delay: float = 0.5,
+    max_delay: float = 8.0,
+    concurrency: int = 4,
+    sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+) -> list[ChunkResult]:
+    """Async ``upsert_rows`` that writes up to ``concurrency`` chunks at once.
+
+    Results come back in chunk order, with the same retry and per-chunk
+    failure semantics as the synchronous version.
+    """
+    if not rows:
+        return []
+    table = get_async_client().table(SUPABASE_TABLE)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def write(index: int, start: int) -> ChunkResult:
+        async with semaphore:
+            return await _aupsert_chunk(
+                table,
+                index,
+                list(rows[start : start + chunk_size]),
+                on_conflict,
+                max_attempts,
+                base_delay,
+                max_delay,
+                sleep,
+            )
+
+    return list(
+        await asyncio.gather(
+            *(
+                write(index, start)
+                for index, start in enumerate(range(0, len(rows), chunk_size))
+            )
+        )
+    )
@@ -0,0 +1,170 @@
+"""Lightweight spans, per-provider results and run reports for scraper runs.
+
+Spans are recorded into the ``RunReport`` active in the current context (see
+``run_report``); outside a report they are only timed. When the
+``opentelemetry`` API is installed, every span is mirrored to the globally
+configured tracer as well, which is a no-op until an SDK is set up.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .file_utils import write_json, write_text_atomic
+
+
+@dataclass
+class Span:
+    name: str
+    started_at: float  # seconds since the report started
+    duration_ms: float = 0.0
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ProviderResult:
+    """Outcome of one provider/corridor attempt over HTTP or in the browser."""
+
+    platform: str
+    corridor: str
+    source: str  # "http", "browser" or "breaker"
+    outcome: str  # "ok", "no_rate", "error" or "skipped" (circuit open)
+    duration_ms: float
+    selector: Optional[str] = None
+    selector_index: Optional[int] = None  # position in Provider.selectors; None for fallbacks
+    bytes: int = 0
+    cache_hits: int = 0  # asset cache lookups served fresh or after a 304
+    cache_misses: int = 0
+    cache_bytes_saved: int = 0
+    error: Optional[str] = None
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+
+@dataclass
+class RunReport:
+    started_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    duration_ms: float = 0.0
+    spans: List[Span] = field(default_factory=list)
+    providers: List[ProviderResult] = field(default_factory=list)
+    _origin: float = field(default_factory=time.perf_counter, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("_origin")
+        return data
+
+    def write_json(self, path: str | Path) -> None:
+        write_json(path, self.to_dict())
+
+    def write_prometheus(self, path: str | Path, prefix: str = "exchange_rates") -> None:
+        """Write metrics in the Prometheus textfile-collector format (atomically)."""
+        lines = [
+            f"# TYPE {prefix}_run_duration_seconds gauge",
+            f"{prefix}_run_duration_seconds {self.duration_ms / 1000:.6f}",
+            f"# TYPE {prefix}_span_duration_seconds gauge",
+        ]
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+        lines += [
+            f'{prefix}_span_duration_seconds{{span="{name}"}} {total / 1000:.6f}'
+            for name, total in sorted(totals.items())
+        ]
+        for metric, kind in (
+            ("provider_duration_seconds", "gauge"),
+            ("provider_success", "gauge"),
+            ("provider_bytes", "gauge"),
+            ("provider_cache_hit_ratio", "gauge"),
+            ("provider_cache_bytes_saved", "gauge"),
+        ):
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for result in self.providers:
+                labels = (
+                    f'platform="{result.platform}",corridor="{result.corridor}",'
+                    f'source="{result.source}"'
+                )
+                value = {
+                    "provider_duration_seconds": f"{result.duration_ms / 1000:.6f}",
+                    "provider_success": "1" if result.outcome == "ok" else "0",
+                    "provider_bytes": str(result.bytes),
+                    "provider_cache_hit_ratio": f"{result.cache_hit_ratio:.6f}",
+                    "provider_cache_bytes_saved": str(result.cache_bytes_saved),
+                }[metric]
+                lines.append(f"{prefix}_{metric}{{{labels}}} {value}")
+
+        write_text_atomic(path, "\n".join(lines) + "\n")
+
+
+_REPORT: ContextVar[Optional[RunReport]] = ContextVar("run_report", default=None)
+
+
+def current_report() -> Optional[RunReport]:
+    return _REPORT.get()
+
+
+@contextmanager
+def run_report() -> Iterator[RunReport]:
+    """Collect spans and provider results recorded in this context (and its tasks)."""
+    report = RunReport()
+    token = _REPORT.set(report)
+    try:
+        yield report
+    finally:
+        report.duration_ms = round((time.perf_counter() - report._origin) * 1000, 3)
+        _REPORT.reset(token)
+
+
+@lru_cache(maxsize=1)
+def _otel_tracer() -> Any:
+    try:
+        from opentelemetry import trace
+    except ImportError:
+        return None
+    return trace.get_tracer(__name__)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Time a block; attributes may be added to the yielded span while it runs."""
+    report = _REPORT.get()
+    origin = report._origin if report else time.perf_counter()
+    record = Span(name=name, started_at=0.0, attributes=attributes)
+    started = time.perf_counter()
+    record.started_at = round(started - origin, 6)
+    with ExitStack() as stack:
+        tracer = _otel_tracer()
+        if tracer is not None:
+            stack.enter_context(
+                tracer.start_as_current_span(
+                    name, attributes={key: str(value) for key, value in attributes.items()}
+                )
+            )
+        try:
+            yield record
+        except BaseException as error:
+            record.status = "error"
+            record.attributes.setdefault("error", str(error) or type(error).__name__)
+            raise
+        finally:
+            record.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+            if report:
+                report.spans.append(record)
+
+
+def record_provider(result: ProviderResult) -> None:
+    """Add ``result`` to the active report, if any."""
+    report = _REPORT.get()
+    if report:
+        report.providers.append(result)
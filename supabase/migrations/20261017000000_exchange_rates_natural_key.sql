@@ -0,0 +1,15 @@
+-- Natural key for exchange_rates so scraper writes can upsert idempotently.
+-- Matches NATURAL_KEY in scripts/utils/supabase_client.py. Apply before deploying
+-- scraper code that upserts; until then upserts fail with 42P10.
+
+-- Drop duplicate readings left by earlier blind retries, keeping the oldest row.
+delete from public.exchange_rates newer
+using public.exchange_rates older
+where newer.platform = older.platform
+  and newer.base_currency = older.base_currency
+  and newer.target_currency = older.target_currency
+  and newer.retrieved_at = older.retrieved_at
+  and newer.id > older.id;
+
+create unique index if not exists exchange_rates_natural_key
+  on public.exchange_rates (platform, base_currency, target_currency, retrieved_at);
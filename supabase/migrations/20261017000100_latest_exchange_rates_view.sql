@@ -0,0 +1,47 @@
+-- Latest reading per platform and corridor, served without scanning history.
+-- Read by supabase_client.fetch_latest_rows (SUPABASE_LATEST_VIEW).
+
+-- Postgres has no skip scan, and DISTINCT ON with a mixed-direction ORDER BY
+-- sorts the whole table. Instead, the recursive CTE below emulates a skip scan.
+-- Each step seeks exchange_rates_natural_key for the next
+-- (platform, base_currency, target_currency) after the current one. Then a
+-- LATERAL lookup reads that group's newest row with one backward index seek.
+-- Cost grows with the number of corridors, not with history. The natural key
+-- index already orders (platform, base_currency, target_currency, retrieved_at),
+-- and btree indexes scan in either direction, so no separate
+-- retrieved_at desc index is needed.
+create or replace view public.latest_exchange_rates as
+with recursive corridors as (
+  (
+    select platform, base_currency, target_currency
+    from public.exchange_rates
+    order by platform, base_currency, target_currency
+    limit 1
+  )
+  union all
+  select step.platform, step.base_currency, step.target_currency
+  from corridors
+  cross join lateral (
+    select rates.platform, rates.base_currency, rates.target_currency
+    from public.exchange_rates rates
+    where (rates.platform, rates.base_currency, rates.target_currency)
+      > (corridors.platform, corridors.base_currency, corridors.target_currency)
+    order by rates.platform, rates.base_currency, rates.target_currency
+    limit 1
+  ) step
+)
+select latest.*
+from corridors
+cross join lateral (
+  select *
+  from public.exchange_rates rates
+  where rates.platform = corridors.platform
+    and rates.base_currency = corridors.base_currency
+    and rates.target_currency = corridors.target_currency
+  order by rates.retrieved_at desc
+  limit 1
+) latest;
+
+-- Newest-first reads and keyset pagination on retrieved_at.
+create index if not exists exchange_rates_retrieved_at_idx
+  on public.exchange_rates (retrieved_at desc);